@@ -4,18 +4,19 @@ from decimal import Decimal
 
 from flask import Blueprint, render_template, redirect, url_for, flash, request
 from flask_login import login_required, current_user
-from sqlalchemy import func, extract
+from sqlalchemy import func
 
 from akowe.decorators import admin_required
 from akowe.forms import RegistrationForm, UserEditForm
 from akowe.models import db
-from akowe.models.client import Client
 from akowe.models.expense import Expense
 from akowe.models.income import Income
 from akowe.models.invoice import Invoice
-from akowe.models.project import Project
 from akowe.models.timesheet import Timesheet
 from akowe.models.user import User
+from akowe.services.admin_stats_service import AdminStatsService
+from akowe.services.user_search_service import UserSearchService
+from akowe.utils.metrics import metrics_sampler
 
 bp = Blueprint("admin", __name__, url_prefix="/admin")
 
@@ -25,82 +26,20 @@ bp = Blueprint("admin", __name__, url_prefix="/admin")
 @admin_required
 def index():
     """Admin dashboard with system statistics and summaries."""
-    # Import datetime at the beginning of the function
-    from datetime import datetime
-    
-    # Get user statistics
-    total_users = User.query.count()
-    active_users = User.query.filter_by(is_active=True).count()
-    inactive_users = total_users - active_users
-    admins = User.query.filter_by(is_admin=True).count()
-    
-    # Get system statistics
-    total_clients = Client.query.count()
-    total_projects = Project.query.count()
-    
-    # Get transaction statistics
+    # Site-wide counters and monthly totals, one query each and cached
+    counters = AdminStatsService.counters()
+    monthly = AdminStatsService.monthly(datetime.utcnow().year)
+    months = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
     
     # Recent activity
     recent_registrations = User.query.order_by(User.created_at.desc()).limit(5).all()
-    # Check if a User model has the last_login attribute
-    recent_logins = []
-    if hasattr(User, 'last_login'):
-        recent_logins = User.query.filter(User.last_login.isnot(None)).order_by(User.last_login.desc()).limit(5).all()
-    
-    # Transaction counts
-    income_count = Income.query.count()
-    expense_count = Expense.query.count()
-    invoice_count = Invoice.query.count()
-    timesheet_count = Timesheet.query.count()
-    
-    # Calculate financial summaries
-    total_income = db.session.query(func.sum(Income.amount)).scalar() or Decimal('0.00')
-    total_expenses = db.session.query(func.sum(Expense.amount)).scalar() or Decimal('0.00')
-    total_invoiced = db.session.query(func.sum(Invoice.total)).scalar() or Decimal('0.00')
+    recent_logins = User.query.filter(User.last_login.isnot(None)).order_by(User.last_login.desc()).limit(5).all()
     
     # Recent transactions
     recent_invoices = Invoice.query.order_by(Invoice.created_at.desc()).limit(5).all()
     recent_income = Income.query.order_by(Income.date.desc()).limit(5).all()
     recent_expenses = Expense.query.order_by(Expense.date.desc()).limit(5).all()
     
-    # Monthly financial data
-    current_year = datetime.utcnow().year
-    monthly_registrations = db.session.query(
-        extract('month', User.created_at).label('month'),
-        func.count(User.id).label('count')
-    ).filter(
-        extract('year', User.created_at) == current_year
-    ).group_by('month').all()
-    
-    monthly_income = db.session.query(
-        extract('month', Income.date).label('month'),
-        func.sum(Income.amount).label('amount')
-    ).filter(
-        extract('year', Income.date) == current_year
-    ).group_by('month').all()
-    
-    monthly_expenses = db.session.query(
-        extract('month', Expense.date).label('month'),
-        func.sum(Expense.amount).label('amount')
-    ).filter(
-        extract('year', Expense.date) == current_year
-    ).group_by('month').all()
-    
-    # Format for charts
-    months = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
-    registration_data = [0] * 12
-    income_data = [0] * 12
-    expense_data = [0] * 12
-    
-    for item in monthly_registrations:
-        registration_data[int(item.month) - 1] = item.count
-    
-    for item in monthly_income:
-        income_data[int(item.month) - 1] = float(item.amount or 0)
-    
-    for item in monthly_expenses:
-        expense_data[int(item.month) - 1] = float(item.amount or 0)
-    
     # System information
     import platform
     
@@ -115,61 +54,45 @@ def index():
         'uptime': 'Unknown'
     }
     
-    # Try to get detailed system info if psutil is available
-    try:
-        import psutil
-        boot_time = datetime.fromtimestamp(psutil.boot_time())
-        uptime = datetime.now() - boot_time
-        uptime_hours = uptime.total_seconds() // 3600
-        uptime_str = f"{int(uptime_hours // 24)} days, {int(uptime_hours % 24)} hours"
-        
-        system_info.update({
-            'cpu_percent': psutil.cpu_percent(interval=0.1),
-            'memory_percent': psutil.virtual_memory().percent,
-            'disk_percent': psutil.disk_usage('/').percent,
-            'uptime': uptime_str
-        })
-    except ImportError:
-        # If psutil is not available, we'll use default values
-        import logging
-        logging.warning("psutil module not found. System monitoring metrics will not be available.")
-        pass
-    
-    # Add active users in last 24 hours
-    active_today = 0
-    if hasattr(User, 'last_login'):
-        one_day_ago = datetime.utcnow() - timedelta(days=1)
-        active_today = User.query.filter(
-            User.last_login >= one_day_ago
-        ).count()
+    # Latest metrics come from the background sampler, so no system calls block here
+    latest = metrics_sampler.latest()
+    system_info.update({
+        'cpu_percent': latest['cpu_percent'],
+        'memory_percent': latest['memory_percent'],
+        'disk_percent': latest['disk_percent'],
+        'db_connections': latest['db_connections'],
+        'requests_per_minute': latest['requests_per_minute'],
+        'uptime': metrics_sampler.uptime()
+    })
     
     return render_template(
         "admin/index.html", 
         title="Admin Dashboard",
-        total_users=total_users,
-        active_users=active_users,
-        inactive_users=inactive_users,
-        admins=admins,
-        total_clients=total_clients,
-        total_projects=total_projects,
-        income_count=income_count,
-        expense_count=expense_count,
-        invoice_count=invoice_count,
-        timesheet_count=timesheet_count,
-        total_income=total_income,
-        total_expenses=total_expenses,
-        total_invoiced=total_invoiced,
-        active_today=active_today,
+        total_users=counters["total_users"],
+        active_users=counters["active_users"],
+        inactive_users=counters["inactive_users"],
+        admins=counters["admin_users"],
+        total_clients=counters["total_clients"],
+        total_projects=counters["total_projects"],
+        income_count=counters["income_count"],
+        expense_count=counters["expense_count"],
+        invoice_count=counters["invoice_count"],
+        timesheet_count=counters["timesheet_count"],
+        total_income=counters["total_income"],
+        total_expenses=counters["total_expenses"],
+        total_invoiced=counters["total_invoiced"],
+        active_today=counters["active_today"],
         recent_registrations=recent_registrations,
         recent_logins=recent_logins,
         recent_invoices=recent_invoices,
         recent_income=recent_income,
         recent_expenses=recent_expenses,
         months=months,
-        registration_data=registration_data,
-        income_data=income_data,
-        expense_data=expense_data,
-        system_info=system_info
+        registration_data=monthly["registration_data"],
+        income_data=monthly["income_data"],
+        expense_data=monthly["expense_data"],
+        system_info=system_info,
+        metrics_series=metrics_sampler.series()
     )
 
 
@@ -195,31 +118,31 @@ def users():
     elif filter_role == 'user':
         users_query = users_query.filter_by(is_admin=False)
     
-    if search_query:
-        users_query = users_query.filter(
-            (User.username.ilike(f'%{search_query}%') 
-             | User.email.ilike(f'%{search_query}%') 
-             | User.first_name.ilike(f'%{search_query}%') 
-             | User.last_name.ilike(f'%{search_query}%'))
-        )
+    if search_query.strip():
+        users_query = users_query.filter(UserSearchService.search_filter(search_query))
     
-    users = users_query.order_by(User.username).all()
+    page = request.args.get('page', 1, type=int)
+    per_page = min(
+        request.args.get('per_page', UserSearchService.DEFAULT_PER_PAGE, type=int),
+        UserSearchService.MAX_PER_PAGE
+    )
+    pagination = users_query.order_by(User.username).paginate(page=page, per_page=per_page, error_out=False)
     
     # Get statistics for the sidebar
-    total_users = User.query.count()
-    active_users = User.query.filter_by(is_active=True).count()
-    admin_users = User.query.filter_by(is_admin=True).count()
+    counters = AdminStatsService.counters()
     
     return render_template(
         "admin/users.html", 
-        users=users, 
+        users=pagination.items, 
+        pagination=pagination,
+        activity=AdminStatsService.user_activity(user.id for user in pagination.items),
         title="User Management",
         filter_status=filter_status,
         filter_role=filter_role,
         search_query=search_query,
-        total_users=total_users,
-        active_users=active_users,
-        admin_users=admin_users
+        total_users=counters["total_users"],
+        active_users=counters["active_users"],
+        admin_users=counters["admin_users"]
     )
 
 
@@ -246,6 +169,7 @@ def new_user():
 
         db.session.add(user)
         db.session.commit()
+        AdminStatsService.invalidate()
 
         flash(f"User {user.username} has been created.", "success")
         return redirect(url_for("admin.users"))
@@ -291,34 +215,13 @@ def edit_user(id):
             user.hourly_rate = form.hourly_rate.data
 
         db.session.commit()
+        AdminStatsService.invalidate()
 
         flash(f"User {user.username} has been updated.", "success")
         return redirect(url_for("admin.users"))
 
     # Get user activity data
-    user_activity = {}
-    
-    # Check if models have a user_id field before filtering
-    if hasattr(Invoice, 'user_id'):
-        user_activity['invoices'] = Invoice.query.filter_by(user_id=user.id).count()
-    else:
-        user_activity['invoices'] = 0
-        
-    if hasattr(Timesheet, 'user_id'):
-        user_activity['timesheets'] = Timesheet.query.filter_by(user_id=user.id).count()
-    else:
-        user_activity['timesheets'] = 0
-        
-    if hasattr(Income, 'user_id'):
-        user_activity['incomes'] = Income.query.filter_by(user_id=user.id).count()
-    else:
-        user_activity['incomes'] = 0
-        
-    # Expense might be company-wide rather than user-specific
-    if hasattr(Expense, 'user_id'):
-        user_activity['expenses'] = Expense.query.filter_by(user_id=user.id).count()
-    else:
-        user_activity['expenses'] = 0  # No user-specific expenses
+    user_activity = AdminStatsService.user_activity([user.id])[user.id]
 
     return render_template(
         "admin/edit_user.html", 
@@ -349,6 +252,7 @@ def delete_user(id):
     username = user.username
     db.session.delete(user)
     db.session.commit()
+    AdminStatsService.invalidate()
 
     flash(f"User {username} has been deleted.", "success")
     return redirect(url_for("admin.users"))
@@ -410,12 +314,7 @@ def settings():
 def data_management():
     """Data management dashboard."""
     # Get database statistics
-    income_count = Income.query.count()
-    expense_count = Expense.query.count()
-    invoice_count = Invoice.query.count()
-    timesheet_count = Timesheet.query.count()
-    client_count = Client.query.count()
-    project_count = Project.query.count()
+    counters = AdminStatsService.counters()
     
     # Get database size - placeholder, would need a DB-specific approach
     db_size = "Unknown"  # Would need database-specific implementation
@@ -431,12 +330,12 @@ def data_management():
     return render_template(
         "admin/data.html", 
         title="Data Management",
-        income_count=income_count,
-        expense_count=expense_count,
-        invoice_count=invoice_count,
-        timesheet_count=timesheet_count,
-        client_count=client_count,
-        project_count=project_count,
+        income_count=counters["income_count"],
+        expense_count=counters["expense_count"],
+        invoice_count=counters["invoice_count"],
+        timesheet_count=counters["timesheet_count"],
+        client_count=counters["total_clients"],
+        project_count=counters["total_projects"],
         db_size=db_size,
         recent_entries=recent_entries
     )
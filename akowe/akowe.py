@@ -186,6 +186,20 @@ def create_app(test_config=None):
     from akowe.utils.timezone_initializer import init_timezone
     init_timezone(app)
 
+    # Fast JSON encoding and response compression
+    from akowe.utils.json_provider import init_json
+    from akowe.utils.compression import init_compression
+    init_json(app)
+    init_compression(app)
+
+    # Background system metrics for the admin dashboard
+    from akowe.utils.metrics import init_metrics
+    init_metrics(app)
+
+    # Register CLI commands
+    from akowe.commands import init_commands
+    init_commands(app)
+
     # Add custom template filters
     from akowe.utils.timezone import to_local_time, format_datetime, format_date
 
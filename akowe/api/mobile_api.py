@@ -1,16 +1,22 @@
+import hashlib
 import os
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 from functools import wraps
 import jwt
-from flask import Blueprint, request, jsonify, current_app, g
+import pytz
+from flask import Blueprint, request, jsonify, current_app, g, make_response
 from werkzeug.security import check_password_hash
 
+from akowe.api.serializers import expense_schema
 from akowe.models import db
 from akowe.models.user import User
 from akowe.models.expense import Expense
 from akowe.models.income import Income
+from akowe.services.receipt_service import ReceiptService
 from akowe.services.storage_service import StorageService
+from akowe.services.sync_service import SyncService
+from akowe.utils.timezone import get_timezone
 
 bp = Blueprint("api", __name__, url_prefix="/api")
 
@@ -18,6 +24,8 @@ bp = Blueprint("api", __name__, url_prefix="/api")
 RECEIPT_CONTAINER = "receipts"
 ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg", "gif", "pdf"}
 MAX_CONTENT_LENGTH = 5 * 1024 * 1024  # 5MB
+MAX_BATCH_SIZE = 500  # Records accepted by a single batch request
+MAX_CLIENT_KEY_LENGTH = 64  # Size of the client_key columns
 
 
 # Helper functions
@@ -25,6 +33,24 @@ def allowed_file(filename):
     return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
+def batch_item_error(item, id_fields):
+    """Describe what is wrong with a batch item's shape, ids or client key, or return None
+
+    Checked before any lookups, so a malformed item fails on its own instead of
+    failing the whole batch.
+    """
+    if not isinstance(item, dict):
+        return "Each item must be an object"
+    for field in id_fields:
+        value = item.get(field)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, int)):
+            return f"Invalid {field}"
+    client_key = item.get("client_key")
+    if client_key is not None and (not isinstance(client_key, str) or len(client_key) > MAX_CLIENT_KEY_LENGTH):
+        return f"client_key must be a string of at most {MAX_CLIENT_KEY_LENGTH} characters"
+    return None
+
+
 def token_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
@@ -77,6 +103,64 @@ def token_required(f):
     return decorated
 
 
+def conditional_get(*entities):
+    """Answer GET requests with ETag/Last-Modified and return 304 when nothing changed
+
+    The validators are derived from the latest change to the listed entity types
+    (see ``SyncService.data_version``), so an unchanged resource is answered
+    without running the view at all. Views without entities depend only on code,
+    and get a content-based ETag instead.
+
+    Must be applied after ``token_required``.
+    """
+
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            if not entities:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code == 200:
+                    response.add_etag()
+                    response.headers["Cache-Control"] = "private, no-cache"
+                return response.make_conditional(request)
+
+            last_modified = SyncService.data_version(g.current_user.id, entities)
+            # Today's date is part of the key because several views default to
+            # the current period when no dates are given
+            key = "|".join([
+                str(g.current_user.id),
+                request.full_path,
+                last_modified.isoformat() if last_modified else "empty",
+                datetime.utcnow().date().isoformat(),
+            ])
+            etag = hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+            not_modified = False
+            if request.if_none_match:
+                # Weak comparison: compressed responses carry a weak ETag
+                not_modified = request.if_none_match.contains_weak(etag)
+            elif request.if_modified_since and last_modified:
+                modified = last_modified.replace(microsecond=0, tzinfo=timezone.utc)
+                not_modified = modified <= request.if_modified_since
+
+            if not_modified:
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            if last_modified:
+                response.last_modified = last_modified.replace(tzinfo=timezone.utc)
+            response.headers["Cache-Control"] = "private, no-cache"
+            return response
+
+        return decorated
+
+    return decorator
+
+
 # Authentication endpoints
 @bp.route("/login", methods=["POST"])
 def login():
@@ -96,8 +180,6 @@ def login():
 
     if check_password_hash(user.password_hash, auth.get("password")):
         # Generate token with datetime
-        from datetime import timedelta
-
         expiry = datetime.utcnow() + timedelta(hours=24)
 
         try:
@@ -138,11 +220,28 @@ def get_user():
                 "first_name": g.current_user.first_name,
                 "last_name": g.current_user.last_name,
                 "is_admin": g.current_user.is_admin,
+                "timezone": get_timezone(g.current_user).zone,
             }
         }
     )
 
 
+@bp.route("/user/timezone", methods=["PUT"])
+@token_required
+def set_timezone():
+    data = request.get_json(silent=True) or {}
+    tz_name = data.get("timezone")
+
+    # An empty value goes back to the app timezone
+    if tz_name and tz_name not in pytz.all_timezones_set:
+        return jsonify({"message": f"Unknown timezone: {tz_name}"}), 400
+
+    g.current_user.timezone = tz_name or None
+    db.session.commit()
+
+    return jsonify({"message": "Timezone updated", "timezone": get_timezone(g.current_user).zone})
+
+
 @bp.route("/user/password", methods=["PUT"])
 @token_required
 def change_password():
@@ -165,6 +264,7 @@ def change_password():
 # Expense endpoints
 @bp.route("/expenses", methods=["GET"])
 @token_required
+@conditional_get("expenses")
 def get_expenses():
     # Get query parameters for filtering
     category = request.args.get("category")
@@ -196,26 +296,7 @@ def get_expenses():
     # Execute query with ordering
     expenses = query.order_by(Expense.date.desc()).all()
 
-    # Format results
-    result = []
-    for expense in expenses:
-        result.append(
-            {
-                "id": expense.id,
-                "date": expense.date.isoformat(),
-                "title": expense.title,
-                "amount": str(expense.amount),
-                "category": expense.category,
-                "payment_method": expense.payment_method,
-                "status": expense.status,
-                "vendor": expense.vendor,
-                "has_receipt": bool(expense.receipt_blob_name),
-                "created_at": expense.created_at.isoformat() if expense.created_at else None,
-                "updated_at": expense.updated_at.isoformat() if expense.updated_at else None,
-            }
-        )
-
-    return jsonify({"expenses": result})
+    return jsonify({"expenses": expense_schema.dump_many(expenses)})
 
 
 @bp.route("/expenses/<int:id>", methods=["GET"])
@@ -299,8 +380,8 @@ def create_expense():
                 return jsonify({"message": "Receipt file is too large. Maximum size is 5MB."}), 400
 
             try:
-                # Upload file to Azure Blob Storage
-                blob_name, blob_url = StorageService.upload_file(receipt_file, RECEIPT_CONTAINER)
+                # Upload file to Azure Blob Storage (reusing an identical receipt)
+                blob_name, blob_url = ReceiptService.attach(receipt_file, RECEIPT_CONTAINER)
 
                 # Store blob info in the expense record
                 expense.receipt_blob_name = blob_name
@@ -340,6 +421,131 @@ def create_expense():
         return jsonify({"message": f"Error creating expense: {str(e)}"}), 500
 
 
+@bp.route("/expenses/batch", methods=["POST"])
+@token_required
+def batch_expenses():
+    """Create or update many expenses in one transaction
+
+    Items with an ``id`` update that expense; other items create a new one. Each
+    item may carry a ``client_key`` chosen by the client: replaying an item whose
+    key was already stored returns the existing expense instead of a duplicate.
+    Receipts are not accepted here; attach them with ``PUT /api/expenses/<id>``.
+    """
+    if not request.is_json:
+        return jsonify({"message": "Missing JSON data in request"}), 400
+
+    data = request.get_json()
+    if not isinstance(data, dict):
+        return jsonify({"message": "Request body must be a JSON object"}), 400
+    items = data.get("expenses")
+    if not isinstance(items, list):
+        return jsonify({"message": "Missing required field: expenses"}), 400
+    if len(items) > MAX_BATCH_SIZE:
+        return jsonify({"message": f"A batch may contain at most {MAX_BATCH_SIZE} records"}), 400
+
+    user = g.current_user
+    errors = [batch_item_error(item, ["id"]) for item in items]
+    items = [item if error is None else {} for item, error in zip(items, errors)]
+
+    # Resolve existing rows with one query each
+    expense_ids = {item["id"] for item in items if item.get("id") is not None}
+    client_keys = {item["client_key"] for item in items if item.get("client_key")}
+    expenses = {
+        expense.id: expense
+        for expense in Expense.query.filter(Expense.id.in_(expense_ids), Expense.user_id == user.id)
+    } if expense_ids else {}
+    keyed = {
+        expense.client_key: expense
+        for expense in Expense.query.filter(
+            Expense.client_key.in_(client_keys), Expense.user_id == user.id
+        )
+    } if client_keys else {}
+
+    required_fields = ["date", "title", "amount", "category", "payment_method", "status"]
+    results = []
+    touched = []
+    for index, item in enumerate(items):
+        client_key = item.get("client_key")
+        result = {"index": index, "client_key": client_key}
+        results.append(result)
+
+        if errors[index]:
+            result.update(status="error", message=errors[index])
+            continue
+
+        if client_key and client_key in keyed and item.get("id") is None:
+            result["status"] = "exists"
+            touched.append((result, keyed[client_key]))
+            continue
+
+        if item.get("id") is not None:
+            expense = expenses.get(item["id"])
+            if expense is None:
+                result.update(status="error", message="Expense not found")
+                continue
+            nulls = [field for field in required_fields if field in item and item[field] is None]
+            if nulls:
+                result.update(status="error", message=f"Field cannot be null: {nulls[0]}")
+                continue
+            status = "updated"
+        else:
+            missing = [field for field in required_fields if item.get(field) is None]
+            if missing:
+                result.update(status="error", message=f"Missing required field: {missing[0]}")
+                continue
+            expense = Expense(user_id=user.id, client_key=client_key)
+            status = "created"
+
+        try:
+            if "date" in item:
+                expense.date = datetime.strptime(item["date"], "%Y-%m-%d").date()
+            if "amount" in item:
+                expense.amount = Decimal(str(item["amount"]))
+            for field in ["title", "category", "payment_method", "status", "vendor"]:
+                if field in item:
+                    setattr(expense, field, item[field])
+        except (ValueError, TypeError, ArithmeticError) as e:
+            if status == "updated":
+                db.session.expire(expense)
+            result.update(status="error", message=f"Invalid data: {str(e)}")
+            continue
+
+        if status == "created":
+            db.session.add(expense)
+            if client_key:
+                keyed[client_key] = expense
+        result["status"] = status
+        touched.append((result, expense))
+
+    try:
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error saving expense batch: {str(e)}")
+        return jsonify({"message": "Error saving expenses"}), 500
+
+    for result, expense in touched:
+        result["id"] = expense.id
+        result["expense"] = {
+            "id": expense.id,
+            "date": expense.date.isoformat(),
+            "title": expense.title,
+            "amount": str(expense.amount),
+            "category": expense.category,
+            "payment_method": expense.payment_method,
+            "status": expense.status,
+            "vendor": expense.vendor,
+            "has_receipt": bool(expense.receipt_blob_name),
+        }
+
+    return jsonify({
+        "results": results,
+        "created": sum(1 for result in results if result["status"] == "created"),
+        "updated": sum(1 for result in results if result["status"] == "updated"),
+        "errors": sum(1 for result in results if result["status"] == "error"),
+    })
+
+
 @bp.route("/expenses/<int:id>", methods=["PUT"])
 @token_required
 def update_expense(id):
@@ -392,12 +598,13 @@ def update_expense(id):
                 return jsonify({"message": "Receipt file is too large. Maximum size is 5MB."}), 400
 
             try:
-                # Delete old receipt if it exists
-                if expense.receipt_blob_name:
-                    StorageService.delete_file(expense.receipt_blob_name, RECEIPT_CONTAINER)
+                # Attach the new file before releasing the old one so an identical
+                # re-upload keeps its blob
+                old_blob_name = expense.receipt_blob_name
+                blob_name, blob_url = ReceiptService.attach(receipt_file, RECEIPT_CONTAINER)
 
-                # Upload new file to Azure Blob Storage
-                blob_name, blob_url = StorageService.upload_file(receipt_file, RECEIPT_CONTAINER)
+                if old_blob_name:
+                    ReceiptService.release(old_blob_name, RECEIPT_CONTAINER)
 
                 # Store blob info in the expense record
                 expense.receipt_blob_name = blob_name
@@ -409,7 +616,7 @@ def update_expense(id):
         # Handle receipt deletion if requested
         if data.get("delete_receipt") == "true" and expense.receipt_blob_name:
             try:
-                StorageService.delete_file(expense.receipt_blob_name, RECEIPT_CONTAINER)
+                ReceiptService.release(expense.receipt_blob_name, RECEIPT_CONTAINER)
                 expense.receipt_blob_name = None
                 expense.receipt_url = None
             except Exception as e:
@@ -448,10 +655,10 @@ def delete_expense(id):
     expense = Expense.query.get_or_404(id)
 
     try:
-        # Delete receipt if it exists
+        # Release receipt if it exists
         if expense.receipt_blob_name:
             try:
-                StorageService.delete_file(expense.receipt_blob_name, RECEIPT_CONTAINER)
+                ReceiptService.release(expense.receipt_blob_name, RECEIPT_CONTAINER)
             except Exception as e:
                 current_app.logger.error(f"Error deleting receipt: {str(e)}")
 
@@ -469,6 +676,7 @@ def delete_expense(id):
 # Income endpoints
 @bp.route("/incomes", methods=["GET"])
 @token_required
+@conditional_get("incomes")
 def get_incomes():
     # Get query parameters for filtering
     client = request.args.get("client")
@@ -660,6 +868,7 @@ def delete_income(id):
 # Dashboard endpoints
 @bp.route("/dashboard", methods=["GET"])
 @token_required
+@conditional_get("expenses", "incomes")
 def get_dashboard():
     # Get time period from query parameters (default to current year)
     period = request.args.get("period", "year")
@@ -772,7 +981,7 @@ def get_dashboard():
         {
             "period": period,
             "start_date": start_date.isoformat(),
-            "end_date": (end_date - datetime.timedelta(days=1)).isoformat(),
+            "end_date": (end_date - timedelta(days=1)).isoformat(),
             "summary": {
                 "total_income": str(total_income),
                 "total_expense": str(total_expense),
@@ -786,6 +995,19 @@ def get_dashboard():
     )
 
 
+# Sync endpoints
+@bp.route("/sync", methods=["GET"])
+@token_required
+def sync():
+    """Return everything created, updated or deleted since the given sync token"""
+    try:
+        since = SyncService.parse_token(request.args.get("since"))
+    except ValueError:
+        return jsonify({"message": "Invalid sync token"}), 400
+
+    return jsonify(SyncService.changes_since(g.current_user.id, since))
+
+
 # Export endpoints
 @bp.route("/export/expenses", methods=["GET"])
 @token_required
@@ -865,6 +1087,7 @@ def export_incomes():
 # Reference data endpoints
 @bp.route("/references/categories", methods=["GET"])
 @token_required
+@conditional_get()
 def get_categories():
     from akowe.app.expense import CATEGORIES
 
@@ -873,6 +1096,7 @@ def get_categories():
 
 @bp.route("/references/payment-methods", methods=["GET"])
 @token_required
+@conditional_get()
 def get_payment_methods():
     from akowe.app.expense import PAYMENT_METHODS
 
@@ -881,6 +1105,7 @@ def get_payment_methods():
 
 @bp.route("/references/statuses", methods=["GET"])
 @token_required
+@conditional_get()
 def get_statuses():
     from akowe.app.expense import STATUSES
 
@@ -4,16 +4,21 @@ from functools import wraps
 
 from flask import Blueprint, request, jsonify, current_app, g
 from flask_login import current_user
+from sqlalchemy.orm import joinedload
 
+from akowe.api.serializers import timesheet_schema
 from akowe.models import db
 from akowe.models.client import Client
-from akowe.api.mobile_api import token_required
+from akowe.models.timesheet import Timesheet
+from akowe.api.mobile_api import token_required, conditional_get
+from akowe.services.timesheet_summary_service import TimesheetSummaryService
 
 bp = Blueprint("mobile_client", __name__, url_prefix="/api/clients")
 
 
 @bp.route("/", methods=["GET"])
 @token_required
+@conditional_get("clients", "projects", "invoices", "timesheets")
 def get_clients():
     """Get all clients with optional filtering"""
     # Get query parameters for filtering
@@ -340,27 +345,15 @@ def get_client_timesheets(id):
         return jsonify({"message": "Unauthorized access to this client"}), 403
     
     # Get timesheet entries for this client
-    entries = []
-    for entry in client.timesheet_entries.order_by(db.desc("date")):
-        project_name = entry.project_ref.name if entry.project_ref else "Unknown Project"
-        entries.append({
-            "id": entry.id,
-            "date": entry.date.isoformat(),
-            "project_id": entry.project_id,
-            "project_name": project_name,
-            "description": entry.description,
-            "hours": str(entry.hours),
-            "hourly_rate": str(entry.hourly_rate),
-            "amount": str(entry.amount),
-            "status": entry.status,
-            "invoice_id": entry.invoice_id
-        })
+    entries = [
+        timesheet_schema.dump(
+            entry, project_name=entry.project_ref.name if entry.project_ref else "Unknown Project"
+        )
+        for entry in client.timesheet_entries.options(joinedload(Timesheet.project_ref)).order_by(Timesheet.date.desc())
+    ]
     
-    # Calculate totals
-    total_hours = sum(entry.hours for entry in client.timesheet_entries)
-    total_amount = sum(entry.amount for entry in client.timesheet_entries)
-    unbilled_hours = sum(entry.hours for entry in client.timesheet_entries if entry.status == "pending")
-    unbilled_amount = sum(entry.amount for entry in client.timesheet_entries if entry.status == "pending")
+    # Calculate totals in one aggregate query
+    summary = TimesheetSummaryService.summarize(client_id=client.id)
     
     return jsonify({
         "client_id": client.id,
@@ -368,9 +361,9 @@ def get_client_timesheets(id):
         "timesheet_entries": entries,
         "count": len(entries),
         "summary": {
-            "total_hours": str(total_hours),
-            "total_amount": str(total_amount),
-            "unbilled_hours": str(unbilled_hours),
-            "unbilled_amount": str(unbilled_amount)
+            "total_hours": str(summary["total_hours"]),
+            "total_amount": str(summary["total_amount"]),
+            "unbilled_hours": str(summary["unbilled_hours"]),
+            "unbilled_amount": str(summary["unbilled_amount"])
         }
     })
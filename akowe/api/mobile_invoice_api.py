@@ -5,20 +5,25 @@ from functools import wraps
 
 from flask import Blueprint, request, jsonify, current_app, g
 from flask_login import current_user
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
 
+from akowe.api.serializers import decimal_str, invoice_schema
 from akowe.models import db
 from akowe.models.invoice import Invoice
 from akowe.models.client import Client
 from akowe.models.timesheet import Timesheet
 from akowe.models.income import Income
-from akowe.api.mobile_api import token_required
+from akowe.api.mobile_api import token_required, conditional_get
 from akowe.app.invoice import generate_invoice_number
+from akowe.services.ar_aging_service import ARAgingService
 
 bp = Blueprint("mobile_invoice", __name__, url_prefix="/api/invoices")
 
 
 @bp.route("/", methods=["GET"])
 @token_required
+@conditional_get("invoices", "clients", "timesheets")
 def get_invoices():
     """Get all invoices with optional filtering"""
     # Get filter parameters
@@ -54,31 +59,28 @@ def get_invoices():
         except ValueError:
             return jsonify({"message": "Invalid to_date format. Use YYYY-MM-DD"}), 400
     
-    # Execute query with ordering
-    invoices = query.order_by(Invoice.issue_date.desc()).all()
+    # Execute query with ordering, loading client names in the same query
+    invoices = query.options(joinedload(Invoice.client_ref)).order_by(Invoice.issue_date.desc()).all()
+
+    # Count linked timesheet entries for all invoices in one grouped query
+    timesheet_counts = {}
+    if invoices:
+        timesheet_counts = dict(
+            db.session.query(Timesheet.invoice_id, func.count(Timesheet.id))
+            .filter(Timesheet.invoice_id.in_([invoice.id for invoice in invoices]))
+            .group_by(Timesheet.invoice_id)
+            .all()
+        )
     
     # Format results
-    result = []
-    for invoice in invoices:
-        client_name = invoice.client_ref.name if invoice.client_ref else "Unknown Client"
-        result.append({
-            "id": invoice.id,
-            "invoice_number": invoice.invoice_number,
-            "client_id": invoice.client_id,
-            "client_name": client_name,
-            "issue_date": invoice.issue_date.isoformat(),
-            "due_date": invoice.due_date.isoformat(),
-            "subtotal": str(invoice.subtotal),
-            "tax_rate": str(invoice.tax_rate),
-            "tax_amount": str(invoice.tax_amount),
-            "total": str(invoice.total),
-            "status": invoice.status,
-            "sent_date": invoice.sent_date.isoformat() if invoice.sent_date else None,
-            "paid_date": invoice.paid_date.isoformat() if invoice.paid_date else None,
-            "created_at": invoice.created_at.isoformat() if invoice.created_at else None,
-            "updated_at": invoice.updated_at.isoformat() if invoice.updated_at else None,
-            "timesheet_count": len(invoice.timesheet_entries)
-        })
+    result = [
+        invoice_schema.dump(
+            invoice,
+            client_name=invoice.client_ref.name if invoice.client_ref else "Unknown Client",
+            timesheet_count=timesheet_counts.get(invoice.id, 0),
+        )
+        for invoice in invoices
+    ]
     
     # Calculate totals
     total_paid = sum(invoice.total for invoice in invoices if invoice.status == "paid")
@@ -211,16 +213,7 @@ def create_invoice():
         
         # Process selected timesheet entries if provided
         if "timesheet_ids" in data and isinstance(data["timesheet_ids"], list):
-            timesheet_ids = data["timesheet_ids"]
-            timesheet_entries = Timesheet.query.filter(
-                Timesheet.id.in_(timesheet_ids),
-                Timesheet.user_id == g.current_user.id,
-                Timesheet.status == "pending"
-            ).all()
-            
-            for entry in timesheet_entries:
-                entry.invoice_id = invoice.id
-                entry.status = "billed"
+            invoice.attach_timesheets(data["timesheet_ids"])
         
         # Calculate totals
         invoice.calculate_totals()
@@ -303,36 +296,12 @@ def update_invoice(id):
         
         # Update timesheet entries if provided
         if "timesheet_ids" in data and isinstance(data["timesheet_ids"], list):
-            # Get currently selected entries
-            current_entries = {entry.id: entry for entry in invoice.timesheet_entries}
-            
             # Get newly selected entries
             new_entry_ids = set(map(int, data["timesheet_ids"]))
             
-            # Remove entries that are no longer selected
-            for entry_id, entry in current_entries.items():
-                if entry_id not in new_entry_ids:
-                    entry.invoice_id = None
-                    entry.status = "pending"
-            
-            # Add newly selected entries
-            if new_entry_ids:
-                # Get eligible entries (unbilled or already on this invoice)
-                eligible_entries = Timesheet.query.filter(
-                    Timesheet.user_id == g.current_user.id,
-                    db.or_(
-                        Timesheet.status == "pending",
-                        db.and_(Timesheet.status == "billed", Timesheet.invoice_id == invoice.id)
-                    )
-                ).all()
-                
-                eligible_entries_dict = {entry.id: entry for entry in eligible_entries}
-                
-                for entry_id in new_entry_ids:
-                    if entry_id in eligible_entries_dict:
-                        entry = eligible_entries_dict[entry_id]
-                        entry.invoice_id = invoice.id
-                        entry.status = "billed"
+            # Remove entries that are no longer selected, then add newly selected ones
+            invoice.detach_timesheets(keep_ids=new_entry_ids)
+            invoice.attach_timesheets(new_entry_ids)
         
         # Recalculate totals
         invoice.calculate_totals()
@@ -382,9 +351,7 @@ def delete_invoice(id):
     
     try:
         # Update timesheet entries
-        for entry in invoice.timesheet_entries:
-            entry.invoice_id = None
-            entry.status = "pending"
+        invoice.detach_timesheets()
         
         # Delete the invoice
         db.session.delete(invoice)
@@ -496,6 +463,7 @@ def mark_paid(id):
 
 @bp.route("/unbilled-timesheets", methods=["GET"])
 @token_required
+@conditional_get("timesheets", "clients", "projects")
 def get_unbilled_timesheets():
     """Get all unbilled timesheet entries"""
     # Get filter parameters
@@ -572,6 +540,44 @@ def get_unbilled_timesheets():
     })
 
 
+@bp.route("/aging", methods=["GET"])
+@token_required
+def get_aging_report():
+    """Get the accounts-receivable aging report, per client
+    
+    Query Parameters:
+        as_of (str): Optional date (YYYY-MM-DD) to age invoices against
+        format (str): ``csv`` to return the report as ``csv_data``
+    """
+    as_of = None
+    if request.args.get("as_of"):
+        try:
+            as_of = datetime.strptime(request.args["as_of"], "%Y-%m-%d").date()
+        except ValueError:
+            return jsonify({"message": "Invalid as_of format. Use YYYY-MM-DD"}), 400
+    
+    report = ARAgingService.report(g.current_user.id, as_of)
+    
+    if request.args.get("format") == "csv":
+        csv_data, filename = ARAgingService.to_csv(report)
+        return jsonify({"csv_data": csv_data.getvalue().decode("utf-8"), "filename": filename})
+    
+    measures = (*ARAgingService.BUCKETS, "total")
+    
+    def serialize(row):
+        return {
+            **{key: row[key] for key in ("client_id", "client_name", "invoice_count") if key in row},
+            **{key: decimal_str(row[key]) for key in measures},
+        }
+    
+    return jsonify({
+        "as_of": report["as_of"].isoformat(),
+        "buckets": {key: label for key, (label, _, _) in ARAgingService.BUCKETS.items()},
+        "clients": [serialize(row) for row in report["clients"]],
+        "totals": serialize(report["totals"]),
+    })
+
+
 @bp.route("/statuses", methods=["GET"])
 @token_required
 def get_invoice_statuses():
@@ -9,13 +9,15 @@ from flask_login import current_user
 from akowe.models import db
 from akowe.models.project import Project
 from akowe.models.client import Client
-from akowe.api.mobile_api import token_required
+from akowe.api.mobile_api import token_required, conditional_get
+from akowe.services.timesheet_summary_service import TimesheetSummaryService
 
 bp = Blueprint("mobile_project", __name__, url_prefix="/api/projects")
 
 
 @bp.route("/", methods=["GET"])
 @token_required
+@conditional_get("projects", "clients", "timesheets")
 def get_projects():
     """Get all projects with optional filtering"""
     # Get query parameters for filtering
@@ -92,11 +94,8 @@ def get_project(id):
             "invoice_id": entry.invoice_id
         })
     
-    # Calculate project statistics
-    total_hours = sum(entry.hours for entry in project.timesheet_entries)
-    total_amount = sum(entry.amount for entry in project.timesheet_entries)
-    unbilled_hours = sum(entry.hours for entry in project.timesheet_entries if entry.status == "pending")
-    unbilled_amount = sum(entry.amount for entry in project.timesheet_entries if entry.status == "pending")
+    # Calculate project statistics in one aggregate query
+    summary = TimesheetSummaryService.summarize(project_id=project.id)
     
     return jsonify({
         "id": project.id,
@@ -110,11 +109,11 @@ def get_project(id):
         "updated_at": project.updated_at.isoformat() if project.updated_at else None,
         "recent_timesheet_entries": timesheet_entries,
         "statistics": {
-            "total_hours": str(total_hours),
-            "total_amount": str(total_amount),
-            "unbilled_hours": str(unbilled_hours),
-            "unbilled_amount": str(unbilled_amount),
-            "timesheet_count": project.timesheet_entries.count()
+            "total_hours": str(summary["total_hours"]),
+            "total_amount": str(summary["total_amount"]),
+            "unbilled_hours": str(summary["unbilled_hours"]),
+            "unbilled_amount": str(summary["unbilled_amount"]),
+            "timesheet_count": summary["entry_count"]
         }
     })
 
@@ -321,11 +320,8 @@ def get_project_timesheets(id):
             "updated_at": entry.updated_at.isoformat() if entry.updated_at else None
         })
     
-    # Calculate totals
-    total_hours = sum(entry.hours for entry in project.timesheet_entries)
-    total_amount = sum(entry.amount for entry in project.timesheet_entries)
-    unbilled_hours = sum(entry.hours for entry in project.timesheet_entries if entry.status == "pending")
-    unbilled_amount = sum(entry.amount for entry in project.timesheet_entries if entry.status == "pending")
+    # Calculate totals in one aggregate query
+    summary = TimesheetSummaryService.summarize(project_id=project.id)
     
     return jsonify({
         "project_id": project.id,
@@ -335,10 +331,10 @@ def get_project_timesheets(id):
         "timesheet_entries": entries,
         "count": len(entries),
         "summary": {
-            "total_hours": str(total_hours),
-            "total_amount": str(total_amount),
-            "unbilled_hours": str(unbilled_hours),
-            "unbilled_amount": str(unbilled_amount)
+            "total_hours": str(summary["total_hours"]),
+            "total_amount": str(summary["total_amount"]),
+            "unbilled_hours": str(summary["unbilled_hours"]),
+            "unbilled_amount": str(summary["unbilled_amount"])
         }
     })
 
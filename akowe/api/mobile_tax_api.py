@@ -1,5 +1,5 @@
 import os
-from datetime import datetime, timedelta
+from datetime import datetime
 from decimal import Decimal
 from functools import wraps
 
@@ -10,16 +10,23 @@ from sqlalchemy import extract
 from akowe.models import db
 from akowe.models.expense import Expense
 from akowe.models.income import Income
-from akowe.api.mobile_api import token_required
+from akowe.api.mobile_api import token_required, conditional_get
+from akowe.api.serializers import decimal_str
+from akowe.services.remittance_service import RemittanceReportService
 from akowe.services.tax_prediction_service import TaxPredictionService
 from akowe.services.tax_recommendation_service import TaxRecommendationService
-from akowe.app.tax_dashboard import CRA_TAX_CATEGORIES, GST_HST_RATES, TAX_QUARTERS, CCA_CLASSES
+from akowe.services.tax_scenario_service import TaxScenarioService
+from akowe.services.tax_tables import tax_year
+from akowe.app.tax_dashboard import (
+    CRA_TAX_CATEGORIES, GST_HST_RATES, TAX_QUARTERS, CCA_CLASSES, MIN_TAX_YEAR, MAX_TAX_YEAR
+)
 
 bp = Blueprint("mobile_tax", __name__, url_prefix="/api/tax")
 
 
 @bp.route("/dashboard", methods=["GET"])
 @token_required
+@conditional_get("expenses", "incomes")
 def get_tax_dashboard():
     """Get tax dashboard data"""
     # Get current year and selected year from query param
@@ -55,7 +62,7 @@ def get_tax_dashboard():
     tax_prediction = None
     if selected_year == current_year:
         tax_prediction = TaxPredictionService.predict_tax_obligation(
-            yearly_income, yearly_expenses, selected_province, selected_year
+            yearly_income, yearly_expenses, selected_province, selected_year, g.current_user.id
         )
     
     # Prepare expense data by tax categories for CRA
@@ -90,39 +97,21 @@ def get_tax_dashboard():
     # Sort by amount (descending)
     formatted_cra_categories.sort(key=lambda x: Decimal(x["amount"]), reverse=True)
     
-    # Get quarterly data for GST/HST reporting
+    # Get quarterly data for GST/HST reporting, summed per quarter in SQL
+    remittance = RemittanceReportService.report(
+        selected_year, selected_province, "quarterly", g.current_user.id
+    )
     quarterly_data = {}
-    for quarter_num, quarter_info in TAX_QUARTERS.items():
-        start_month = quarter_info["start_month"]
-        end_month = quarter_info["end_month"]
-        
-        quarter_start = datetime(selected_year, start_month, 1).date()
-        if end_month == 12:
-            quarter_end = datetime(selected_year, 12, 31).date()
-        else:
-            quarter_end = datetime(selected_year, end_month + 1, 1).date() - timedelta(days=1)
-        
-        quarter_expenses = Expense.query.filter(
-            Expense.user_id == g.current_user.id,
-            Expense.date >= quarter_start, 
-            Expense.date <= quarter_end
-        ).all()
-        
-        quarter_income = Income.query.filter(
-            Income.user_id == g.current_user.id,
-            Income.date >= quarter_start, 
-            Income.date <= quarter_end
-        ).all()
-        
-        quarter_expense_total = sum(expense.amount for expense in quarter_expenses)
-        quarter_income_total = sum(income.amount for income in quarter_income)
-        
+    for quarter_info, period in zip(TAX_QUARTERS.values(), remittance["periods"]):
         quarterly_data[quarter_info["name"]] = {
-            "expenses": str(quarter_expense_total),
-            "income": str(quarter_income_total),
-            "net": str(quarter_income_total - quarter_expense_total),
-            "start_date": quarter_start.isoformat(),
-            "end_date": quarter_end.isoformat()
+            "expenses": str(period["total_purchases"]),
+            "income": str(period["total_sales"]),
+            "net": str(period["total_sales"] - period["total_purchases"]),
+            "tax_collected": str(period["tax_collected"]),
+            "net_remittance": str(period["net_remittance"]),
+            "start_date": period["start_date"].isoformat(),
+            "end_date": period["end_date"].isoformat(),
+            "due_date": period["due_date"].isoformat()
         }
     
     # Calculate GST/HST collected and paid (input tax credits)
@@ -213,6 +202,9 @@ def get_tax_dashboard():
         }
     ]
     
+    # Income tax and CPP from the same bracket tables as the web dashboard and prediction
+    estimate = tax_year(selected_year).estimate(yearly_net_income, selected_province)
+    
     return jsonify({
         "selected_year": selected_year,
         "available_years": available_years,
@@ -231,6 +223,9 @@ def get_tax_dashboard():
             "paid": str(gst_hst_paid),
             "owing": str(gst_hst_owing)
         },
+        "income_tax": {
+            key: str(value.quantize(Decimal("0.01"))) for key, value in estimate.items()
+        },
         "cca_items": cca_items,
         "tax_deadlines": tax_deadlines,
         "tax_prediction": tax_prediction
@@ -241,8 +236,9 @@ def get_tax_dashboard():
 @token_required
 def get_tax_prediction():
     """Get tax prediction data"""
-    # Get current year
-    current_year = datetime.now().year
+    current_year = request.args.get("year", type=int, default=datetime.now().year)
+    if not MIN_TAX_YEAR <= current_year <= MAX_TAX_YEAR:
+        return jsonify({"message": f"Year must be between {MIN_TAX_YEAR} and {MAX_TAX_YEAR}"}), 400
     
     # Get selected province for tax calculations
     selected_province = request.args.get("province", default="Ontario")
@@ -266,7 +262,7 @@ def get_tax_prediction():
     
     # Get tax prediction
     tax_prediction = TaxPredictionService.predict_tax_obligation(
-        yearly_income, yearly_expenses, selected_province, current_year
+        yearly_income, yearly_expenses, selected_province, current_year, g.current_user.id
     )
     
     return jsonify({
@@ -277,6 +273,133 @@ def get_tax_prediction():
     })
 
 
+@bp.route("/remittance", methods=["GET"])
+@token_required
+def get_remittance_report():
+    """Get GST/HST collected, input tax credits and net remittance per filing period
+    
+    Query Parameters:
+        year (int): Tax year; defaults to the current year
+        province (str): Province whose sales tax rates apply
+        period (str): ``monthly``, ``quarterly`` (default) or ``annual``
+        format (str): ``csv`` to return the report as ``csv_data``
+    """
+    selected_year = request.args.get("year", type=int, default=datetime.now().year)
+    selected_province = request.args.get("province", default="Ontario")
+    period = request.args.get("period", default="quarterly")
+    
+    if not MIN_TAX_YEAR <= selected_year <= MAX_TAX_YEAR:
+        return jsonify({"message": f"Year must be between {MIN_TAX_YEAR} and {MAX_TAX_YEAR}"}), 400
+    if period not in RemittanceReportService.PERIODS:
+        return jsonify({"message": "Invalid period. Use monthly, quarterly or annual"}), 400
+    
+    report = RemittanceReportService.report(selected_year, selected_province, period, g.current_user.id)
+    
+    if request.args.get("format") == "csv":
+        csv_data, filename = RemittanceReportService.to_csv(report)
+        return jsonify({"csv_data": csv_data.getvalue().decode("utf-8"), "filename": filename})
+    
+    def serialize(row):
+        result = {key: row[key] for key in ("period", "label", "income_count", "expense_count") if key in row}
+        for key in ("start_date", "end_date", "due_date"):
+            if key in row:
+                result[key] = row[key].isoformat()
+        result.update({key: decimal_str(row[key]) for key in RemittanceReportService.MEASURES})
+        return result
+    
+    return jsonify({
+        "year": report["year"],
+        "province": report["province"],
+        "period": report["period"],
+        "tax_label": report["tax_label"],
+        "periods": [serialize(row) for row in report["periods"]],
+        "totals": serialize(report["totals"]),
+    })
+
+
+@bp.route("/scenarios", methods=["POST"])
+@token_required
+def evaluate_tax_scenarios():
+    """Evaluate what-if tax scenarios in one call
+    
+    JSON Body:
+        year (int): Tax year; defaults to the current year
+        province (str): Province of residence
+        net_income (decimal): Net business income; defaults to the year's projection
+        scenarios (list): Scenarios with ``extra_expense``, ``rrsp_contribution``,
+            ``incorporate`` and ``salary``
+        sweep (dict): Instead of ``scenarios``, ``field``, ``start``, ``stop``,
+            ``step`` and optional ``base`` fields to evaluate over a range
+    """
+    if not request.is_json:
+        return jsonify({"message": "Missing JSON data in request"}), 400
+    
+    data = request.get_json()
+    if "scenarios" not in data and "sweep" not in data:
+        return jsonify({"message": "Missing required field: scenarios or sweep"}), 400
+    if "sweep" in data and not isinstance(data["sweep"], dict):
+        return jsonify({"message": "sweep must be an object"}), 400
+    if "sweep" not in data and not (
+        isinstance(data["scenarios"], list) and all(isinstance(row, dict) for row in data["scenarios"])
+    ):
+        return jsonify({"message": "scenarios must be a list of objects"}), 400
+    
+    selected_province = data.get("province") or "Ontario"
+    
+    try:
+        selected_year = int(data.get("year") or datetime.now().year)
+        if data.get("net_income") is not None:
+            net_income = Decimal(str(data["net_income"]))
+        else:
+            year_start_date = datetime(selected_year, 1, 1).date()
+            year_end_date = datetime(selected_year, 12, 31).date()
+            prediction = TaxPredictionService.predict_tax_obligation(
+                Income.query.filter(
+                    Income.user_id == g.current_user.id,
+                    Income.date >= year_start_date,
+                    Income.date <= year_end_date
+                ).all(),
+                Expense.query.filter(
+                    Expense.user_id == g.current_user.id,
+                    Expense.date >= year_start_date,
+                    Expense.date <= year_end_date
+                ).all(),
+                selected_province,
+                selected_year,
+                g.current_user.id
+            )
+            net_income = prediction["projected_net_income"]
+        
+        if "sweep" in data:
+            sweep = data["sweep"]
+            result = TaxScenarioService.sweep(
+                net_income,
+                sweep.get("field"),
+                sweep.get("start", 0),
+                sweep.get("stop", 0),
+                sweep.get("step", 1),
+                sweep.get("base"),
+                selected_province,
+                selected_year
+            )
+        else:
+            result = TaxScenarioService.evaluate(net_income, data["scenarios"], selected_province, selected_year)
+    except (ValueError, TypeError, ArithmeticError) as e:
+        return jsonify({"message": f"Invalid scenario: {e}"}), 400
+    
+    def serialize(row):
+        return {key: decimal_str(value) if isinstance(value, Decimal) else value for key, value in row.items()}
+    
+    return jsonify({
+        "year": result["year"],
+        "table_year": result["table_year"],
+        "province": result["province"],
+        "net_income": decimal_str(result["net_income"]),
+        "baseline": serialize(result["baseline"]),
+        "scenarios": [serialize(row) for row in result["scenarios"]],
+    })
+
+
 @bp.route("/category-suggestions", methods=["POST"])
 @token_required
 def get_category_suggestions():
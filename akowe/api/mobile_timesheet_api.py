@@ -5,12 +5,15 @@ from functools import wraps
 
 from flask import Blueprint, request, jsonify, current_app, g
 from flask_login import current_user
+from sqlalchemy.orm import joinedload
 
+from akowe.api.serializers import timesheet_schema
 from akowe.models import db
 from akowe.models.timesheet import Timesheet
 from akowe.models.client import Client
 from akowe.models.project import Project
-from akowe.api.mobile_api import token_required
+from akowe.api.mobile_api import token_required, conditional_get, batch_item_error, MAX_BATCH_SIZE
+from akowe.services.timesheet_grid_service import TimesheetGridService
 from akowe.utils.timezone import to_utc, to_local_time, local_date_input
 
 bp = Blueprint("mobile_timesheet", __name__, url_prefix="/api/timesheets")
@@ -18,6 +21,7 @@ bp = Blueprint("mobile_timesheet", __name__, url_prefix="/api/timesheets")
 
 @bp.route("/", methods=["GET"])
 @token_required
+@conditional_get("timesheets", "clients", "projects")
 def get_timesheets():
     """Get all timesheet entries with optional filtering"""
     # Get filter parameters
@@ -60,32 +64,22 @@ def get_timesheets():
         except ValueError:
             return jsonify({"message": "Invalid to_date format. Use YYYY-MM-DD"}), 400
     
-    # Execute query with ordering
-    entries = query.order_by(Timesheet.date.desc()).all()
+    # Execute query with ordering, loading names in the same query
+    entries = (
+        query.options(joinedload(Timesheet.client_ref), joinedload(Timesheet.project_ref))
+        .order_by(Timesheet.date.desc())
+        .all()
+    )
     
     # Format results
-    result = []
-    for entry in entries:
-        # Get client and project names
-        client_name = entry.client_ref.name if entry.client_ref else "Unknown Client"
-        project_name = entry.project_ref.name if entry.project_ref else "Unknown Project"
-        
-        result.append({
-            "id": entry.id,
-            "date": entry.date.isoformat(),
-            "client_id": entry.client_id,
-            "client_name": client_name,
-            "project_id": entry.project_id,
-            "project_name": project_name,
-            "description": entry.description,
-            "hours": str(entry.hours),
-            "hourly_rate": str(entry.hourly_rate),
-            "amount": str(entry.amount),
-            "status": entry.status,
-            "invoice_id": entry.invoice_id,
-            "created_at": entry.created_at.isoformat() if entry.created_at else None,
-            "updated_at": entry.updated_at.isoformat() if entry.updated_at else None,
-        })
+    result = [
+        timesheet_schema.dump(
+            entry,
+            client_name=entry.client_ref.name if entry.client_ref else "Unknown Client",
+            project_name=entry.project_ref.name if entry.project_ref else "Unknown Project",
+        )
+        for entry in entries
+    ]
     
     # Calculate totals
     total_hours = sum(entry.hours for entry in entries)
@@ -328,8 +322,201 @@ def delete_timesheet(id):
         return jsonify({"message": f"Error deleting timesheet entry: {str(e)}"}), 500
 
 
+# Fields a new batch item must provide; none of them may be null
+REQUIRED_BATCH_FIELDS = ["date", "client_id", "project_id", "description", "hours"]
+
+
+def _parse_timesheet_item(item, entry, projects):
+    """Apply the fields of a batch item to a timesheet entry, raising ValueError on bad input"""
+    if "date" in item:
+        entry.date = datetime.strptime(item["date"], "%Y-%m-%d").date()
+    if "client_id" in item:
+        entry.client_id = item["client_id"]
+    if "project_id" in item:
+        project = projects[item["project_id"]]
+        entry.project_id = project.id
+        if project.hourly_rate and "hourly_rate" not in item:
+            entry.hourly_rate = project.hourly_rate
+    if "description" in item:
+        entry.description = item["description"]
+    if "hours" in item:
+        entry.hours = Decimal(str(item["hours"]))
+    if "hourly_rate" in item and item["hourly_rate"]:
+        entry.hourly_rate = Decimal(str(item["hourly_rate"]))
+
+
+@bp.route("/batch", methods=["POST"])
+@token_required
+def batch_timesheets():
+    """Create or update many timesheet entries in one transaction
+
+    Items with an ``id`` update that entry; other items create a new one. Each
+    item may carry a ``client_key`` chosen by the client: replaying an item whose
+    key was already stored returns the existing entry instead of a duplicate.
+    """
+    if not request.is_json:
+        return jsonify({"message": "Missing JSON data in request"}), 400
+
+    data = request.get_json()
+    if not isinstance(data, dict):
+        return jsonify({"message": "Request body must be a JSON object"}), 400
+    items = data.get("timesheets")
+    if not isinstance(items, list):
+        return jsonify({"message": "Missing required field: timesheets"}), 400
+    if len(items) > MAX_BATCH_SIZE:
+        return jsonify({"message": f"A batch may contain at most {MAX_BATCH_SIZE} records"}), 400
+
+    user = g.current_user
+    errors = [batch_item_error(item, ["id", "client_id", "project_id"]) for item in items]
+    items = [item if error is None else {} for item, error in zip(items, errors)]
+
+    # Resolve every referenced row with one query per entity type
+    client_ids = {item["client_id"] for item in items if item.get("client_id") is not None}
+    project_ids = {item["project_id"] for item in items if item.get("project_id") is not None}
+    entry_ids = {item["id"] for item in items if item.get("id") is not None}
+    client_keys = {item["client_key"] for item in items if item.get("client_key")}
+
+    clients = {
+        client.id: client
+        for client in Client.query.filter(Client.id.in_(client_ids), Client.user_id == user.id)
+    } if client_ids else {}
+    projects = {
+        project.id: project
+        for project in Project.query.filter(Project.id.in_(project_ids), Project.user_id == user.id)
+    } if project_ids else {}
+    entries = {
+        entry.id: entry
+        for entry in Timesheet.query.filter(Timesheet.id.in_(entry_ids), Timesheet.user_id == user.id)
+    } if entry_ids else {}
+    keyed = {
+        entry.client_key: entry
+        for entry in Timesheet.query.filter(
+            Timesheet.client_key.in_(client_keys), Timesheet.user_id == user.id
+        )
+    } if client_keys else {}
+
+    results = []
+    touched = []
+    for index, item in enumerate(items):
+        client_key = item.get("client_key")
+        result = {"index": index, "client_key": client_key}
+        results.append(result)
+
+        if errors[index]:
+            result.update(status="error", message=errors[index])
+            continue
+
+        if client_key and client_key in keyed and item.get("id") is None:
+            result["status"] = "exists"
+            touched.append((result, keyed[client_key]))
+            continue
+
+        if item.get("client_id") is not None and item["client_id"] not in clients:
+            result.update(status="error", message="Invalid client_id")
+            continue
+        if item.get("project_id") is not None and item["project_id"] not in projects:
+            result.update(status="error", message="Invalid project_id")
+            continue
+
+        if item.get("id") is not None:
+            entry = entries.get(item["id"])
+            if entry is None:
+                result.update(status="error", message="Timesheet entry not found")
+                continue
+            if entry.status != "pending":
+                result.update(
+                    status="error",
+                    message="Cannot edit a timesheet entry that has already been billed or paid",
+                )
+                continue
+            nulls = [field for field in REQUIRED_BATCH_FIELDS if field in item and item[field] is None]
+            if nulls:
+                result.update(status="error", message=f"Field cannot be null: {nulls[0]}")
+                continue
+            status = "updated"
+        else:
+            missing = [field for field in REQUIRED_BATCH_FIELDS if item.get(field) is None]
+            if missing:
+                result.update(status="error", message=f"Missing required field: {missing[0]}")
+                continue
+            entry = Timesheet(
+                status="pending",
+                user_id=user.id,
+                client_key=client_key,
+                hourly_rate=user.hourly_rate or Decimal("0"),
+            )
+            status = "created"
+
+        try:
+            _parse_timesheet_item(item, entry, projects)
+        except (ValueError, TypeError, KeyError, ArithmeticError) as e:
+            if status == "updated":
+                db.session.expire(entry)
+            result.update(status="error", message=f"Invalid data: {str(e)}")
+            continue
+
+        if status == "created":
+            db.session.add(entry)
+            if client_key:
+                keyed[client_key] = entry
+        result["status"] = status
+        touched.append((result, entry))
+
+    try:
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error saving timesheet batch: {str(e)}")
+        return jsonify({"message": "Error saving timesheet entries"}), 500
+
+    for result, entry in touched:
+        client = clients.get(entry.client_id) or entry.client_ref
+        project = projects.get(entry.project_id) or entry.project_ref
+        result["id"] = entry.id
+        result["timesheet"] = {
+            "id": entry.id,
+            "date": entry.date.isoformat(),
+            "client_id": entry.client_id,
+            "client_name": client.name if client else "Unknown Client",
+            "project_id": entry.project_id,
+            "project_name": project.name if project else "Unknown Project",
+            "description": entry.description,
+            "hours": str(entry.hours),
+            "hourly_rate": str(entry.hourly_rate),
+            "amount": str(entry.amount),
+            "status": entry.status,
+        }
+
+    return jsonify({
+        "results": results,
+        "created": sum(1 for result in results if result["status"] == "created"),
+        "updated": sum(1 for result in results if result["status"] == "updated"),
+        "errors": sum(1 for result in results if result["status"] == "error"),
+    })
+
+
+def _serialize_grid_day(day, include_entries=True):
+    """Format one day of a TimesheetGridService grid for JSON"""
+    result = {
+        "date": day["date"].isoformat(),
+        "day_of_week": day["date"].strftime("%A"),
+        "total_hours": str(day["total_hours"]),
+    }
+    if include_entries:
+        result["entries"] = [
+            timesheet_schema.dump(
+                entry,
+                client_name=entry.client_ref.name if entry.client_ref else "Unknown Client",
+                project_name=entry.project_ref.name if entry.project_ref else "Unknown Project",
+            )
+            for entry in day["entries"]
+        ]
+    return result
+
+
 @bp.route("/weekly", methods=["GET"])
 @token_required
+@conditional_get("timesheets", "clients", "projects")
 def get_weekly_timesheet():
     """Get weekly timesheet data"""
     # Get the requested week (default to current week)
@@ -348,57 +535,11 @@ def get_weekly_timesheet():
     # Calculate week end (Sunday)
     week_end = week_start + timedelta(days=6)
     
-    # Get entries for the week
-    entries = (
-        Timesheet.query.filter(
-            Timesheet.user_id == g.current_user.id,
-            Timesheet.date >= week_start,
-            Timesheet.date <= week_end,
-        )
-        .order_by(Timesheet.date)
-        .all()
-    )
-    
-    # Organize entries by day
-    days = []
-    daily_totals = {}
-    
-    for i in range(7):
-        day_date = week_start + timedelta(days=i)
-        day_entries = [e for e in entries if e.date == day_date]
-        
-        # Format entries for this day
-        formatted_entries = []
-        for entry in day_entries:
-            client_name = entry.client_ref.name if entry.client_ref else "Unknown Client"
-            project_name = entry.project_ref.name if entry.project_ref else "Unknown Project"
-            
-            formatted_entries.append({
-                "id": entry.id,
-                "client_id": entry.client_id,
-                "client_name": client_name,
-                "project_id": entry.project_id,
-                "project_name": project_name,
-                "description": entry.description,
-                "hours": str(entry.hours),
-                "hourly_rate": str(entry.hourly_rate),
-                "amount": str(entry.amount),
-                "status": entry.status,
-            })
-        
-        day_hours = sum(e.hours for e in day_entries)
-        
-        days.append({
-            "date": day_date.isoformat(),
-            "day_of_week": day_date.strftime("%A"),
-            "entries": formatted_entries,
-            "total_hours": str(day_hours)
-        })
-        
-        daily_totals[day_date.isoformat()] = str(day_hours)
-    
-    # Get total hours for the week
-    total_hours = sum(Decimal(day["total_hours"]) for day in days)
+    # Bucket the week's entries by day in one pass
+    grid = TimesheetGridService.build(g.current_user.id, week_start, week_end)
+    days = [_serialize_grid_day(day) for day in grid["days"]]
+    daily_totals = {day["date"]: day["total_hours"] for day in days}
+    total_hours = grid["total_hours"]
     
     # Get previous and next week dates for navigation
     prev_week = (week_start - timedelta(days=7)).isoformat()
@@ -413,3 +554,45 @@ def get_weekly_timesheet():
         "next_week": next_week,
         "daily_totals": daily_totals
     })
+
+
+@bp.route("/grid", methods=["GET"])
+@token_required
+@conditional_get("timesheets", "clients", "projects")
+def get_timesheet_grid():
+    """Get hours per day and per project for a week, a month or a custom range"""
+    try:
+        if request.args.get("start_date") or request.args.get("end_date"):
+            start = datetime.strptime(request.args.get("start_date", ""), "%Y-%m-%d").date()
+            end = datetime.strptime(request.args.get("end_date", ""), "%Y-%m-%d").date()
+        else:
+            anchor_str = request.args.get("date")
+            anchor = datetime.strptime(anchor_str, "%Y-%m-%d").date() if anchor_str else datetime.now().date()
+            start, end = TimesheetGridService.period_bounds(request.args.get("period", "week"), anchor)
+    except ValueError:
+        return jsonify({
+            "message": "Use period=week|month with date=YYYY-MM-DD, or start_date and end_date as YYYY-MM-DD"
+        }), 400
+    
+    include_entries = request.args.get("entries", "true").lower() != "false"
+    try:
+        grid = TimesheetGridService.build(g.current_user.id, start, end, include_entries=include_entries)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    
+    return jsonify({
+        "start_date": start.isoformat(),
+        "end_date": end.isoformat(),
+        "days": [_serialize_grid_day(day, include_entries) for day in grid["days"]],
+        "projects": [
+            {
+                "project_id": project["project_id"],
+                "project_name": project["project_name"],
+                "client_name": project["client_name"],
+                "total_hours": str(project["total_hours"]),
+                "daily_hours": {day.isoformat(): str(hours) for day, hours in project["daily_hours"].items()},
+            }
+            for project in grid["projects"]
+        ],
+        "total_hours": str(grid["total_hours"]),
+    })
@@ -0,0 +1,121 @@
+"""JSON schemas for API payloads.
+
+Each schema inspects its model's column types once, at import, and keeps a
+fixed list of (field, converter) pairs. Dumping a row is then a single
+attribute fetch plus the precomputed conversions: Decimals become strings and
+dates/datetimes become ISO 8601 strings, matching the hand-written payloads
+the mobile clients already parse.
+"""
+
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence
+
+from sqlalchemy import Date, DateTime, Numeric
+
+from akowe.models.client import Client
+from akowe.models.expense import Expense
+from akowe.models.income import Income
+from akowe.models.invoice import Invoice
+from akowe.models.project import Project
+from akowe.models.timesheet import Timesheet
+
+
+def decimal_str(value) -> Optional[str]:
+    return str(value) if value is not None else None
+
+
+def iso(value) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def _converter(column) -> Optional[Callable[[Any], Any]]:
+    """Pick the JSON conversion for a column, or None if the value is JSON-native."""
+    if isinstance(column.type, Numeric):
+        return decimal_str
+    if isinstance(column.type, (Date, DateTime)):
+        return iso
+    return None
+
+
+class Schema:
+    """Serializes instances of one model to dictionaries.
+
+    Args:
+        model: The SQLAlchemy model class
+        fields: Column names to include, in output order
+        computed: Extra output fields mapped to functions of the instance
+    """
+
+    def __init__(
+        self,
+        model,
+        fields: Sequence[str],
+        computed: Optional[Mapping[str, Callable[[Any], Any]]] = None,
+    ):
+        columns = model.__table__.columns
+        self.model = model
+        self.fields = tuple(fields)
+        self._converters = tuple(_converter(columns[name]) for name in self.fields)
+        self._getter = attrgetter(*self.fields)
+        self._computed = tuple((computed or {}).items())
+
+    def dump(self, obj, **extra) -> Dict[str, Any]:
+        """Serialize one instance; keyword arguments are added to the result."""
+        values = self._getter(obj)
+        if len(self.fields) == 1:
+            values = (values,)
+
+        data = {
+            name: convert(value) if convert and value is not None else value
+            for name, convert, value in zip(self.fields, self._converters, values)
+        }
+        for name, func in self._computed:
+            data[name] = func(obj)
+        if extra:
+            data.update(extra)
+        return data
+
+    def dump_many(self, objs: Iterable) -> List[Dict[str, Any]]:
+        """Serialize an iterable of instances."""
+        dump = self.dump
+        return [dump(obj) for obj in objs]
+
+
+expense_schema = Schema(
+    Expense,
+    ["id", "date", "title", "amount", "category", "payment_method", "status", "vendor",
+     "created_at", "updated_at"],
+    computed={"has_receipt": lambda expense: bool(expense.receipt_blob_name)},
+)
+
+income_schema = Schema(
+    Income,
+    ["id", "date", "amount", "client", "project", "invoice", "client_id", "project_id",
+     "invoice_id", "created_at", "updated_at"],
+)
+
+timesheet_schema = Schema(
+    Timesheet,
+    ["id", "date", "client_id", "project_id", "description", "hours", "hourly_rate", "status",
+     "invoice_id", "created_at", "updated_at"],
+    computed={"amount": lambda entry: decimal_str(entry.amount)},
+)
+
+invoice_schema = Schema(
+    Invoice,
+    ["id", "invoice_number", "client_id", "company_name", "issue_date", "due_date", "notes",
+     "subtotal", "tax_rate", "tax_amount", "total", "status", "sent_date", "paid_date",
+     "payment_method", "payment_reference", "created_at", "updated_at"],
+)
+
+client_schema = Schema(
+    Client,
+    ["id", "name", "email", "phone", "address", "contact_person", "notes", "created_at",
+     "updated_at"],
+)
+
+project_schema = Schema(
+    Project,
+    ["id", "name", "description", "status", "hourly_rate", "client_id", "created_at",
+     "updated_at"],
+)
@@ -1,11 +1,13 @@
 from flask import Blueprint, request, render_template, redirect, url_for, flash, jsonify
 from flask_login import current_user, login_required
 from sqlalchemy import or_
+from sqlalchemy.orm import joinedload
 
 from akowe.models import db
 from akowe.models.client import Client
 from akowe.models.invoice import Invoice
 from akowe.models.timesheet import Timesheet
+from akowe.services.timesheet_summary_service import TimesheetSummaryService
 
 bp = Blueprint("client", __name__, url_prefix="/client")
 
@@ -152,13 +154,22 @@ def view(id):
         Invoice.query.filter_by(client_id=client.id).order_by(Invoice.issue_date.desc()).all()
     )
 
-    # Get client's timesheet entries
+    # Get client's most recent timesheet entries, with totals from one aggregate query
     timesheet_entries = (
-        Timesheet.query.filter_by(client_id=client.id).order_by(Timesheet.date.desc()).all()
+        Timesheet.query.options(joinedload(Timesheet.project_ref))
+        .filter_by(client_id=client.id)
+        .order_by(Timesheet.date.desc())
+        .limit(10)
+        .all()
     )
+    timesheet_summary = TimesheetSummaryService.summarize(client_id=client.id)
 
     return render_template(
-        "client/view.html", client=client, invoices=invoices, timesheet_entries=timesheet_entries
+        "client/view.html",
+        client=client,
+        invoices=invoices,
+        timesheet_entries=timesheet_entries,
+        timesheet_summary=timesheet_summary,
     )
 
 
@@ -3,11 +3,13 @@ from datetime import datetime
 from decimal import Decimal
 
 from flask import Blueprint, request, render_template, redirect, url_for, flash, current_app, jsonify
+from flask_login import current_user
 from werkzeug.utils import secure_filename
 
 from akowe.models import db
 from akowe.models.expense import Expense
 from akowe.services.import_service import ImportService
+from akowe.services.receipt_service import ReceiptService
 from akowe.services.storage_service import StorageService
 from akowe.services.tax_recommendation_service import TaxRecommendationService
 
@@ -93,6 +95,7 @@ def new():
                 payment_method=payment_method,
                 status=status,
                 vendor=vendor if vendor else None,
+                user_id=current_user.id,
             )
 
             # Handle receipt upload
@@ -113,10 +116,8 @@ def new():
                             categories=CATEGORIES,
                         )
 
-                    # Upload file to Azure Blob Storage
-                    blob_name, blob_url = StorageService.upload_file(
-                        receipt_file, RECEIPT_CONTAINER
-                    )
+                    # Upload file to Azure Blob Storage (reusing an identical receipt)
+                    blob_name, blob_url = ReceiptService.attach(receipt_file, RECEIPT_CONTAINER)
 
                     # Store blob info in the expense record
                     expense.receipt_blob_name = blob_name
@@ -175,18 +176,18 @@ def edit(id):
                             categories=CATEGORIES,
                         )
 
-                    # Delete old receipt if it exists
-                    if expense.receipt_blob_name:
+                    # Attach the new file first so re-uploading the same receipt
+                    # never deletes the blob it is about to reuse
+                    old_blob_name = expense.receipt_blob_name
+                    blob_name, blob_url = ReceiptService.attach(receipt_file, RECEIPT_CONTAINER)
+
+                    # Release the old receipt if it exists
+                    if old_blob_name:
                         try:
-                            StorageService.delete_file(expense.receipt_blob_name, RECEIPT_CONTAINER)
+                            ReceiptService.release(old_blob_name, RECEIPT_CONTAINER)
                         except Exception as e:
                             current_app.logger.error(f"Error deleting old receipt: {str(e)}")
 
-                    # Upload new file to Azure Blob Storage
-                    blob_name, blob_url = StorageService.upload_file(
-                        receipt_file, RECEIPT_CONTAINER
-                    )
-
                     # Store blob info in the expense record
                     expense.receipt_blob_name = blob_name
                     expense.receipt_url = blob_url
@@ -216,10 +217,10 @@ def delete(id):
     expense = Expense.query.get_or_404(id)
 
     try:
-        # Delete receipt if it exists
+        # Release receipt if it exists
         if expense.receipt_blob_name:
             try:
-                StorageService.delete_file(expense.receipt_blob_name, RECEIPT_CONTAINER)
+                ReceiptService.release(expense.receipt_blob_name, RECEIPT_CONTAINER)
             except Exception as e:
                 current_app.logger.error(f"Error deleting receipt: {str(e)}")
 
@@ -259,8 +260,8 @@ def delete_receipt(id):
         return redirect(url_for("expense.edit", id=id))
 
     try:
-        # Delete receipt from storage
-        StorageService.delete_file(expense.receipt_blob_name, RECEIPT_CONTAINER)
+        # Release receipt; the blob is deleted once no expense references it
+        ReceiptService.release(expense.receipt_blob_name, RECEIPT_CONTAINER)
 
         # Update expense record
         expense.receipt_blob_name = None
@@ -15,7 +15,7 @@ bp = Blueprint("export", __name__, url_prefix="/export")
 @login_required
 def index():
     """Show the export interface."""
-    return render_template("export/index.html")
+    return render_template("export/index.html", provinces=sorted(GST_HST_RATES))
 
 
 @bp.route("/income", methods=["GET"])
@@ -246,3 +246,31 @@ def export_corporate_turbotax():
     except Exception as e:
         current_app.logger.error(f"Error exporting Corporate TurboTax data: {str(e)}")
         return {"error": "Failed to export Corporate TurboTax data"}, 500
+
+
+@bp.route("/tax/bundle", methods=["GET"])
+@login_required
+def export_tax_bundle():
+    """Export every tax format in a single ZIP file.
+
+    Query Parameters:
+        year (int): Tax year to export (required)
+        province (str): Province for GST/HST calculation (default: Ontario)
+    """
+    # Get the required year parameter
+    year = request.args.get("year", type=int)
+    if not year:
+        return {"error": "Year parameter is required"}, 400
+
+    # Get optional province parameter
+    province = request.args.get("province", default="Ontario")
+
+    try:
+        # Generate the ZIP file from a single pass over the data
+        zip_data, filename = TaxExportService.export_bundle(year, province)
+
+        # Send the file to the client
+        return send_file(zip_data, as_attachment=True, download_name=filename, mimetype="application/zip")
+    except Exception as e:
+        current_app.logger.error(f"Error exporting tax bundle: {str(e)}")
+        return {"error": "Failed to export tax bundle"}, 500
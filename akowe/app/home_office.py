@@ -26,6 +26,28 @@ def index():
     return render_template("home_office/index.html", home_office_claims=home_office_claims)
 
 
+@bp.route("/compare", methods=["GET"])
+@login_required
+def compare():
+    """Compare home office claims across tax years from their stored breakdowns."""
+    comparison = HomeOfficeService.compare_claims(current_user.id)
+    return render_template("home_office/compare.html", comparison=comparison)
+
+
+@bp.route("/recalculate", methods=["POST"])
+@login_required
+def recalculate():
+    """Recalculate all of the current user's home office claims."""
+    try:
+        claims = HomeOfficeService.calculate_all(current_user.id, request.form.get("country_code") or "CA")
+        flash(f"Recalculated {len(claims)} home office claims", "success")
+    except Exception as e:
+        current_app.logger.error(f"Error recalculating home office claims: {str(e)}")
+        flash(f"An error occurred: {str(e)}", "danger")
+    
+    return redirect(url_for("home_office.compare"))
+
+
 @bp.route("/new", methods=["GET"])
 @login_required
 def new():
@@ -53,6 +75,7 @@ def create():
             "office_area": request.form.get("office_area", "0"),
             "is_primary_income": request.form.get("is_primary_income") == "true",
             "hours_per_week": request.form.get("hours_per_week", "0"),
+            "linked_to_expenses": request.form.get("linked_to_expenses") == "true",
             
             # Home Expenses (only used if calculation_method is percentage)
             "rent": request.form.get("rent", "0"),
@@ -135,6 +158,7 @@ def update(id):
             "office_area": request.form.get("office_area"),
             "is_primary_income": request.form.get("is_primary_income") == "true",
             "hours_per_week": request.form.get("hours_per_week"),
+            "linked_to_expenses": request.form.get("linked_to_expenses") == "true",
             
             # Home Expenses (only used if calculation_method is percentage)
             "rent": request.form.get("rent"),
@@ -246,4 +270,41 @@ def api_calculate():
         return jsonify({
             "success": False,
             "error": str(e)
-        }), 400
\ No newline at end of file
+        }), 400
+
+
+@bp.route("/api/ledger-totals", methods=["GET"])
+@login_required
+def api_ledger_totals():
+    """API endpoint returning the user's home expenses for a tax year, to pre-fill a claim."""
+    tax_year = request.args.get("tax_year", datetime.now().year, type=int)
+    totals = HomeOfficeService.ledger_totals(current_user.id, tax_year)
+    
+    return jsonify({
+        "success": True,
+        "tax_year": tax_year,
+        "totals": {field: float(amount) for field, amount in totals.items()},
+    })
+
+
+@bp.route("/api/calculate-all", methods=["POST"])
+@login_required
+def api_calculate_all():
+    """API endpoint to recalculate and store all of the user's claims in one call."""
+    data = request.get_json(silent=True) or {}
+    claims = HomeOfficeService.calculate_all(current_user.id, data.get("country_code") or "CA")
+    
+    return jsonify({
+        "success": True,
+        "claims": [
+            {
+                "id": claim.id,
+                "tax_year": claim.tax_year,
+                "calculation_method": claim.calculation_method,
+                "business_use_percentage": float(claim.business_use_percentage),
+                "total_deduction": float(claim.total_deduction),
+                "deductible": {field: float(amount) for field, amount in claim.stored_breakdown().items()},
+            }
+            for claim in claims
+        ],
+    })
@@ -11,13 +11,12 @@ from akowe.models.income import Income
 from akowe.models.invoice import Invoice
 from akowe.models.project import Project
 from akowe.services.import_service import ImportService
-from akowe.utils.timezone import convert_to_utc, convert_from_utc, local_date_input
+from akowe.utils.timezone import convert_to_utc, local_date_input
 
 bp = Blueprint("income", __name__, url_prefix="/income")
 
 
 @bp.route("/", methods=["GET"])
-@convert_from_utc
 def index():
     # Show only current user's incomes
     incomes = Income.query.filter_by(user_id=current_user.id).order_by(Income.date.desc()).all()
@@ -85,7 +84,6 @@ def new():
 
 
 @bp.route("/edit/<int:id>", methods=["GET", "POST"])
-@convert_from_utc
 def edit(id):
     income = Income.query.get_or_404(id)
 
@@ -2,16 +2,16 @@ import os
 from datetime import datetime, timedelta
 from decimal import Decimal
 
-from flask import Blueprint, request, render_template, redirect, url_for, flash
+from flask import Blueprint, request, render_template, redirect, url_for, flash, send_file
 from flask_login import current_user
-from sqlalchemy import and_, or_
 
 from akowe.models import db
 from akowe.models.client import Client
 from akowe.models.invoice import Invoice
 from akowe.models.timesheet import Timesheet
 from akowe.models.income import Income
-from akowe.utils.timezone import to_utc, to_local_time, local_date_input, convert_to_utc, convert_from_utc
+from akowe.services.ar_aging_service import ARAgingService
+from akowe.utils.timezone import to_utc, to_local_time, local_date_input, convert_to_utc
 
 bp = Blueprint("invoice", __name__, url_prefix="/invoice")
 
@@ -46,7 +46,6 @@ def generate_invoice_number():
 
 
 @bp.route("/", methods=["GET"])
-@convert_from_utc
 def index():
     """List all invoices"""
     # Get filter parameters
@@ -161,16 +160,9 @@ def new():
 
             # Process selected timesheet entries
             timesheet_ids = request.form.getlist("timesheet_entries")
-            if timesheet_ids:
-                timesheet_entries = Timesheet.query.filter(
-                    Timesheet.id.in_(timesheet_ids),
-                    Timesheet.user_id == current_user.id,
-                    Timesheet.status == "pending",
-                ).all()
-
-                for entry in timesheet_entries:
-                    entry.invoice_id = invoice.id
-                    entry.status = "billed"
+            attached = invoice.attach_timesheets(timesheet_ids)
+            if attached < len(timesheet_ids):
+                flash("Some selected timesheet entries were already billed and were skipped.", "warning")
 
             # Process custom line items
             import json
@@ -249,8 +241,31 @@ def new():
     )
 
 
+@bp.route("/aging", methods=["GET"])
+def aging():
+    """Accounts-receivable aging report for outstanding invoices
+
+    Query Parameters:
+        as_of (str): Optional date (YYYY-MM-DD) to age invoices against
+        format (str): ``csv`` to download the report instead of viewing it
+    """
+    as_of = None
+    if request.args.get("as_of"):
+        try:
+            as_of = local_date_input(request.args["as_of"])
+        except ValueError:
+            flash("Invalid as-of date format", "error")
+
+    report = ARAgingService.report(current_user.id, as_of)
+
+    if request.args.get("format") == "csv":
+        csv_data, filename = ARAgingService.to_csv(report)
+        return send_file(csv_data, as_attachment=True, download_name=filename, mimetype="text/csv")
+
+    return render_template("invoice/aging.html", report=report, buckets=ARAgingService.BUCKETS)
+
+
 @bp.route("/view/<int:id>", methods=["GET"])
-@convert_from_utc
 def view(id):
     """View an invoice"""
     invoice = Invoice.query.get_or_404(id)
@@ -264,7 +279,6 @@ def view(id):
 
 
 @bp.route("/edit/<int:id>", methods=["GET", "POST"])
-@convert_from_utc
 def edit(id):
     """Edit an invoice"""
     invoice = Invoice.query.get_or_404(id)
@@ -288,36 +302,12 @@ def edit(id):
             invoice.notes = request.form["notes"]
             invoice.tax_rate = Decimal(request.form["tax_rate"])
 
-            # Get currently selected entries
-            current_entries = {entry.id: entry for entry in invoice.timesheet_entries}
-
             # Get newly selected entries
             new_entry_ids = set(map(int, request.form.getlist("timesheet_entries")))
 
-            # Remove entries that are no longer selected
-            for entry_id, entry in current_entries.items():
-                if entry_id not in new_entry_ids:
-                    entry.invoice_id = None
-                    entry.status = "pending"
-
-            # Add newly selected entries
-            if new_entry_ids:
-                # Get eligible entries (unbilled or already on this invoice)
-                eligible_entries = Timesheet.query.filter(
-                    Timesheet.user_id == current_user.id,
-                    or_(
-                        Timesheet.status == "pending",
-                        and_(Timesheet.status == "billed", Timesheet.invoice_id == invoice.id),
-                    ),
-                ).all()
-
-                eligible_entries_dict = {entry.id: entry for entry in eligible_entries}
-
-                for entry_id in new_entry_ids:
-                    if entry_id in eligible_entries_dict:
-                        entry = eligible_entries_dict[entry_id]
-                        entry.invoice_id = invoice.id
-                        entry.status = "billed"
+            # Remove entries that are no longer selected, then add newly selected ones
+            invoice.detach_timesheets(keep_ids=new_entry_ids)
+            invoice.attach_timesheets(new_entry_ids)
 
             # Recalculate totals
             invoice.calculate_totals()
@@ -373,9 +363,7 @@ def delete(id):
 
     try:
         # Update timesheet entries
-        for entry in invoice.timesheet_entries:
-            entry.invoice_id = None
-            entry.status = "pending"
+        invoice.detach_timesheets()
 
         # Delete the invoice
         db.session.delete(invoice)
@@ -7,9 +7,12 @@ from akowe.models import db
 from akowe.models.project import Project
 from akowe.models.client import Client
 from akowe.models.timesheet import Timesheet
+from akowe.services.timesheet_summary_service import TimesheetSummaryService
 
 bp = Blueprint("project", __name__, url_prefix="/project")
 
+RECENT_ENTRIES_LIMIT = 50  # Timesheet entries listed on the project page
+
 
 @bp.route("/", methods=["GET"])
 @login_required
@@ -194,25 +197,26 @@ def view(id):
         flash("You are not authorized to view this project", "error")
         return redirect(url_for("project.index"))
 
-    # Get project's timesheet entries
+    # Get project's most recent timesheet entries
     timesheet_entries = (
-        Timesheet.query.filter_by(project_id=project.id).order_by(Timesheet.date.desc()).all()
+        Timesheet.query.filter_by(project_id=project.id)
+        .order_by(Timesheet.date.desc())
+        .limit(RECENT_ENTRIES_LIMIT)
+        .all()
     )
 
-    # Calculate project metrics
-    total_hours = sum(entry.hours for entry in timesheet_entries)
-    unbilled_hours = sum(entry.hours for entry in timesheet_entries if entry.status == "pending")
-    billed_hours = sum(entry.hours for entry in timesheet_entries if entry.status == "billed")
-    paid_hours = sum(entry.hours for entry in timesheet_entries if entry.status == "paid")
+    # Calculate project metrics in one aggregate query
+    summary = TimesheetSummaryService.summarize(project_id=project.id)
 
     return render_template(
         "project/view.html",
         project=project,
         timesheet_entries=timesheet_entries,
-        total_hours=total_hours,
-        unbilled_hours=unbilled_hours,
-        billed_hours=billed_hours,
-        paid_hours=paid_hours,
+        summary=summary,
+        total_hours=summary["total_hours"],
+        unbilled_hours=summary["unbilled_hours"],
+        billed_hours=summary["billed_hours"],
+        paid_hours=summary["paid_hours"],
     )
 
 
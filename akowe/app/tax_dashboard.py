@@ -1,12 +1,15 @@
-from datetime import datetime, timedelta
-from decimal import Decimal
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
 
-from flask import Blueprint, render_template, request, jsonify
+from flask import Blueprint, render_template, request, jsonify, send_file, flash, redirect, url_for
+from flask_login import current_user
 from sqlalchemy import extract
 
+from akowe.models.capital_asset import CapitalAsset
 from akowe.models.expense import Expense
 from akowe.models.income import Income
 from akowe.services.tax_prediction_service import TaxPredictionService
+from akowe.services.tax_tables import tax_year
 
 bp = Blueprint("tax_dashboard", __name__, url_prefix="/tax")
 
@@ -56,6 +59,10 @@ TAX_QUARTERS = {
     4: {"start_month": 10, "end_month": 12, "name": "Q4 (Oct-Dec)"},
 }
 
+# Tax years the date handling supports; due dates fall in the following year
+MIN_TAX_YEAR = 1
+MAX_TAX_YEAR = 9998
+
 # Define CCA classes for capital expenses (simplified subset)
 CCA_CLASSES = {
     "Class 8": {
@@ -132,35 +139,21 @@ def index():
         cra_expense_categories[cra_category]["amount"] += expense.amount
         cra_expense_categories[cra_category]["expenses"].append(expense)
 
-    # Get quarterly data for GST/HST reporting
-    quarterly_data = {}
-    for quarter_num, quarter_info in TAX_QUARTERS.items():
-        start_month = quarter_info["start_month"]
-        end_month = quarter_info["end_month"]
-
-        quarter_start = datetime(selected_year, start_month, 1).date()
-        if end_month == 12:
-            quarter_end = datetime(selected_year, 12, 31).date()
-        else:
-            quarter_end = datetime(selected_year, end_month + 1, 1).date() - timedelta(days=1)
-
-        quarter_expenses = Expense.query.filter(
-            Expense.date >= quarter_start, Expense.date <= quarter_end
-        ).all()
-
-        quarter_income = Income.query.filter(
-            Income.date >= quarter_start, Income.date <= quarter_end
-        ).all()
-
-        quarter_expense_total = sum(expense.amount for expense in quarter_expenses)
-        quarter_income_total = sum(income.amount for income in quarter_income)
+    # Get quarterly data for GST/HST reporting, summed per quarter in SQL
+    from akowe.services.remittance_service import RemittanceReportService
 
+    remittance = RemittanceReportService.report(selected_year, selected_province, "quarterly")
+    quarterly_data = {}
+    for quarter_info, period in zip(TAX_QUARTERS.values(), remittance["periods"]):
         quarterly_data[quarter_info["name"]] = {
-            "expenses": quarter_expense_total,
-            "income": quarter_income_total,
-            "net": quarter_income_total - quarter_expense_total,
-            "start_date": quarter_start,
-            "end_date": quarter_end,
+            "expenses": period["total_purchases"],
+            "income": period["total_sales"],
+            "net": period["total_sales"] - period["total_purchases"],
+            "tax_collected": period["tax_collected"],
+            "net_remittance": period["net_remittance"],
+            "start_date": period["start_date"],
+            "end_date": period["end_date"],
+            "due_date": period["due_date"],
         }
 
     # Calculate GST/HST collected and paid (input tax credits)
@@ -216,69 +209,12 @@ def index():
                 }
             )
 
-    # Calculate income tax using simplified Canadian tax brackets
-    # Federal brackets for 2023 (approximate)
-    federal_tax_brackets = [
-        {"max": Decimal("53359"), "rate": Decimal("0.15")},
-        {"max": Decimal("106717"), "rate": Decimal("0.205")},
-        {"max": Decimal("165430"), "rate": Decimal("0.26")},
-        {"max": Decimal("235675"), "rate": Decimal("0.29")},
-        {"max": None, "rate": Decimal("0.33")},  # No upper limit
-    ]
-
-    # Calculate federal income tax (simplified)
-    remaining_income = yearly_net_income
-    estimated_federal_tax = Decimal("0")
-
-    for bracket in federal_tax_brackets:
-        if bracket["max"] is None or remaining_income <= bracket["max"]:
-            bracket_tax = remaining_income * bracket["rate"]
-            estimated_federal_tax += bracket_tax
-            break
-        else:
-            if remaining_income > bracket["max"]:
-                bracket_tax = bracket["max"] * bracket["rate"]
-                estimated_federal_tax += bracket_tax
-                remaining_income -= bracket["max"]
-            else:
-                bracket_tax = remaining_income * bracket["rate"]
-                estimated_federal_tax += bracket_tax
-                break
-
-    # Provincial tax rates (simplified average)
-    provincial_tax_rates = {
-        "Alberta": 0.10,
-        "British Columbia": 0.12,
-        "Manitoba": 0.12,
-        "New Brunswick": 0.14,
-        "Newfoundland and Labrador": 0.15,
-        "Northwest Territories": 0.12,
-        "Nova Scotia": 0.16,
-        "Nunavut": 0.12,
-        "Ontario": 0.12,
-        "Prince Edward Island": 0.14,
-        "Quebec": 0.15,
-        "Saskatchewan": 0.12,
-        "Yukon": 0.09,
-    }
-
-    # Simple provincial tax estimate
-    provincial_rate = provincial_tax_rates.get(selected_province, 0.12)
-    estimated_provincial_tax = yearly_net_income * Decimal(str(provincial_rate))
-
-    # Total estimated tax
+    # Estimate income tax and CPP with the year's federal and provincial brackets
+    estimate = tax_year(selected_year).estimate(yearly_net_income, selected_province)
+    estimated_federal_tax = estimate["federal_tax"]
+    estimated_provincial_tax = estimate["provincial_tax"]
     estimated_total_tax = estimated_federal_tax + estimated_provincial_tax
-
-    # Self-employment CPP contributions (simplified)
-    # 2023 CPP rate is 11.4% on earnings between $3,500 and $66,600
-    cpp_base_exemption = Decimal("3500")
-    cpp_maximum = Decimal("66600")
-    cpp_rate = Decimal("0.114")  # 11.4% for self-employed
-
-    cpp_earnings = min(
-        max(yearly_net_income - cpp_base_exemption, Decimal("0")), cpp_maximum - cpp_base_exemption
-    )
-    estimated_cpp = cpp_earnings * cpp_rate
+    estimated_cpp = estimate["cpp"]
 
     # Get available years for dropdown
     income_years = [
@@ -380,16 +316,137 @@ def index():
     )
     
     
+def _selected_year():
+    """The ``year`` query parameter, or the current year (with a flashed error) if it is out of range"""
+    current_year = datetime.now().year
+    selected_year = request.args.get("year", type=int, default=current_year)
+    if not MIN_TAX_YEAR <= selected_year <= MAX_TAX_YEAR:
+        flash(f"Year must be between {MIN_TAX_YEAR} and {MAX_TAX_YEAR}", "error")
+        return current_year
+    return selected_year
+
+
+@bp.route("/remittance", methods=["GET"])
+def remittance():
+    """GST/HST remittance report per filing period
+
+    Query Parameters:
+        year (int): Tax year; defaults to the current year
+        province (str): Province whose sales tax rates apply
+        period (str): ``monthly``, ``quarterly`` (default) or ``annual``
+        format (str): ``csv`` to download the report instead of viewing it
+    """
+    from akowe.services.remittance_service import RemittanceReportService
+
+    selected_year = _selected_year()
+    selected_province = request.args.get("province", default="Ontario")
+    period = request.args.get("period", default="quarterly")
+    if period not in RemittanceReportService.PERIODS:
+        flash("Invalid filing period", "error")
+        period = "quarterly"
+
+    report = RemittanceReportService.report(selected_year, selected_province, period, current_user.id)
+
+    if request.args.get("format") == "csv":
+        csv_data, filename = RemittanceReportService.to_csv(report)
+        return send_file(csv_data, as_attachment=True, download_name=filename, mimetype="text/csv")
+
+    return render_template(
+        "tax_dashboard/remittance.html",
+        report=report,
+        provinces=sorted(GST_HST_RATES.keys()),
+        periods=RemittanceReportService.PERIODS,
+    )
+
+
+@bp.route("/assets", methods=["GET"])
+def assets():
+    """Capital asset register with the CCA schedule for a tax year"""
+    from akowe.services.capital_asset_service import CapitalAssetService
+
+    selected_year = request.args.get("year", type=int, default=datetime.now().year)
+    schedule = CapitalAssetService.schedule(selected_year, current_user.id)
+    register = (
+        CapitalAsset.query.filter_by(user_id=current_user.id)
+        .order_by(CapitalAsset.acquired_on.desc())
+        .all()
+    )
+
+    return render_template(
+        "tax_dashboard/assets.html",
+        selected_year=selected_year,
+        schedule=schedule,
+        assets=register,
+        cca_classes=CapitalAssetService.CLASSES,
+    )
+
+
+@bp.route("/assets/new", methods=["POST"])
+def add_asset():
+    """Register a manually entered capital asset"""
+    from akowe.services.capital_asset_service import CapitalAssetService
+
+    try:
+        acquired_on = datetime.strptime(request.form["acquired_on"], "%Y-%m-%d").date()
+        CapitalAssetService.add_asset(
+            current_user.id,
+            request.form["description"],
+            request.form["cca_class"],
+            acquired_on,
+            Decimal(request.form["cost"]),
+        )
+    except (KeyError, ValueError, InvalidOperation) as e:
+        flash(f"Could not add asset: {str(e)}", "error")
+        return redirect(url_for("tax_dashboard.assets"))
+
+    flash("Capital asset added successfully!", "success")
+    return redirect(url_for("tax_dashboard.assets", year=acquired_on.year))
+
+
+@bp.route("/assets/<int:id>/dispose", methods=["POST"])
+def dispose_asset(id):
+    """Record the sale or retirement of a capital asset"""
+    from akowe.services.capital_asset_service import CapitalAssetService
+
+    asset = CapitalAsset.query.get_or_404(id)
+    if asset.user_id != current_user.id:
+        flash("You are not authorized to modify this asset.", "error")
+        return redirect(url_for("tax_dashboard.assets"))
+
+    try:
+        disposed_on = datetime.strptime(request.form["disposed_on"], "%Y-%m-%d").date()
+        CapitalAssetService.dispose_asset(asset, disposed_on, Decimal(request.form.get("proceeds") or "0"))
+    except (KeyError, ValueError, InvalidOperation) as e:
+        flash(f"Could not record disposition: {str(e)}", "error")
+        return redirect(url_for("tax_dashboard.assets"))
+
+    flash("Disposition recorded successfully!", "success")
+    return redirect(url_for("tax_dashboard.assets", year=disposed_on.year))
+
+
+@bp.route("/assets/<int:id>/delete", methods=["POST"])
+def delete_asset(id):
+    """Delete a manually entered capital asset"""
+    from akowe.services.capital_asset_service import CapitalAssetService
+
+    asset = CapitalAsset.query.get_or_404(id)
+    if asset.user_id != current_user.id:
+        flash("You are not authorized to delete this asset.", "error")
+        return redirect(url_for("tax_dashboard.assets"))
+
+    try:
+        CapitalAssetService.delete_asset(asset)
+        flash("Capital asset deleted successfully!", "success")
+    except ValueError as e:
+        flash(str(e), "error")
+
+    return redirect(url_for("tax_dashboard.assets"))
+
+
 @bp.route("/prediction", methods=["GET"])
 def prediction():
     """AI-powered tax prediction and planning page"""
-    # Get current year and selected year from query param
-    current_year = datetime.now().year
-    selected_year = request.args.get("year", type=int, default=current_year)
-    
-    # Only allow prediction for current year
-    if selected_year != current_year:
-        selected_year = current_year
+    selected_year = _selected_year()
     
     # Get selected province for tax calculations
     selected_province = request.args.get("province", default="Ontario")
@@ -421,18 +478,89 @@ def prediction():
     )
 
 
+@bp.route("/scenarios", methods=["GET"])
+def scenarios():
+    """Tax planning scenarios swept over a range of amounts
+
+    Query Parameters:
+        year (int): Tax year; defaults to the current year
+        province (str): Province of residence
+        net_income (decimal): Net business income; defaults to the year's projection
+        field (str): Amount to vary: ``rrsp_contribution`` (default), ``extra_expense`` or ``salary``
+        start, stop, step (decimal): Range of amounts
+        incorporate (str): ``1`` to evaluate every amount as an incorporated business
+    """
+    from akowe.services.tax_scenario_service import TaxScenarioService
+
+    selected_year = _selected_year()
+    selected_province = request.args.get("province", default="Ontario")
+    field = request.args.get("field", default="rrsp_contribution")
+    incorporate = request.args.get("incorporate") == "1"
+
+    try:
+        net_income = Decimal(request.args["net_income"]) if request.args.get("net_income") else None
+        start = Decimal(request.args.get("start") or "0")
+        stop = Decimal(request.args.get("stop") or "30000")
+        step = Decimal(request.args.get("step") or "2500")
+        if not all(amount.is_finite() for amount in (start, stop, step, net_income or Decimal("0"))):
+            raise InvalidOperation
+    except InvalidOperation:
+        flash("Amounts must be numbers", "error")
+        net_income, start, stop, step = None, Decimal("0"), Decimal("30000"), Decimal("2500")
+
+    if net_income is None:
+        year_start_date = datetime(selected_year, 1, 1).date()
+        year_end_date = datetime(selected_year, 12, 31).date()
+        prediction = TaxPredictionService.predict_tax_obligation(
+            Income.query.filter(
+                Income.user_id == current_user.id, Income.date >= year_start_date, Income.date <= year_end_date
+            ).all(),
+            Expense.query.filter(
+                Expense.user_id == current_user.id, Expense.date >= year_start_date, Expense.date <= year_end_date
+            ).all(),
+            selected_province,
+            selected_year,
+            current_user.id,
+        )
+        net_income = prediction["projected_net_income"]
+
+    try:
+        result = TaxScenarioService.sweep(
+            net_income, field, start, stop, step, {"incorporate": incorporate}, selected_province, selected_year
+        )
+    except (ValueError, ArithmeticError) as e:
+        flash(str(e), "error")
+        field = "rrsp_contribution"
+        result = TaxScenarioService.sweep(
+            net_income, field, Decimal("0"), Decimal("30000"), Decimal("2500"), None, selected_province, selected_year
+        )
+
+    return render_template(
+        "tax_dashboard/scenarios.html",
+        result=result,
+        field=field,
+        fields=TaxScenarioService.NUMERIC_FIELDS,
+        start=start,
+        stop=stop,
+        step=step,
+        incorporate=incorporate,
+        provinces=sorted(GST_HST_RATES.keys()),
+    )
+
+
 @bp.route("/api/prediction", methods=["GET"])
 def api_prediction():
     """API endpoint for tax prediction data"""
-    # Get current year
-    current_year = datetime.now().year
+    selected_year = request.args.get("year", type=int, default=datetime.now().year)
+    if not MIN_TAX_YEAR <= selected_year <= MAX_TAX_YEAR:
+        return jsonify({"message": f"Year must be between {MIN_TAX_YEAR} and {MAX_TAX_YEAR}"}), 400
     
     # Get selected province for tax calculations
     selected_province = request.args.get("province", default="Ontario")
     
     # Calculate year date range
-    year_start_date = datetime(current_year, 1, 1).date()
-    year_end_date = datetime(current_year, 12, 31).date()
+    year_start_date = datetime(selected_year, 1, 1).date()
+    year_end_date = datetime(selected_year, 12, 31).date()
     
     # Get expenses and income for the year
     yearly_expenses = Expense.query.filter(
@@ -445,7 +573,7 @@ def api_prediction():
     
     # Get tax prediction
     tax_prediction = TaxPredictionService.predict_tax_obligation(
-        yearly_income, yearly_expenses, selected_province, current_year
+        yearly_income, yearly_expenses, selected_province, selected_year
     )
     
     return jsonify(tax_prediction)
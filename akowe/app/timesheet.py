@@ -8,13 +8,13 @@ from akowe.models import db
 from akowe.models.client import Client
 from akowe.models.project import Project
 from akowe.models.timesheet import Timesheet
-from akowe.utils.timezone import convert_to_utc, convert_from_utc, local_date_input
+from akowe.services.timesheet_grid_service import TimesheetGridService
+from akowe.utils.timezone import convert_to_utc, local_date_input
 
 bp = Blueprint("timesheet", __name__, url_prefix="/timesheet")
 
 
 @bp.route("/", methods=["GET"])
-@convert_from_utc
 def index():
     """Show all timesheet entries"""
     # Get filter parameters
@@ -154,7 +154,6 @@ def new():
 
 
 @bp.route("/edit/<int:id>", methods=["GET", "POST"])
-@convert_from_utc
 def edit(id):
     """Edit a timesheet entry"""
     entry = Timesheet.query.get_or_404(id)
@@ -259,7 +258,6 @@ def delete(id):
 
 
 @bp.route("/weekly", methods=["GET"])
-@convert_from_utc
 def weekly():
     """Show weekly timesheet view"""
     # Get the requested week (default to current week)
@@ -284,32 +282,11 @@ def weekly():
     # Calculate week end (Sunday)
     week_end = week_start + timedelta(days=6)
 
-    # Get entries for the week
-    entries = (
-        Timesheet.query.filter(
-            Timesheet.user_id == current_user.id,
-            Timesheet.date >= week_start,
-            Timesheet.date <= week_end,
-        )
-        .order_by(Timesheet.date)
-        .all()
-    )
-
-    # Organize entries by day
-    days = []
-    daily_totals = {}
-
-    for i in range(7):
-        day_date = week_start + timedelta(days=i)
-        day_entries = [e for e in entries if e.date == day_date]
-        day_hours = sum(e.hours for e in day_entries)
-
-        days.append({"date": day_date, "entries": day_entries, "total_hours": day_hours})
-
-        daily_totals[day_date.strftime("%Y-%m-%d")] = day_hours
-
-    # Get total hours for the week
-    total_hours = sum(day["total_hours"] for day in days)
+    # Bucket the week's entries by day in one pass
+    grid = TimesheetGridService.build(current_user.id, week_start, week_end)
+    days = grid["days"]
+    total_hours = grid["total_hours"]
+    daily_totals = {day["date"].strftime("%Y-%m-%d"): day["total_hours"] for day in days}
 
     # Get previous and next week dates for navigation
     prev_week = week_start - timedelta(days=7)
@@ -0,0 +1,60 @@
+"""Flask CLI commands for maintenance tasks."""
+
+import click
+from flask import Flask
+from flask.cli import AppGroup
+
+from akowe.models import db
+from akowe.models.invoice import Invoice
+from akowe.utils.timezone import get_current_local_datetime
+
+invoices_cli = AppGroup("invoices", help="Invoice maintenance commands.")
+
+
+@invoices_cli.command("recalculate")
+@click.option(
+    "--status",
+    "statuses",
+    multiple=True,
+    help="Only recalculate invoices in this status (repeatable). Defaults to all.",
+)
+@click.option("--dry-run", is_flag=True, help="Report how many invoices would change without saving.")
+def recalculate_invoices(statuses, dry_run):
+    """Recalculate invoice subtotals, tax and totals from their timesheet entries."""
+    updated = Invoice.recalculate_totals(statuses=statuses or None)
+
+    if dry_run:
+        db.session.rollback()
+        click.echo(f"{updated} invoice(s) would be updated.")
+    else:
+        db.session.commit()
+        click.echo(f"Updated totals on {updated} invoice(s).")
+
+
+@invoices_cli.command("mark-overdue")
+@click.option(
+    "--as-of",
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    help="Treat this date (YYYY-MM-DD) as today. Defaults to the current local date.",
+)
+@click.option("--dry-run", is_flag=True, help="Report how many invoices would change without saving.")
+def mark_overdue_invoices(as_of, dry_run):
+    """Mark sent invoices whose due date has passed as overdue."""
+    as_of = as_of.date() if as_of else get_current_local_datetime().date()
+    updated = Invoice.mark_overdue(as_of)
+
+    if dry_run:
+        db.session.rollback()
+        click.echo(f"{updated} invoice(s) would be marked overdue.")
+    else:
+        db.session.commit()
+        click.echo(f"Marked {updated} invoice(s) overdue as of {as_of.isoformat()}.")
+
+
+def init_commands(app: Flask):
+    """Register the CLI command groups on the Flask app.
+
+    Args:
+        app: The Flask application instance
+    """
+    app.cli.add_command(invoices_cli)
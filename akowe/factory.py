@@ -6,7 +6,11 @@ from flask import Flask, redirect, url_for, request, jsonify
 from flask_login import LoginManager, current_user
 from flask_migrate import Migrate
 
+from akowe.commands import init_commands
 from akowe.models import db
+from akowe.utils.compression import init_compression
+from akowe.utils.json_provider import init_json
+from akowe.utils.metrics import init_metrics
 from akowe.utils.timezone_initializer import init_timezone
 
 migrate = Migrate()
@@ -109,6 +113,16 @@ def create_app(test_config=None):
     # Initialize timezone settings
     init_timezone(app)
 
+    # Fast JSON encoding and response compression
+    init_json(app)
+    init_compression(app)
+
+    # Background system metrics for the admin dashboard
+    init_metrics(app)
+
+    # Register CLI commands
+    init_commands(app)
+
     # Add custom template filters
     from decimal import Decimal
     from akowe.utils.timezone import to_local_time, format_datetime, format_date
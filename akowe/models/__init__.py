@@ -8,3 +8,7 @@ from . import user, income, expense
 from . import client
 from . import project
 from . import timesheet, invoice
+from . import receipt
+from . import tombstone
+from . import capital_asset
+from . import home_office
@@ -0,0 +1,152 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy import Numeric, delete, event, inspect, select
+
+from . import db
+from .expense import Expense
+
+# Expense categories that are capital purchases, registered as assets instead of expensed
+CAPITAL_CATEGORIES = ("hardware", "furniture", "vehicle")
+
+# Hardware above this cost is Class 50 computer equipment; below it, Class 12
+SMALL_ASSET_LIMIT = Decimal("500")
+
+
+class CapitalAsset(db.Model):
+    """A depreciable capital asset, claimed through capital cost allowance (CCA).
+
+    Assets are either derived from ``hardware``, ``furniture`` and ``vehicle``
+    expenses (``expense_id`` is set and the asset follows the expense) or
+    entered manually.
+    """
+
+    __tablename__ = "capital_asset"
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    expense_id = db.Column(db.Integer, db.ForeignKey("expense.id"), nullable=True, unique=True)
+    description = db.Column(db.String(255), nullable=False)
+    cca_class = db.Column(db.String(10), nullable=False)  # CCA class number, e.g. "50"
+    acquired_on = db.Column(db.Date, nullable=False)
+    cost = db.Column(Numeric(12, 2), nullable=False)
+    disposed_on = db.Column(db.Date, nullable=True)
+    proceeds = db.Column(Numeric(12, 2), nullable=True)  # Proceeds of disposition
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (db.Index("ix_capital_asset_user_class", "user_id", "cca_class"),)
+
+    def __repr__(self):
+        return f"<CapitalAsset {self.id}: {self.description} (Class {self.cca_class}) {self.cost}>"
+
+    @property
+    def is_disposed(self) -> bool:
+        return self.disposed_on is not None
+
+    @staticmethod
+    def class_for_expense(category: str, amount) -> Optional[str]:
+        """CCA class for an expense, or None if the category is not a capital purchase"""
+        if category not in CAPITAL_CATEGORIES:
+            return None
+        if category == "furniture":
+            return "8"
+        if category == "vehicle":
+            return "10"
+        return "50" if Decimal(str(amount)) > SMALL_ASSET_LIMIT else "12"
+
+
+class CCABalance(db.Model):
+    """Stored CCA schedule for one class in one tax year.
+
+    Each year is computed from the previous year's ``closing_ucc``. Rows from
+    the year of any asset change onwards are deleted, so they are recomputed
+    on the next lookup.
+    """
+
+    __tablename__ = "cca_balance"
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    cca_class = db.Column(db.String(10), nullable=False)
+    tax_year = db.Column(db.Integer, nullable=False)
+    opening_ucc = db.Column(Numeric(12, 2), nullable=False, default=0)  # UCC at the start of the year
+    additions = db.Column(Numeric(12, 2), nullable=False, default=0)
+    dispositions = db.Column(Numeric(12, 2), nullable=False, default=0)  # Lesser of proceeds and cost
+    half_year_adjustment = db.Column(Numeric(12, 2), nullable=False, default=0)
+    cca = db.Column(Numeric(12, 2), nullable=False, default=0)
+    recapture = db.Column(Numeric(12, 2), nullable=False, default=0)
+    closing_ucc = db.Column(Numeric(12, 2), nullable=False, default=0)  # UCC at the end of the year
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "tax_year", "cca_class", name="uq_cca_balance_user_year_class"),
+    )
+
+    def __repr__(self):
+        return f"<CCABalance Class {self.cca_class} {self.tax_year}: {self.closing_ucc}>"
+
+    @classmethod
+    def invalidate(cls, user_id: int, from_year: int, connection=None) -> None:
+        """Delete stored balances from ``from_year`` onwards so they are recomputed"""
+        statement = delete(cls).where(cls.user_id == user_id, cls.tax_year >= from_year)
+        (connection or db.session).execute(statement)
+
+
+# Only changes to these expense columns affect the asset derived from it
+_ASSET_FIELDS = ("title", "date", "amount", "category", "user_id")
+
+
+def _sync_expense_asset(mapper, connection, target):
+    """Create, update or remove the asset derived from an expense in the same transaction."""
+    assets = CapitalAsset.__table__
+    existing = connection.execute(
+        select(assets.c.id, assets.c.user_id, assets.c.acquired_on).where(assets.c.expense_id == target.id)
+    ).first()
+    if existing:
+        CCABalance.invalidate(existing.user_id, existing.acquired_on.year, connection)
+
+    cca_class = CapitalAsset.class_for_expense(target.category, target.amount) if target.user_id else None
+    if cca_class is None:
+        if existing:
+            connection.execute(assets.delete().where(assets.c.id == existing.id))
+        return
+
+    values = {
+        "user_id": target.user_id,
+        "description": target.title,
+        "cca_class": cca_class,
+        "acquired_on": target.date,
+        "cost": target.amount,
+        "updated_at": datetime.utcnow(),
+    }
+    if existing:
+        connection.execute(assets.update().where(assets.c.id == existing.id).values(**values))
+    else:
+        connection.execute(
+            assets.insert().values(expense_id=target.id, created_at=values["updated_at"], **values)
+        )
+    CCABalance.invalidate(target.user_id, target.date.year, connection)
+
+
+def _sync_updated_expense_asset(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[field].history.has_changes() for field in _ASSET_FIELDS):
+        _sync_expense_asset(mapper, connection, target)
+
+
+def _remove_expense_asset(mapper, connection, target):
+    """Remove the asset derived from an expense before the expense row is deleted."""
+    assets = CapitalAsset.__table__
+    existing = connection.execute(
+        select(assets.c.id, assets.c.user_id, assets.c.acquired_on).where(assets.c.expense_id == target.id)
+    ).first()
+    if existing:
+        connection.execute(assets.delete().where(assets.c.id == existing.id))
+        CCABalance.invalidate(existing.user_id, existing.acquired_on.year, connection)
+
+
+event.listen(Expense, "after_insert", _sync_expense_asset)
+event.listen(Expense, "after_update", _sync_updated_expense_asset)
+event.listen(Expense, "before_delete", _remove_expense_asset)
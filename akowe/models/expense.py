@@ -17,8 +17,11 @@ class Expense(db.Model):
     receipt_blob_name = db.Column(db.String(255), nullable=True)
     receipt_url = db.Column(db.String(1024), nullable=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True)
+    client_key = db.Column(db.String(64), nullable=True)  # Idempotency key set by mobile clients
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+
+    __table_args__ = (db.UniqueConstraint("user_id", "client_key", name="uq_expense_user_client_key"),)
 
     def __repr__(self):
         return f"<Expense {self.id}: {self.amount} for {self.title} on {self.date}>"
@@ -1,7 +1,34 @@
 from datetime import datetime
 from decimal import Decimal
-from sqlalchemy import Numeric
+from sqlalchemy import Numeric, event, inspect, select
 from . import db
+from .expense import Expense
+
+
+# Home expense fields, in display order
+EXPENSE_FIELDS = (
+    "rent",
+    "mortgage_interest",
+    "property_tax",
+    "home_insurance",
+    "utilities",
+    "maintenance",
+    "internet",
+    "phone",
+)
+
+# Expense categories that feed a home expense field on claims linked to the ledger
+LEDGER_CATEGORIES = {
+    "rent": "rent",
+    "utilities": "utilities",
+    "maintenance": "maintenance",
+    "repairs": "maintenance",
+    "internet": "internet",
+    "telephone": "phone",
+}
+
+# Home expense fields filled from the ledger; the others are always entered by hand
+LEDGER_FIELDS = tuple(field for field in EXPENSE_FIELDS if field in LEDGER_CATEGORIES.values())
 
 
 class HomeOffice(db.Model):
@@ -42,6 +69,9 @@ class HomeOffice(db.Model):
     calculation_method = db.Column(db.String(20), default="percentage")  # percentage or simplified
     simplified_rate = db.Column(Numeric(10, 2), default=Decimal('0.00'))  # Rate per square foot for simplified method
     
+    # Keep the LEDGER_FIELDS in step with the user's expenses for the tax year
+    linked_to_expenses = db.Column(db.Boolean, default=False, nullable=False)
+    
     # Results (calculated)
     total_deduction = db.Column(Numeric(10, 2), default=Decimal('0.00'))
     
@@ -52,54 +82,167 @@ class HomeOffice(db.Model):
     # Relationships
     user = db.relationship("User", backref=db.backref("home_office_claims", lazy="dynamic"))
     
+    # Stored per-expense breakdown, written by HomeOfficeService whenever the claim is calculated
+    deductions = db.relationship(
+        "HomeOfficeDeduction", backref="home_office", lazy="selectin", cascade="all, delete-orphan"
+    )
+    
+    @property
+    def business_use_fraction(self):
+        return (self.business_use_percentage or Decimal('0')) / 100
+    
+    def deductible(self, field):
+        """Business share of one home expense, computed from the current field values"""
+        return _business_share(getattr(self, field), self.business_use_percentage)
+    
+    def stored_breakdown(self):
+        """The stored ``{field: deductible}`` breakdown, or None if the claim has not been calculated"""
+        if not self.deductions:
+            return None
+        return {row.category: row.deductible for row in self.deductions}
+    
     # Calculated home expense breakdowns (not stored in DB)
     @property
     def deductible_rent(self):
-        if self.rent <= 0:
-            return Decimal('0.00')
-        return (self.rent * (self.business_use_percentage / 100)).quantize(Decimal('0.01'))
+        return self.deductible("rent")
     
     @property
     def deductible_mortgage_interest(self):
-        if self.mortgage_interest <= 0:
-            return Decimal('0.00')
-        return (self.mortgage_interest * (self.business_use_percentage / 100)).quantize(Decimal('0.01'))
+        return self.deductible("mortgage_interest")
     
     @property
     def deductible_property_tax(self):
-        if self.property_tax <= 0:
-            return Decimal('0.00')
-        return (self.property_tax * (self.business_use_percentage / 100)).quantize(Decimal('0.01'))
+        return self.deductible("property_tax")
     
     @property
     def deductible_home_insurance(self):
-        if self.home_insurance <= 0:
-            return Decimal('0.00')
-        return (self.home_insurance * (self.business_use_percentage / 100)).quantize(Decimal('0.01'))
+        return self.deductible("home_insurance")
     
     @property
     def deductible_utilities(self):
-        if self.utilities <= 0:
-            return Decimal('0.00')
-        return (self.utilities * (self.business_use_percentage / 100)).quantize(Decimal('0.01'))
+        return self.deductible("utilities")
     
     @property
     def deductible_maintenance(self):
-        if self.maintenance <= 0:
-            return Decimal('0.00')
-        return (self.maintenance * (self.business_use_percentage / 100)).quantize(Decimal('0.01'))
+        return self.deductible("maintenance")
     
     @property
     def deductible_internet(self):
-        if self.internet <= 0:
-            return Decimal('0.00')
-        return (self.internet * (self.business_use_percentage / 100)).quantize(Decimal('0.01'))
+        return self.deductible("internet")
     
     @property
     def deductible_phone(self):
-        if self.phone <= 0:
-            return Decimal('0.00')
-        return (self.phone * (self.business_use_percentage / 100)).quantize(Decimal('0.01'))
+        return self.deductible("phone")
+    
+    def __repr__(self):
+        return f"<HomeOffice {self.id}: {self.business_use_percentage}% of home for tax year {self.tax_year}>"
+
+
+class HomeOfficeDeduction(db.Model):
+    """Stored deductible amount of one home expense on a home office claim.
+    
+    Rows are rewritten each time the claim is calculated, so views read the
+    breakdown instead of recomputing it. Claims using the simplified method
+    store a zero deductible for each expense.
+    """
+    __tablename__ = "home_office_deduction"
+
+    id = db.Column(db.Integer, primary_key=True)
+    home_office_id = db.Column(db.Integer, db.ForeignKey("home_office.id"), nullable=False)
+    category = db.Column(db.String(30), nullable=False)  # One of EXPENSE_FIELDS
+    amount = db.Column(Numeric(10, 2), nullable=False, default=Decimal('0.00'))      # Expense claimed
+    deductible = db.Column(Numeric(10, 2), nullable=False, default=Decimal('0.00'))  # Business share
+    
+    __table_args__ = (
+        db.UniqueConstraint("home_office_id", "category", name="uq_home_office_deduction_category"),
+    )
     
     def __repr__(self):
-        return f"<HomeOffice {self.id}: {self.business_use_percentage}% of home for tax year {self.tax_year}>"
\ No newline at end of file
+        return f"<HomeOfficeDeduction {self.category}: {self.deductible}>"
+
+
+def _business_share(amount, business_use_percentage):
+    """Business share of a home expense, rounded to cents"""
+    amount = amount or Decimal('0')
+    if amount <= 0:
+        return Decimal('0.00')
+    return (amount * ((business_use_percentage or Decimal('0')) / 100)).quantize(Decimal('0.01'))
+
+
+# Only changes to these expense columns move a linked claim's totals
+_LEDGER_COLUMNS = ("amount", "category", "date", "status", "user_id")
+
+
+def _ledger_entry(values):
+    """The ``(user_id, tax_year, field)`` an expense counts toward, or None"""
+    field = LEDGER_CATEGORIES.get(values["category"])
+    if field is None or values["user_id"] is None or values["status"] == "cancelled" or values["date"] is None:
+        return None
+    return values["user_id"], values["date"].year, field
+
+
+def _apply_ledger_delta(connection, entry, delta):
+    """Add ``delta`` to one field of the linked claims it belongs to, with their total and breakdown."""
+    if entry is None or not delta:
+        return
+    user_id, tax_year, field = entry
+    claims = HomeOffice.__table__
+    deductions = HomeOfficeDeduction.__table__
+    rows = connection.execute(
+        select(claims).where(
+            claims.c.user_id == user_id,
+            claims.c.tax_year == tax_year,
+            claims.c.linked_to_expenses.is_(True),
+        )
+    ).all()
+    for row in rows:
+        amount = (getattr(row, field) or Decimal('0')) + delta
+        values = {field: amount, "updated_at": datetime.utcnow()}
+        # The simplified method does not depend on the expenses
+        percentage_method = row.calculation_method != "simplified"
+        if percentage_method:
+            total = sum((getattr(row, name) or Decimal('0') for name in EXPENSE_FIELDS if name != field), amount)
+            values["total_deduction"] = (total * ((row.business_use_percentage or Decimal('0')) / 100)).quantize(Decimal('0.01'))
+        connection.execute(claims.update().where(claims.c.id == row.id).values(**values))
+        connection.execute(
+            deductions.update()
+            .where(deductions.c.home_office_id == row.id, deductions.c.category == field)
+            .values(
+                amount=amount,
+                deductible=_business_share(amount, row.business_use_percentage) if percentage_method else Decimal('0.00'),
+            )
+        )
+
+
+def _current_ledger_values(target):
+    return {column: getattr(target, column) for column in _LEDGER_COLUMNS}
+
+
+def _add_expense_to_claims(mapper, connection, target):
+    values = _current_ledger_values(target)
+    _apply_ledger_delta(connection, _ledger_entry(values), Decimal(str(values["amount"])))
+
+
+def _update_expense_on_claims(mapper, connection, target):
+    """Move the expense's previous amount out of its claim and the new amount in."""
+    state = inspect(target)
+    histories = {column: state.attrs[column].history for column in _LEDGER_COLUMNS}
+    if not any(history.has_changes() for history in histories.values()):
+        return
+    new = _current_ledger_values(target)
+    old = {
+        column: history.deleted[0] if history.deleted else new[column]
+        for column, history in histories.items()
+    }
+    _apply_ledger_delta(connection, _ledger_entry(old), -Decimal(str(old["amount"] or 0)))
+    _apply_ledger_delta(connection, _ledger_entry(new), Decimal(str(new["amount"] or 0)))
+
+
+def _remove_expense_from_claims(mapper, connection, target):
+    values = _current_ledger_values(target)
+    _apply_ledger_delta(connection, _ledger_entry(values), -Decimal(str(values["amount"])))
+
+
+event.listen(Expense, "after_insert", _add_expense_to_claims)
+event.listen(Expense, "after_update", _update_expense_on_claims)
+event.listen(Expense, "before_delete", _remove_expense_from_claims)
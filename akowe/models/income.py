@@ -14,7 +14,7 @@ class Income(db.Model):
     invoice = db.Column(db.String(255), nullable=True)  # Keep for backward compatibility
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
     # Optional foreign key relationships
     client_id = db.Column(db.Integer, db.ForeignKey("client.id"), nullable=True)
@@ -1,6 +1,10 @@
 from datetime import datetime
-from sqlalchemy import Numeric
+from decimal import Decimal, ROUND_HALF_UP
+from sqlalchemy import Numeric, func, or_, select, update
 from . import db
+from .timesheet import Timesheet
+
+CENTS = Decimal("0.01")
 
 
 class Invoice(db.Model):
@@ -28,7 +32,10 @@ class Invoice(db.Model):
     payment_reference = db.Column(db.String(100), nullable=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+
+    # Lets the overdue sweep find sent invoices past their due date without a full scan
+    __table_args__ = (db.Index("ix_invoice_status_due_date", "status", "due_date"),)
 
     # Relationships
     timesheet_entries = db.relationship(
@@ -38,18 +45,137 @@ class Invoice(db.Model):
     client_ref = db.relationship("Client", back_populates="invoices")
 
     def calculate_totals(self):
-        """Calculate subtotal, tax, and total"""
+        """Calculate subtotal, tax, and total
+
+        The subtotal is summed by the database, so the timesheet entries are not
+        loaded. Pending changes to entries are flushed first by autoflush.
+        """
+        if self.id is None:
+            db.session.flush()
+
+        subtotal = db.session.execute(
+            select(func.coalesce(func.sum(Timesheet.amount), 0)).where(Timesheet.invoice_id == self.id)
+        ).scalar()
+
         # Calculate subtotal from timesheet entries
-        self.subtotal = sum(entry.amount for entry in self.timesheet_entries)
+        self.subtotal = Decimal(str(subtotal)).quantize(CENTS, rounding=ROUND_HALF_UP)
 
         # Calculate tax amount
-        self.tax_amount = self.subtotal * (self.tax_rate / 100)
+        self.tax_amount = (self.subtotal * Decimal(str(self.tax_rate or 0)) / 100).quantize(
+            CENTS, rounding=ROUND_HALF_UP
+        )
 
         # Calculate total
         self.total = self.subtotal + self.tax_amount
 
         return self.total
 
+    def attach_timesheets(self, timesheet_ids):
+        """Bill pending timesheet entries to this invoice with one UPDATE statement
+
+        Only the invoice owner's entries that are still ``pending`` are claimed,
+        so an entry already billed elsewhere (e.g. by a concurrent request) is
+        left alone instead of being moved between invoices.
+
+        Args:
+            timesheet_ids: IDs of the timesheet entries to attach
+
+        Returns:
+            Number of entries attached
+        """
+        timesheet_ids = [int(entry_id) for entry_id in timesheet_ids]
+        if not timesheet_ids:
+            return 0
+        if self.id is None:
+            db.session.flush()
+
+        statement = (
+            update(Timesheet)
+            .where(
+                Timesheet.id.in_(timesheet_ids),
+                Timesheet.user_id == self.user_id,
+                Timesheet.status == "pending",
+            )
+            .values(invoice_id=self.id, status="billed", updated_at=datetime.utcnow())
+        )
+        attached = db.session.execute(statement).rowcount
+        db.session.expire(self, ["timesheet_entries"])
+        return attached
+
+    def detach_timesheets(self, keep_ids=None):
+        """Return this invoice's timesheet entries to pending with one UPDATE statement
+
+        Args:
+            keep_ids: IDs of entries to leave on the invoice; None detaches all
+
+        Returns:
+            Number of entries detached
+        """
+        statement = (
+            update(Timesheet)
+            .where(Timesheet.invoice_id == self.id)
+            .values(invoice_id=None, status="pending", updated_at=datetime.utcnow())
+        )
+        if keep_ids:
+            statement = statement.where(Timesheet.id.not_in([int(entry_id) for entry_id in keep_ids]))
+
+        detached = db.session.execute(statement).rowcount
+        db.session.expire(self, ["timesheet_entries"])
+        return detached
+
+    @classmethod
+    def recalculate_totals(cls, invoice_ids=None, statuses=None):
+        """Recalculate stored totals for many invoices with one UPDATE statement
+
+        Only invoices whose stored subtotal or total differ from their timesheet
+        entries are touched, so ``updated_at`` (and mobile sync) only moves for
+        invoices that actually changed.
+
+        Args:
+            invoice_ids: Limit to these invoice IDs; None for all invoices
+            statuses: Limit to invoices in these statuses; None for all
+
+        Returns:
+            Number of invoices updated
+        """
+        subtotal = func.round(
+            select(func.coalesce(func.sum(Timesheet.amount), 0))
+            .where(Timesheet.invoice_id == cls.id)
+            .scalar_subquery(),
+            2,
+        )
+        tax_amount = func.round(subtotal * cls.tax_rate / 100, 2)
+        total = subtotal + tax_amount
+
+        statement = (
+            cls.__table__.update()
+            .where(or_(cls.subtotal != subtotal, cls.total != total))
+            .values(subtotal=subtotal, tax_amount=tax_amount, total=total, updated_at=datetime.utcnow())
+        )
+        if invoice_ids is not None:
+            statement = statement.where(cls.id.in_(list(invoice_ids)))
+        if statuses:
+            statement = statement.where(cls.status.in_(list(statuses)))
+
+        return db.session.execute(statement).rowcount
+
+    @classmethod
+    def mark_overdue(cls, as_of):
+        """Move sent invoices that are past due to ``overdue`` with one UPDATE statement
+
+        Args:
+            as_of: Invoices due before this date are overdue
+
+        Returns:
+            Number of invoices marked overdue
+        """
+        statement = (
+            cls.__table__.update()
+            .where(cls.status == "sent", cls.due_date < as_of)
+            .values(status="overdue", updated_at=datetime.utcnow())
+        )
+        return db.session.execute(statement).rowcount
+
     def __repr__(self):
         client_name = self.client_ref.name if self.client_ref else "Unknown Client"
         return f"<Invoice {self.invoice_number}: ${self.total} to {client_name} ({self.status})>"
@@ -0,0 +1,24 @@
+from datetime import datetime
+from . import db
+
+
+class Receipt(db.Model):
+    """A stored receipt blob, shared by every expense that attaches the same file.
+
+    Blobs are named after the SHA-256 of their content, so identical uploads map to
+    a single row. ``ref_count`` tracks how many expenses point at the blob through
+    ``Expense.receipt_blob_name``; the blob is removed from storage when it drops to zero.
+    """
+    __tablename__ = "receipt"
+
+    id = db.Column(db.Integer, primary_key=True)
+    content_hash = db.Column(db.String(64), nullable=False, unique=True, index=True)
+    blob_name = db.Column(db.String(255), nullable=False, unique=True, index=True)
+    blob_url = db.Column(db.String(1024), nullable=False)
+    size = db.Column(db.Integer, nullable=True)
+    ref_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<Receipt {self.blob_name} ({self.ref_count} refs)>"
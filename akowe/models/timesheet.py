@@ -1,5 +1,6 @@
 from datetime import datetime
 from sqlalchemy import Numeric
+from sqlalchemy.ext.hybrid import hybrid_property
 from . import db
 
 
@@ -16,8 +17,11 @@ class Timesheet(db.Model):
     status = db.Column(db.String(20), nullable=False, default="pending")  # pending, billed, paid
     invoice_id = db.Column(db.Integer, db.ForeignKey("invoice.id"), nullable=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    client_key = db.Column(db.String(64), nullable=True)  # Idempotency key set by mobile clients
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+
+    __table_args__ = (db.UniqueConstraint("user_id", "client_key", name="uq_timesheet_user_client_key"),)
 
     # Relationships
     invoice = db.relationship("Invoice", back_populates="timesheet_entries")
@@ -25,9 +29,12 @@ class Timesheet(db.Model):
     client_ref = db.relationship("Client", back_populates="timesheet_entries")
     project_ref = db.relationship("Project", back_populates="timesheet_entries")
 
-    @property
+    @hybrid_property
     def amount(self):
-        """Calculate the total amount for this timesheet entry"""
+        """Calculate the total amount for this timesheet entry
+
+        Also usable in queries, where it becomes ``hours * hourly_rate`` in SQL.
+        """
         return self.hours * self.hourly_rate
 
     def __repr__(self):
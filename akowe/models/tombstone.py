@@ -0,0 +1,60 @@
+from datetime import datetime
+from sqlalchemy import event
+from . import db
+from .client import Client
+from .expense import Expense
+from .income import Income
+from .invoice import Invoice
+from .project import Project
+from .timesheet import Timesheet
+
+
+class Tombstone(db.Model):
+    """Record of a deleted row, so mobile clients can sync deletions incrementally.
+
+    Rows are written automatically by the ``after_delete`` listeners below whenever
+    one of the synced models is deleted through the ORM (including cascades).
+    Bulk ``Query.delete()`` calls bypass the listeners and must not be used on
+    synced tables.
+    """
+    __tablename__ = "tombstone"
+
+    id = db.Column(db.Integer, primary_key=True)
+    entity_type = db.Column(db.String(50), nullable=False)
+    entity_id = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(db.Integer, nullable=True, index=True)
+    deleted_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+    __table_args__ = (
+        db.Index("ix_tombstone_entity_type_deleted_at", "entity_type", "deleted_at"),
+    )
+
+    def __repr__(self):
+        return f"<Tombstone {self.entity_type}:{self.entity_id} at {self.deleted_at}>"
+
+
+# Entity type names used in sync payloads, keyed by model
+SYNCED_MODELS = {
+    Expense: "expenses",
+    Income: "incomes",
+    Timesheet: "timesheets",
+    Invoice: "invoices",
+    Client: "clients",
+    Project: "projects",
+}
+
+
+def _record_tombstone(mapper, connection, target):
+    """Insert a tombstone row in the same transaction as the delete."""
+    connection.execute(
+        Tombstone.__table__.insert().values(
+            entity_type=SYNCED_MODELS[mapper.class_],
+            entity_id=target.id,
+            user_id=target.user_id,
+            deleted_at=datetime.utcnow(),
+        )
+    )
+
+
+for _model in SYNCED_MODELS:
+    event.listen(_model, "after_delete", _record_tombstone)
@@ -1,5 +1,6 @@
 from datetime import datetime
 from flask_login import UserMixin
+from sqlalchemy import func
 from werkzeug.security import generate_password_hash, check_password_hash
 
 from . import db
@@ -15,12 +16,21 @@ class User(UserMixin, db.Model):
     first_name = db.Column(db.String(64))
     last_name = db.Column(db.String(64))
     hourly_rate = db.Column(db.Numeric(10, 2), nullable=True)  # Default hourly rate
+    timezone = db.Column(db.String(64), nullable=True)  # IANA name; None uses the app timezone
     is_admin = db.Column(db.Boolean, default=False)
     is_active = db.Column(db.Boolean, default=True)
     last_login = db.Column(db.DateTime, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Lower-cased indexes for case-insensitive prefix search in the admin panel
+    __table_args__ = (
+        db.Index("ix_users_username_lower", func.lower(username)),
+        db.Index("ix_users_email_lower", func.lower(email)),
+        db.Index("ix_users_first_name_lower", func.lower(first_name)),
+        db.Index("ix_users_last_name_lower", func.lower(last_name)),
+    )
+
     # Relationships
     timesheet_entries = db.relationship("Timesheet", back_populates="user", lazy="dynamic")
     invoices = db.relationship("Invoice", back_populates="user", lazy="dynamic")
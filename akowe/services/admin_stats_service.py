@@ -0,0 +1,197 @@
+"""Service for site-wide counters shown in the admin panel."""
+
+import threading
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, List
+
+from flask import current_app
+from sqlalchemy import extract, func, literal, select, union_all
+
+from akowe.models import db
+from akowe.models.client import Client
+from akowe.models.expense import Expense
+from akowe.models.income import Income
+from akowe.models.invoice import Invoice
+from akowe.models.project import Project
+from akowe.models.timesheet import Timesheet
+from akowe.models.user import User
+
+_lock = threading.Lock()
+
+
+class AdminStatsService:
+    """Fetches admin counters in single queries and caches them per app.
+
+    Results are cached for ``ADMIN_STATS_CACHE_TTL`` seconds (default 60; 0
+    disables caching). The cache lives in ``app.extensions`` so each app, and
+    each worker process, keeps its own copy.
+    """
+
+    DEFAULT_TTL = 60
+
+    # Per-user activity sources: name -> model with user_id and updated_at columns
+    ACTIVITY_MODELS = {
+        "invoices": Invoice,
+        "timesheets": Timesheet,
+        "incomes": Income,
+        "expenses": Expense,
+    }
+
+    @classmethod
+    def _cached(cls, key: str, compute: Callable[[], Any]) -> Any:
+        ttl = current_app.config.get("ADMIN_STATS_CACHE_TTL", cls.DEFAULT_TTL)
+        if not ttl:
+            return compute()
+
+        cache = current_app.extensions.setdefault("admin_stats", {})
+        now = time.monotonic()
+        with _lock:
+            entry = cache.get(key)
+            if entry and entry[0] > now:
+                return entry[1]
+
+        value = compute()
+        with _lock:
+            cache[key] = (now + ttl, value)
+        return value
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """Drop cached results, e.g. after an admin changes a user."""
+        with _lock:
+            current_app.extensions.get("admin_stats", {}).clear()
+
+    @classmethod
+    def counters(cls) -> Dict[str, Any]:
+        """Return row counts and amount totals for the whole site
+
+        Returns:
+            Dictionary of user, client, project and transaction counters plus
+            income, expense and invoiced totals
+        """
+        return cls._cached("counters", cls._query_counters)
+
+    @staticmethod
+    def _query_counters() -> Dict[str, Any]:
+        one_day_ago = datetime.utcnow() - timedelta(days=1)
+
+        def count(model, *criteria):
+            return select(func.count(model.id)).where(*criteria).scalar_subquery()
+
+        def total(column):
+            return select(func.coalesce(func.sum(column), 0)).scalar_subquery()
+
+        subqueries = {
+            "total_users": count(User),
+            "active_users": count(User, User.is_active.is_(True)),
+            "admin_users": count(User, User.is_admin.is_(True)),
+            "active_today": count(User, User.last_login >= one_day_ago),
+            "total_clients": count(Client),
+            "total_projects": count(Project),
+            "income_count": count(Income),
+            "expense_count": count(Expense),
+            "invoice_count": count(Invoice),
+            "timesheet_count": count(Timesheet),
+            "total_income": total(Income.amount),
+            "total_expenses": total(Expense.amount),
+            "total_invoiced": total(Invoice.total),
+        }
+        row = db.session.execute(
+            select(*(subquery.label(name) for name, subquery in subqueries.items()))
+        ).one()
+
+        counters = dict(row._mapping)
+        for name in ("total_income", "total_expenses", "total_invoiced"):
+            counters[name] = Decimal(str(counters[name] or 0)).quantize(Decimal("0.01"))
+        counters["inactive_users"] = counters["total_users"] - counters["active_users"]
+        return counters
+
+    @classmethod
+    def monthly(cls, year: int) -> Dict[str, List]:
+        """Return per-month registrations, income and expenses for a year
+
+        Args:
+            year: Calendar year
+
+        Returns:
+            Dictionary with twelve-item ``registration_data``, ``income_data``
+            and ``expense_data`` lists
+        """
+        return cls._cached(f"monthly:{year}", lambda: cls._query_monthly(year))
+
+    @staticmethod
+    def _query_monthly(year: int) -> Dict[str, List]:
+        # Range filters rather than extract(year) so the date columns' indexes apply
+        start, end = date(year, 1, 1), date(year + 1, 1, 1)
+        start_dt, end_dt = datetime(year, 1, 1), datetime(year + 1, 1, 1)
+
+        registrations = select(
+            literal("registrations").label("series"),
+            extract("month", User.created_at).label("month"),
+            func.count(User.id).label("value"),
+        ).where(User.created_at >= start_dt, User.created_at < end_dt).group_by("month")
+
+        incomes = select(
+            literal("income").label("series"),
+            extract("month", Income.date).label("month"),
+            func.sum(Income.amount).label("value"),
+        ).where(Income.date >= start, Income.date < end).group_by("month")
+
+        expenses = select(
+            literal("expenses").label("series"),
+            extract("month", Expense.date).label("month"),
+            func.sum(Expense.amount).label("value"),
+        ).where(Expense.date >= start, Expense.date < end).group_by("month")
+
+        data = {"registrations": [0] * 12, "income": [0] * 12, "expenses": [0] * 12}
+        for row in db.session.execute(union_all(registrations, incomes, expenses)):
+            value = row.value or 0
+            data[row.series][int(row.month) - 1] = int(value) if row.series == "registrations" else float(value)
+
+        return {
+            "registration_data": data["registrations"],
+            "income_data": data["income"],
+            "expense_data": data["expenses"],
+        }
+
+    @classmethod
+    def user_activity(cls, user_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """Return record counts and last activity for a set of users
+
+        All models are counted in one UNION ALL of grouped SELECTs, so the cost
+        does not grow with the number of users on the page.
+
+        Args:
+            user_ids: IDs of the users to report on
+
+        Returns:
+            Dictionary keyed by user ID with a count per ``ACTIVITY_MODELS`` name
+            and ``last_activity``, the latest ``updated_at`` across them (or None)
+        """
+        user_ids = list(user_ids)
+        activity = {
+            user_id: {**{name: 0 for name in cls.ACTIVITY_MODELS}, "last_activity": None}
+            for user_id in user_ids
+        }
+        if not user_ids:
+            return activity
+
+        query = union_all(*(
+            select(
+                literal(name).label("kind"),
+                model.user_id.label("user_id"),
+                func.count(model.id).label("count"),
+                func.max(model.updated_at).label("last_activity"),
+            ).where(model.user_id.in_(user_ids)).group_by(model.user_id)
+            for name, model in cls.ACTIVITY_MODELS.items()
+        ))
+
+        for row in db.session.execute(query):
+            user = activity[row.user_id]
+            user[row.kind] = row.count
+            if row.last_activity and (user["last_activity"] is None or row.last_activity > user["last_activity"]):
+                user["last_activity"] = row.last_activity
+
+        return activity
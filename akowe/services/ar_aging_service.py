@@ -0,0 +1,135 @@
+"""Service for the accounts-receivable aging report."""
+
+import csv
+import io
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import and_, case, func
+
+from akowe.models import db
+from akowe.models.client import Client
+from akowe.models.invoice import Invoice
+from akowe.utils.timezone import get_current_local_datetime
+
+CENTS = Decimal("0.01")
+
+
+class ARAgingService:
+    """Buckets outstanding invoice totals by days past due, per client.
+
+    The whole report is one grouped query with a ``SUM(CASE ...)`` per bucket
+    over ``Invoice.due_date``, restricted to ``sent`` and ``overdue`` invoices
+    (served by the ``(status, due_date)`` index), so no invoices are loaded.
+    """
+
+    OUTSTANDING_STATUSES = ("sent", "overdue")
+
+    # Bucket key -> (label, first day past due, last day past due or None)
+    BUCKETS = {
+        "current": ("Current", None, 0),
+        "days_1_30": ("1-30 days", 1, 30),
+        "days_31_60": ("31-60 days", 31, 60),
+        "days_61_90": ("61-90 days", 61, 90),
+        "days_over_90": ("90+ days", 91, None),
+    }
+
+    @classmethod
+    def _bucket_condition(cls, as_of: date, first: Optional[int], last: Optional[int]):
+        # N days past due means due_date == as_of - N, so bounds become date cut-offs
+        conditions = []
+        if first is not None:
+            conditions.append(Invoice.due_date <= as_of - timedelta(days=first))
+        if last is not None:
+            conditions.append(Invoice.due_date >= as_of - timedelta(days=last))
+        return and_(*conditions)
+
+    @classmethod
+    def report(cls, user_id: int, as_of: Optional[date] = None) -> Dict[str, Any]:
+        """Outstanding invoice totals per client, bucketed by days past due
+
+        Args:
+            user_id: The ID of the user whose invoices to include
+            as_of: Date to age invoices against; defaults to the current local date
+
+        Returns:
+            Dictionary with ``as_of``, ``clients`` (one row per client with
+            ``client_id``, ``client_name``, ``invoice_count``, a Decimal per
+            ``BUCKETS`` key and ``total``, largest total first) and ``totals``
+            (the same measures summed over all clients)
+        """
+        as_of = as_of or get_current_local_datetime().date()
+
+        buckets = [
+            func.sum(
+                case((cls._bucket_condition(as_of, first, last), Invoice.total), else_=0)
+            ).label(key)
+            for key, (_, first, last) in cls.BUCKETS.items()
+        ]
+        rows = (
+            db.session.query(
+                Invoice.client_id,
+                Client.name.label("client_name"),
+                func.count(Invoice.id).label("invoice_count"),
+                func.sum(Invoice.total).label("total"),
+                *buckets,
+            )
+            .outerjoin(Client, Client.id == Invoice.client_id)
+            .filter(Invoice.user_id == user_id, Invoice.status.in_(cls.OUTSTANDING_STATUSES))
+            .group_by(Invoice.client_id, Client.name)
+            .all()
+        )
+
+        measures = (*cls.BUCKETS, "total")
+        totals: Dict[str, Any] = {"invoice_count": 0, **{key: Decimal("0.00") for key in measures}}
+        clients = []
+        for row in rows:
+            client = {
+                "client_id": row.client_id,
+                "client_name": row.client_name or "Unknown Client",
+                "invoice_count": row.invoice_count,
+            }
+            for key in measures:
+                client[key] = Decimal(str(getattr(row, key) or 0)).quantize(CENTS)
+                totals[key] += client[key]
+            totals["invoice_count"] += row.invoice_count
+            clients.append(client)
+
+        clients.sort(key=lambda client: (-client["total"], client["client_name"]))
+        return {"as_of": as_of, "clients": clients, "totals": totals}
+
+    @classmethod
+    def to_csv(cls, report: Dict[str, Any]) -> Tuple[io.BytesIO, str]:
+        """Render an aging report as CSV with a closing totals row
+
+        Args:
+            report: A report returned by ``report``
+
+        Returns:
+            Tuple containing the CSV data as BytesIO and the filename
+        """
+        string_buffer = io.StringIO()
+        writer = csv.writer(string_buffer)
+
+        writer.writerow(
+            ["client", "invoices", *(label for label, _, _ in cls.BUCKETS.values()), "total"]
+        )
+        for row in (*report["clients"], {**report["totals"], "client_name": "Total"}):
+            writer.writerow(
+                [
+                    row["client_name"],
+                    row["invoice_count"],
+                    *(f"{row[key]:.2f}" for key in cls.BUCKETS),
+                    f"{row['total']:.2f}",
+                ]
+            )
+
+        bytes_buffer = io.BytesIO()
+        bytes_buffer.write(string_buffer.getvalue().encode("utf-8"))
+        bytes_buffer.seek(0)
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"ar_aging_{report['as_of'].isoformat()}_{timestamp}.csv"
+
+        return bytes_buffer, filename
@@ -0,0 +1,296 @@
+"""Service for the capital asset register and per-class CCA schedules."""
+
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import case, extract, func
+from sqlalchemy.exc import IntegrityError
+
+from akowe.models import db
+from akowe.models.capital_asset import CapitalAsset, CCABalance
+from akowe.app.tax_dashboard import CCA_CLASSES
+
+CENTS = Decimal("0.01")
+ZERO = Decimal("0.00")
+
+
+class CapitalAssetService:
+    """Keeps capital assets and computes capital cost allowance per class and year.
+
+    A year's schedule is computed from the previous year's stored closing UCC
+    plus that year's additions and dispositions, and stored as ``CCABalance``
+    rows. Looking up a year that is already stored is a single query; a
+    missing year is rolled forward from the latest stored year, so history is
+    never replayed from the first asset. Any asset change deletes the stored
+    years from the change onwards.
+    """
+
+    # CCA class -> (Schedule 8 description, rate)
+    CLASSES = {
+        number: (description, Decimal(str(CCA_CLASSES[f"Class {number}"]["rate"])))
+        for number, description in (
+            ("8", "Furniture and fixtures"),
+            ("10", "Computer hardware and automotive equipment"),
+            ("12", "Computer software and small tools"),
+            ("50", "Computer systems and hardware"),
+        )
+    }
+
+    # Stored balance columns, in Schedule 8 order
+    MEASURES = (
+        "opening_ucc",
+        "additions",
+        "dispositions",
+        "half_year_adjustment",
+        "cca",
+        "recapture",
+        "closing_ucc",
+    )
+
+    @classmethod
+    def add_asset(
+        cls, user_id: int, description: str, cca_class: str, acquired_on: date, cost: Decimal
+    ) -> CapitalAsset:
+        """Register a manually entered capital asset
+
+        Args:
+            user_id: The ID of the user who owns the asset
+            description: What the asset is
+            cca_class: CCA class number, one of ``CLASSES``
+            acquired_on: Date the asset became available for use
+            cost: Capital cost
+
+        Returns:
+            The created CapitalAsset
+
+        Raises:
+            ValueError: If the class is unknown or the cost is not positive
+        """
+        if cca_class not in cls.CLASSES:
+            raise ValueError(f"Unsupported CCA class: {cca_class}")
+        if cost <= 0:
+            raise ValueError("Cost must be greater than zero")
+
+        asset = CapitalAsset(
+            user_id=user_id,
+            description=description,
+            cca_class=cca_class,
+            acquired_on=acquired_on,
+            cost=cost,
+        )
+        db.session.add(asset)
+        CCABalance.invalidate(user_id, acquired_on.year)
+        db.session.commit()
+        return asset
+
+    @classmethod
+    def dispose_asset(cls, asset: CapitalAsset, disposed_on: date, proceeds: Decimal) -> CapitalAsset:
+        """Record the sale or retirement of an asset
+
+        Args:
+            asset: The asset disposed of
+            disposed_on: Date of disposition
+            proceeds: Proceeds of disposition
+
+        Returns:
+            The updated CapitalAsset
+
+        Raises:
+            ValueError: If the date is before the asset was acquired or proceeds are negative
+        """
+        if disposed_on < asset.acquired_on:
+            raise ValueError("Disposition date cannot be before the acquisition date")
+        if proceeds < 0:
+            raise ValueError("Proceeds cannot be negative")
+
+        from_year = min(disposed_on.year, asset.disposed_on.year if asset.disposed_on else disposed_on.year)
+        asset.disposed_on = disposed_on
+        asset.proceeds = proceeds
+        CCABalance.invalidate(asset.user_id, from_year)
+        db.session.commit()
+        return asset
+
+    @classmethod
+    def delete_asset(cls, asset: CapitalAsset) -> None:
+        """Delete a manually entered asset
+
+        Raises:
+            ValueError: If the asset is derived from an expense
+        """
+        if asset.expense_id is not None:
+            raise ValueError("Assets derived from expenses are removed by deleting or recategorizing the expense")
+
+        CCABalance.invalidate(asset.user_id, asset.acquired_on.year)
+        db.session.delete(asset)
+        db.session.commit()
+
+    @staticmethod
+    def _movements(user_id: int, first_year: int, last_year: int) -> Dict[Tuple[int, str], Dict[str, Decimal]]:
+        """Additions and dispositions per (year, class) for a range of years, in two grouped queries"""
+        movements: Dict[Tuple[int, str], Dict[str, Decimal]] = {}
+
+        acquired_year = extract("year", CapitalAsset.acquired_on)
+        additions = (
+            db.session.query(acquired_year.label("year"), CapitalAsset.cca_class, func.sum(CapitalAsset.cost))
+            .filter(CapitalAsset.user_id == user_id, acquired_year.between(first_year, last_year))
+            .group_by(acquired_year, CapitalAsset.cca_class)
+        )
+        # A disposition reduces the class by the lesser of the proceeds and the capital cost
+        disposed_year = extract("year", CapitalAsset.disposed_on)
+        reduction = case((CapitalAsset.proceeds < CapitalAsset.cost, CapitalAsset.proceeds), else_=CapitalAsset.cost)
+        dispositions = (
+            db.session.query(disposed_year.label("year"), CapitalAsset.cca_class, func.sum(reduction))
+            .filter(CapitalAsset.user_id == user_id, disposed_year.between(first_year, last_year))
+            .group_by(disposed_year, CapitalAsset.cca_class)
+        )
+
+        for measure, query in (("additions", additions), ("dispositions", dispositions)):
+            for year, cca_class, amount in query:
+                key = (int(year), cca_class)
+                movements.setdefault(key, {"additions": ZERO, "dispositions": ZERO})
+                movements[key][measure] = Decimal(str(amount or 0)).quantize(CENTS)
+        return movements
+
+    @classmethod
+    def _roll_forward(cls, cca_class: str, year: int, opening: Decimal, additions: Decimal, dispositions: Decimal) -> Dict[str, Any]:
+        """One year of a class: half-year rule on net additions, CCA at the class rate, recapture"""
+        rate = cls.CLASSES[cca_class][1]
+        net_additions = additions - dispositions
+        half_year_adjustment = (max(net_additions, ZERO) / 2).quantize(CENTS)
+        ucc = opening + net_additions
+
+        cca = recapture = ZERO
+        if ucc < 0:
+            # Dispositions exceeded the class balance: the excess is income and the class resets
+            recapture = -ucc
+            ucc = ZERO
+        else:
+            cca = ((ucc - half_year_adjustment) * rate).quantize(CENTS)
+
+        return {
+            "cca_class": cca_class,
+            "tax_year": year,
+            "opening_ucc": opening,
+            "additions": additions,
+            "dispositions": dispositions,
+            "half_year_adjustment": half_year_adjustment,
+            "cca": cca,
+            "recapture": recapture,
+            "closing_ucc": ucc - cca,
+        }
+
+    @classmethod
+    def balances(cls, user_id: int, year: int) -> List[CCABalance]:
+        """Per-class CCA balances for a user's tax year, computing and storing them if needed
+
+        Args:
+            user_id: The ID of the user whose assets to include
+            year: Tax year
+
+        Returns:
+            One CCABalance per class in ``CLASSES`` order. Years before the
+            user's first asset are all zero and are not stored.
+        """
+        order = list(cls.CLASSES)
+        stored = CCABalance.query.filter_by(user_id=user_id, tax_year=year).all()
+        if stored:
+            return sorted(stored, key=lambda balance: order.index(balance.cca_class))
+
+        latest = (
+            db.session.query(func.max(CCABalance.tax_year))
+            .filter(CCABalance.user_id == user_id, CCABalance.tax_year < year)
+            .scalar()
+        )
+        if latest is not None:
+            opening = {
+                balance.cca_class: balance.closing_ucc
+                for balance in CCABalance.query.filter_by(user_id=user_id, tax_year=latest)
+            }
+            first_year = latest + 1
+        else:
+            first_acquired = (
+                db.session.query(func.min(CapitalAsset.acquired_on)).filter(CapitalAsset.user_id == user_id).scalar()
+            )
+            if first_acquired is None or first_acquired.year > year:
+                return [
+                    CCABalance(user_id=user_id, cca_class=cca_class, tax_year=year, **{key: ZERO for key in cls.MEASURES})
+                    for cca_class in order
+                ]
+            opening = {}
+            first_year = first_acquired.year
+
+        movements = cls._movements(user_id, first_year, year)
+        rows = []
+        for tax_year in range(first_year, year + 1):
+            for cca_class in order:
+                moved = movements.get((tax_year, cca_class), {})
+                values = cls._roll_forward(
+                    cca_class,
+                    tax_year,
+                    opening.get(cca_class, ZERO),
+                    moved.get("additions", ZERO),
+                    moved.get("dispositions", ZERO),
+                )
+                opening[cca_class] = values["closing_ucc"]
+                rows.append(CCABalance(user_id=user_id, **values))
+
+        db.session.add_all(rows)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Another request stored the same years first
+            db.session.rollback()
+            return cls.balances(user_id, year)
+        return rows[-len(order):]
+
+    @classmethod
+    def schedule(cls, year: int, user_id: Optional[int] = None) -> Dict[str, Any]:
+        """Schedule 8 figures per CCA class for a tax year
+
+        Args:
+            year: Tax year
+            user_id: Only include this user's assets; None for all users
+
+        Returns:
+            Dictionary with ``year``, ``classes`` (one row per class with
+            ``cca_class``, ``description``, ``rate`` and a Decimal per
+            ``MEASURES`` key), ``totals`` and ``assets`` (the assets acquired or
+            disposed of in the year)
+        """
+        if user_id is not None:
+            user_ids = [user_id]
+        else:
+            user_ids = [row[0] for row in db.session.query(CapitalAsset.user_id).distinct()]
+        for owner_id in user_ids:
+            cls.balances(owner_id, year)
+
+        query = db.session.query(
+            CCABalance.cca_class, *(func.sum(getattr(CCABalance, key)).label(key) for key in cls.MEASURES)
+        ).filter(CCABalance.tax_year == year)
+        if user_id is not None:
+            query = query.filter(CCABalance.user_id == user_id)
+        summed = {row.cca_class: row for row in query.group_by(CCABalance.cca_class)}
+
+        classes = []
+        totals = {key: ZERO for key in cls.MEASURES}
+        for cca_class, (description, rate) in cls.CLASSES.items():
+            row = {"cca_class": cca_class, "description": description, "rate": rate}
+            for key in cls.MEASURES:
+                value = getattr(summed[cca_class], key) if cca_class in summed else 0
+                row[key] = Decimal(str(value or 0)).quantize(CENTS)
+                totals[key] += row[key]
+            classes.append(row)
+
+        assets = CapitalAsset.query.filter(
+            (extract("year", CapitalAsset.acquired_on) == year) | (extract("year", CapitalAsset.disposed_on) == year)
+        )
+        if user_id is not None:
+            assets = assets.filter(CapitalAsset.user_id == user_id)
+
+        return {
+            "year": year,
+            "classes": classes,
+            "totals": totals,
+            "assets": assets.order_by(CapitalAsset.cca_class, CapitalAsset.acquired_on).all(),
+        }
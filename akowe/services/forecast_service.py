@@ -0,0 +1,191 @@
+"""Service for forecasting monthly income and expenses from multi-year history."""
+
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Optional
+
+import numpy as np
+from flask import current_app
+from sqlalchemy import extract, func, literal, select, union_all
+
+from akowe.models import db
+from akowe.models.expense import Expense
+from akowe.models.income import Income
+
+_lock = threading.Lock()
+
+CENTS = Decimal("0.01")
+
+
+class ForecastService:
+    """Forecasts each month of a year with a seasonal naive model plus trend.
+
+    For each series (income and expenses) the previous ``HISTORY_YEARS`` years
+    give a seasonal profile, each calendar month's average deviation from its
+    year's monthly mean, and a linear trend in the monthly mean, extrapolated
+    to the forecast year. Months of the year that have already passed shift
+    the level toward what actually happened, weighted by how much of the year
+    has passed. With no history, the forecast is the average of the months so
+    far.
+
+    All monthly totals come from one grouped query. Fitted parameters are
+    cached per user, year and month in ``app.extensions`` and reused until an
+    income or expense is added, changed or deleted.
+    """
+
+    HISTORY_YEARS = 3
+
+    SERIES = {"income": Income, "expenses": Expense}
+
+    @staticmethod
+    def months_elapsed(year: int) -> int:
+        """Months of the year with actual data: all 12 for past years, none for future years"""
+        today = datetime.now().date()
+        if year < today.year:
+            return 12
+        if year > today.year:
+            return 0
+        return today.month
+
+    @classmethod
+    def _monthly_totals(cls, year: int, history_years: int, user_id: Optional[int]) -> Dict[str, np.ndarray]:
+        """Per-month totals for the history years and the forecast year, in one grouped query
+
+        Returns:
+            Dictionary of series name to a ``(history_years + 1, 12)`` array,
+            oldest year first
+        """
+        first_year = year - history_years
+        # Range filters rather than extract(year) so the date columns' indexes apply
+        start, end = date(first_year, 1, 1), date(year + 1, 1, 1)
+
+        selects = []
+        for name, model in cls.SERIES.items():
+            query = select(
+                literal(name).label("series"),
+                extract("year", model.date).label("year"),
+                extract("month", model.date).label("month"),
+                func.sum(model.amount).label("value"),
+            ).where(model.date >= start, model.date < end)
+            if user_id is not None:
+                query = query.where(model.user_id == user_id)
+            selects.append(query.group_by("year", "month"))
+
+        totals = {name: np.zeros((history_years + 1, 12)) for name in cls.SERIES}
+        for row in db.session.execute(union_all(*selects)):
+            totals[row.series][int(row.year) - first_year, int(row.month) - 1] = float(row.value or 0)
+        return totals
+
+    @staticmethod
+    def _fit(history: np.ndarray, actual: np.ndarray) -> Dict[str, Any]:
+        """Fit level, trend and seasonal profile for one series
+
+        Args:
+            history: ``(years, 12)`` monthly totals of previous years, oldest first
+            actual: Monthly totals of the months of the forecast year that have passed
+
+        Returns:
+            Dictionary with ``level`` (expected monthly mean for the forecast
+            year), ``trend`` (change in the monthly mean per year), ``seasonal``
+            (twelve monthly deviations from the mean) and ``years`` (history
+            years used)
+        """
+        # Ignore years before the series has any data
+        active = np.flatnonzero(history.any(axis=1))
+        history = history[active[0]:] if active.size else history[:0]
+        years = len(history)
+
+        seasonal = np.zeros(12)
+        level = trend = 0.0
+        if years:
+            means = history.mean(axis=1)
+            seasonal = (history - means[:, None]).mean(axis=0)
+            if years > 1:
+                trend, intercept = np.polyfit(np.arange(years), means, 1)
+                level = intercept + trend * years
+            else:
+                level = means[0]
+
+        months = len(actual)
+        if months:
+            if years:
+                # Credit the months so far in proportion to how much of the year they cover
+                surprise = (actual - (level + seasonal[:months])).mean()
+                level += surprise * months / 12
+            else:
+                level = actual.mean()
+
+        return {"level": float(level), "trend": float(trend), "seasonal": seasonal.tolist(), "years": years}
+
+    @classmethod
+    def _data_version(cls, user_id: Optional[int]) -> tuple:
+        """Latest change time and row count of each series, in one SELECT"""
+        subqueries = []
+        for model in cls.SERIES.values():
+            for aggregate in (func.max(model.updated_at), func.count(model.id)):
+                query = select(aggregate)
+                if user_id is not None:
+                    query = query.where(model.user_id == user_id)
+                subqueries.append(query.scalar_subquery())
+        return tuple(db.session.execute(select(*subqueries)).one())
+
+    @classmethod
+    def _fitted(cls, year: int, history_years: int, user_id: Optional[int]) -> Dict[str, Any]:
+        """Fitted parameters for each series, from the cache when the data has not changed"""
+        months = cls.months_elapsed(year)
+        key = (user_id, year, history_years, months)
+        version = cls._data_version(user_id)
+
+        cache = current_app.extensions.setdefault("forecast", {})
+        with _lock:
+            entry = cache.get(key)
+        if entry and entry[0] == version:
+            return entry[1]
+
+        totals = cls._monthly_totals(year, history_years, user_id)
+        fitted = {"months_elapsed": months}
+        for name, values in totals.items():
+            fitted[name] = cls._fit(values[:-1], values[-1, :months])
+            fitted[name]["actual"] = values[-1, :months].tolist()
+
+        with _lock:
+            cache[key] = (version, fitted)
+        return fitted
+
+    @classmethod
+    def invalidate(cls, user_id: Optional[int] = None) -> None:
+        """Drop cached forecasts for one user, or for everyone"""
+        with _lock:
+            cache = current_app.extensions.get("forecast", {})
+            for key in [key for key in cache if user_id is None or key[0] == user_id]:
+                del cache[key]
+
+    @classmethod
+    def forecast(cls, year: int, user_id: Optional[int] = None, history_years: Optional[int] = None) -> Dict[str, Any]:
+        """Monthly income and expenses for a year: actual for months passed, forecast for the rest
+
+        Args:
+            year: Year to forecast
+            user_id: Only include this user's records; None for all users
+            history_years: Previous years to learn seasonality and trend from
+                (defaults to ``HISTORY_YEARS``)
+
+        Returns:
+            Dictionary with ``year``, ``months_elapsed``, ``income`` and
+            ``expenses`` (twelve Decimals each, January first) and
+            ``parameters`` (the fitted ``level``, ``trend``, ``seasonal`` and
+            ``years`` of history used, per series)
+        """
+        history_years = cls.HISTORY_YEARS if history_years is None else history_years
+        fitted = cls._fitted(year, history_years, user_id)
+        months = fitted["months_elapsed"]
+
+        result = {"year": year, "months_elapsed": months, "parameters": {}}
+        for name in cls.SERIES:
+            params = fitted[name]
+            projected = np.maximum(params["level"] + np.array(params["seasonal"][months:]), 0.0)
+            monthly = params["actual"] + projected.tolist()
+            result[name] = [Decimal(f"{value:.2f}") for value in monthly]
+            result["parameters"][name] = {key: params[key] for key in ("level", "trend", "seasonal", "years")}
+        return result
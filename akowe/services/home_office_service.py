@@ -1,9 +1,19 @@
 """Service for calculating home office expense deductions for tax purposes."""
 
+from datetime import date
 from decimal import Decimal
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 
-from akowe.models.home_office import HomeOffice
+from sqlalchemy import func
+
+from akowe.models.expense import Expense
+from akowe.models.home_office import (
+    EXPENSE_FIELDS,
+    LEDGER_CATEGORIES,
+    LEDGER_FIELDS,
+    HomeOffice,
+    HomeOfficeDeduction,
+)
 from akowe.models import db
 
 
@@ -59,24 +69,15 @@ class HomeOfficeService:
             is_primary_income=data.get("is_primary_income", True),
             hours_per_week=int(data.get("hours_per_week", 0)),
             calculation_method=data.get("calculation_method", "percentage"),
+            linked_to_expenses=bool(data.get("linked_to_expenses", False)),
         )
         
-        # Calculate business use percentage
-        if home_office.total_home_area > 0:
-            home_office.business_use_percentage = (
-                (home_office.office_area / home_office.total_home_area) * 100
-            ).quantize(Decimal("0.01"))
-        
-        # Get the simplified rate if using that method
-        if home_office.calculation_method == "simplified":
-            country_code = data.get("country_code", "CA")
-            tax_year = str(home_office.tax_year)
-            home_office.simplified_rate = cls.SIMPLIFIED_RATES.get(country_code, {}).get(
-                tax_year, Decimal("0.00")
-            )
+        # Take the linked expenses from the ledger rather than the submitted values
+        if home_office.linked_to_expenses:
+            cls.fill_from_ledger(home_office)
         
-        # Calculate total deduction
-        home_office.total_deduction = cls.calculate_deduction(home_office, data.get("country_code", "CA"))
+        # Calculate the percentage, total deduction and stored breakdown
+        cls.apply_calculation(home_office, data.get("country_code") or "CA")
         
         # Save to database
         db.session.add(home_office)
@@ -130,7 +131,84 @@ class HomeOfficeService:
             home_office.hours_per_week = int(data["hours_per_week"])
         if "calculation_method" in data:
             home_office.calculation_method = data["calculation_method"]
+        if "linked_to_expenses" in data:
+            home_office.linked_to_expenses = bool(data["linked_to_expenses"])
+        
+        # Take the linked expenses from the ledger rather than the submitted values
+        if home_office.linked_to_expenses:
+            cls.fill_from_ledger(home_office)
+            
+        # Recalculate the percentage, total deduction and stored breakdown
+        cls.apply_calculation(home_office, data.get("country_code") or "CA")
+        
+        # Save to database
+        db.session.commit()
+        
+        return home_office
+    
+    @classmethod
+    def ledger_totals(cls, user_id: int, tax_year: int) -> Dict[str, Decimal]:
+        """Total a user's home-related expenses for a tax year, by claim field, in one grouped query.
+        
+        Cancelled expenses are not counted. See ``LEDGER_CATEGORIES`` for which
+        expense categories feed which field.
+        
+        Args:
+            user_id: The ID of the user whose expenses to total
+            tax_year: The tax year to total
+            
+        Returns:
+            Dictionary of each field in ``LEDGER_FIELDS`` to its total
+        """
+        totals = {field: Decimal("0.00") for field in LEDGER_FIELDS}
+        rows = (
+            db.session.query(Expense.category, func.sum(Expense.amount))
+            .filter(
+                Expense.user_id == user_id,
+                Expense.date >= date(tax_year, 1, 1),
+                Expense.date < date(tax_year + 1, 1, 1),
+                Expense.category.in_(list(LEDGER_CATEGORIES)),
+                Expense.status != "cancelled",
+            )
+            .group_by(Expense.category)
+            .all()
+        )
+        for category, amount in rows:
+            totals[LEDGER_CATEGORIES[category]] += Decimal(str(amount or 0))
+        return totals
+    
+    @classmethod
+    def fill_from_ledger(cls, home_office: HomeOffice) -> HomeOffice:
+        """Set a claim's ``LEDGER_FIELDS`` from its tax year's expenses.
+        
+        Once filled, claims with ``linked_to_expenses`` are kept in step by
+        the expense listeners in ``akowe.models.home_office``. The caller
+        recalculates and commits.
+        
+        Args:
+            home_office: The HomeOffice instance to fill
             
+        Returns:
+            The same HomeOffice instance
+        """
+        for field, amount in cls.ledger_totals(home_office.user_id, home_office.tax_year).items():
+            setattr(home_office, field, amount)
+        return home_office
+    
+    @classmethod
+    def apply_calculation(cls, home_office: HomeOffice, country_code: str = "CA") -> HomeOffice:
+        """Calculate a claim's business use percentage, total deduction and per-expense breakdown.
+        
+        The breakdown is stored as HomeOfficeDeduction rows, updated in place.
+        The caller commits.
+        
+        Args:
+            home_office: The HomeOffice instance to calculate
+            country_code: Country code for tax rules (CA or US)
+            
+        Returns:
+            The same HomeOffice instance
+        """
         # Calculate business use percentage
         if home_office.total_home_area > 0:
             home_office.business_use_percentage = (
@@ -139,20 +217,93 @@ class HomeOfficeService:
         
         # Get the simplified rate if using that method
         if home_office.calculation_method == "simplified":
-            country_code = data.get("country_code", "CA")
-            tax_year = str(home_office.tax_year)
             home_office.simplified_rate = cls.SIMPLIFIED_RATES.get(country_code, {}).get(
-                tax_year, Decimal("0.00")
+                str(home_office.tax_year), Decimal("0.00")
             )
         
         # Calculate total deduction
-        home_office.total_deduction = cls.calculate_deduction(home_office, data.get("country_code", "CA"))
+        home_office.total_deduction = cls.calculate_deduction(home_office, country_code)
         
-        # Save to database
-        db.session.commit()
+        # Store the business share of each expense; the simplified method does not split by expense
+        existing = {row.category: row for row in home_office.deductions}
+        for field in EXPENSE_FIELDS:
+            row = existing.get(field)
+            if row is None:
+                row = HomeOfficeDeduction(category=field)
+                home_office.deductions.append(row)
+            row.amount = getattr(home_office, field) or Decimal("0.00")
+            if home_office.calculation_method == "simplified":
+                row.deductible = Decimal("0.00")
+            else:
+                row.deductible = home_office.deductible(field)
         
         return home_office
     
+    @classmethod
+    def calculate_all(cls, user_id: int, country_code: str = "CA") -> List[HomeOffice]:
+        """Recalculate and store every home office claim of a user in one pass.
+        
+        Claims and their stored breakdowns are loaded in two queries and saved
+        in a single commit.
+        
+        Args:
+            user_id: The ID of the user whose claims to calculate
+            country_code: Country code for tax rules (CA or US)
+            
+        Returns:
+            The user's claims, oldest tax year first
+        """
+        claims = (
+            HomeOffice.query.filter_by(user_id=user_id)
+            .order_by(HomeOffice.tax_year, HomeOffice.id)
+            .all()
+        )
+        for home_office in claims:
+            cls.apply_calculation(home_office, country_code)
+        db.session.commit()
+        return claims
+    
+    @classmethod
+    def compare_claims(cls, user_id: int) -> Dict[str, Any]:
+        """Side-by-side comparison of a user's claims across tax years, from the stored breakdowns.
+        
+        Claims that have never been calculated (for example, created before
+        breakdowns were stored) are calculated and stored first.
+        
+        Args:
+            user_id: The ID of the user whose claims to compare
+            
+        Returns:
+            Dictionary with ``claims`` (oldest tax year first), ``rows`` (one per
+            expense with ``field``, ``amounts`` and ``deductibles``, each a list
+            aligned with ``claims``) and ``totals`` (total deduction per claim)
+        """
+        claims = (
+            HomeOffice.query.filter_by(user_id=user_id)
+            .order_by(HomeOffice.tax_year, HomeOffice.id)
+            .all()
+        )
+        if any(not home_office.deductions for home_office in claims):
+            for home_office in claims:
+                if not home_office.deductions:
+                    cls.apply_calculation(home_office)
+            db.session.commit()
+        
+        breakdowns = [{row.category: row for row in home_office.deductions} for home_office in claims]
+        rows = []
+        for field in EXPENSE_FIELDS:
+            rows.append({
+                "field": field,
+                "amounts": [breakdown[field].amount for breakdown in breakdowns],
+                "deductibles": [breakdown[field].deductible for breakdown in breakdowns],
+            })
+        
+        return {
+            "claims": claims,
+            "rows": rows,
+            "totals": [home_office.total_deduction for home_office in claims],
+        }
+    
     @classmethod
     def calculate_deduction(cls, home_office: HomeOffice, country_code: str = "CA") -> Decimal:
         """Calculate the total home office deduction.
@@ -238,6 +389,7 @@ class HomeOfficeService:
         home_office = HomeOffice.query.get(home_office_id)
         if not home_office:
             return None, {}
+        breakdown = home_office.stored_breakdown()
             
         details = {
             "id": home_office.id,
@@ -247,6 +399,7 @@ class HomeOfficeService:
             "area_unit": home_office.area_unit,
             "business_use_percentage": float(home_office.business_use_percentage),
             "calculation_method": home_office.calculation_method,
+            "linked_to_expenses": home_office.linked_to_expenses,
             "total_deduction": float(home_office.total_deduction),
             
             # Expense breakdown
@@ -261,16 +414,10 @@ class HomeOfficeService:
                 "phone": float(home_office.phone),
             },
             
-            # Deductible breakdown
+            # Deductible breakdown, as stored when the claim was calculated
             "deductible": {
-                "rent": float(home_office.deductible_rent),
-                "mortgage_interest": float(home_office.deductible_mortgage_interest),
-                "property_tax": float(home_office.deductible_property_tax),
-                "home_insurance": float(home_office.deductible_home_insurance),
-                "utilities": float(home_office.deductible_utilities),
-                "maintenance": float(home_office.deductible_maintenance),
-                "internet": float(home_office.deductible_internet),
-                "phone": float(home_office.deductible_phone),
+                field: float(breakdown[field]) if breakdown else float(home_office.deductible(field))
+                for field in EXPENSE_FIELDS
             }
         }
         
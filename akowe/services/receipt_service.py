@@ -0,0 +1,113 @@
+"""Service for storing expense receipts once per unique file content."""
+
+from typing import Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+
+from akowe.models import db
+from akowe.models.receipt import Receipt
+from akowe.services.storage_service import StorageService
+
+
+class ReceiptService:
+    """Content-addressed, reference-counted receipt storage.
+
+    Uploads are hashed before they are sent to Azure. A file whose hash is already
+    known is not uploaded again; the existing blob gets another reference instead.
+    Callers are responsible for committing the session; blobs released in a
+    transaction are only deleted from storage once it commits.
+    """
+
+    @staticmethod
+    def attach(file_data, container_name: str) -> Tuple[str, str]:
+        """Store a receipt (or reuse an identical one) and take a reference to it
+
+        Args:
+            file_data: File data from request.files
+            container_name: Container name in Azure Storage
+
+        Returns:
+            Tuple containing (blob_name, blob_url)
+        """
+        content_hash, size = StorageService.hash_file(file_data)
+
+        receipt = Receipt.query.filter_by(content_hash=content_hash).first()
+        if receipt is None:
+            file_extension = StorageService.get_file_extension(file_data.filename)
+            blob_name = f"{content_hash}.{file_extension}" if file_extension else content_hash
+            blob_name, blob_url = StorageService.upload_file(
+                file_data, container_name, blob_name=blob_name
+            )
+            receipt = Receipt(
+                content_hash=content_hash,
+                blob_name=blob_name,
+                blob_url=blob_url,
+                size=size,
+                ref_count=0,
+            )
+            # A concurrent first upload of the same file may insert the row first;
+            # its blob has the same content-derived name, so reference that row instead
+            try:
+                with db.session.begin_nested():
+                    db.session.add(receipt)
+            except IntegrityError:
+                receipt = Receipt.query.filter_by(content_hash=content_hash).one()
+
+        # Increment in SQL so concurrent attaches don't lose a reference
+        Receipt.query.filter_by(id=receipt.id).update(
+            {Receipt.ref_count: Receipt.ref_count + 1}, synchronize_session=False
+        )
+        return receipt.blob_name, receipt.blob_url
+
+    @staticmethod
+    def release(blob_name: Optional[str], container_name: str) -> None:
+        """Drop one reference to a receipt, deleting the blob when none remain
+
+        Blobs uploaded before deduplication have no receipt row and are deleted
+        directly, as they were never shared.
+
+        Args:
+            blob_name: Name of the blob referenced by the expense
+            container_name: Container name in Azure Storage
+        """
+        if not blob_name:
+            return
+
+        receipt = Receipt.query.filter_by(blob_name=blob_name).first()
+        if receipt is None:
+            _delete_after_commit(blob_name, container_name)
+            return
+
+        Receipt.query.filter_by(id=receipt.id).update(
+            {Receipt.ref_count: Receipt.ref_count - 1}, synchronize_session=False
+        )
+        db.session.refresh(receipt)
+
+        if receipt.ref_count <= 0:
+            db.session.delete(receipt)
+            _delete_after_commit(blob_name, container_name)
+
+
+def _delete_after_commit(blob_name: str, container_name: str) -> None:
+    """Queue a blob for deletion once the current transaction commits"""
+    session = db.session()
+    session.info.setdefault("released_receipts", []).append((blob_name, container_name))
+    if not event.contains(session, "after_commit", _delete_released_blobs):
+        event.listen(session, "after_commit", _delete_released_blobs)
+        event.listen(session, "after_rollback", _forget_released_blobs)
+
+
+def _delete_released_blobs(session) -> None:
+    for blob_name, container_name in session.info.pop("released_receipts", []):
+        try:
+            StorageService.delete_file(blob_name, container_name)
+        except Exception as e:
+            # The rows are already gone; an orphaned blob only costs storage
+            current_app.logger.error(f"Error deleting receipt blob {blob_name}: {str(e)}")
+
+
+def _forget_released_blobs(session) -> None:
+    # The references were restored by the rollback, so the blobs are still in use
+    session.info.pop("released_receipts", None)
@@ -0,0 +1,228 @@
+"""Service for the GST/HST (and QST) remittance report per filing period."""
+
+import calendar
+import csv
+import io
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import BigInteger, case, cast, extract, func
+
+from akowe.app.tax_dashboard import MAX_TAX_YEAR, MIN_TAX_YEAR
+from akowe.models import db
+from akowe.models.expense import Expense
+from akowe.models.income import Income
+from akowe.services.sales_tax_service import SalesTax
+
+
+def _month_end(year: int, month: int) -> date:
+    return date(year, month, calendar.monthrange(year, month)[1])
+
+
+class RemittanceReportService:
+    """Sales tax collected, input tax credits and net remittance per filing period.
+
+    Income and expenses are each summed per period in one grouped query, and
+    the tax is backed out of each period's totals with the ``SalesTax`` rates
+    for the province (the ``GST_HST_RATES``/``QST_RATE`` tables), the way the
+    figures are entered on a return, so no records are loaded.
+    """
+
+    # Filing frequency -> months per reporting period
+    PERIODS = {"monthly": 1, "quarterly": 3, "annual": 12}
+
+    # Measures summed into the report totals, in column order
+    MEASURES = (
+        "total_sales",
+        "gst_hst_collected",
+        "qst_collected",
+        "tax_collected",
+        "total_purchases",
+        "gst_hst_itc",
+        "qst_itc",
+        "input_tax_credits",
+        "net_remittance",
+    )
+
+    @staticmethod
+    def _period_index(model, months: int):
+        # 1-based period number within the year, computed in SQL from the record's month
+        month = extract("month", model.date)
+        if months == 1:
+            return month
+        return case(
+            *((month <= end, number) for number, end in enumerate(range(months, 12, months), start=1)),
+            else_=12 // months,
+        )
+
+    @classmethod
+    def _period_totals(cls, model, year: int, months: int, user_id: Optional[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-period record counts and tax-included totals in cents for one table"""
+        count = 12 // months
+        totals = np.zeros(count, dtype=np.int64)
+        counts = np.zeros(count, dtype=np.int64)
+
+        aggregates = (
+            func.count(model.id).label("record_count"),
+            cast(func.round(func.sum(model.amount) * 100), BigInteger).label("cents"),
+        )
+        if months == 12:
+            query = db.session.query(*aggregates)
+        else:
+            period = cls._period_index(model, months)
+            query = db.session.query(period.label("period"), *aggregates).group_by(period)
+
+        query = query.filter(model.date >= date(year, 1, 1), model.date < date(year + 1, 1, 1))
+        if user_id is not None:
+            query = query.filter(model.user_id == user_id)
+
+        for row in query.all():
+            index = int(row.period) - 1 if months != 12 else 0
+            counts[index] = row.record_count or 0
+            totals[index] = row.cents or 0
+        return counts, totals
+
+    @staticmethod
+    def _period_dates(year: int, number: int, months: int) -> Dict[str, Any]:
+        first_month = (number - 1) * months + 1
+        last_month = first_month + months - 1
+        start_date = date(year, first_month, 1)
+        end_date = _month_end(year, last_month)
+
+        if months == 12:
+            label = str(year)
+            # Annual filers pay by April 30 (self-employed individuals file by June 15)
+            due_date = date(year + 1, 4, 30)
+        else:
+            if months == 1:
+                label = start_date.strftime("%B %Y")
+            else:
+                label = f"Q{number} ({start_date:%b}-{end_date:%b}) {year}"
+            # Monthly and quarterly returns are due one month after the period ends
+            due_date = _month_end(year + 1, 1) if last_month == 12 else _month_end(year, last_month + 1)
+
+        return {"label": label, "start_date": start_date, "end_date": end_date, "due_date": due_date}
+
+    @classmethod
+    def report(
+        cls, year: int, province: str = "Ontario", period: str = "quarterly", user_id: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """GST/HST (and QST) collected, input tax credits and net remittance per filing period
+
+        Args:
+            year: Tax year
+            province: Province whose GST/HST (and QST) rates apply
+            period: Filing frequency: ``monthly``, ``quarterly`` or ``annual``
+            user_id: Only include this user's records; None for all
+
+        Returns:
+            Dictionary with ``year``, ``province``, ``period``, ``tax_label``,
+            ``periods`` (one row per reporting period with ``period``, ``label``,
+            ``start_date``, ``end_date``, ``due_date``, ``income_count``,
+            ``expense_count`` and a Decimal per ``MEASURES`` key) and ``totals``
+            (counts and measures summed over the year). A negative
+            ``net_remittance`` is a refund.
+
+        Raises:
+            ValueError: If period is not supported or the year is out of range
+        """
+        if period not in cls.PERIODS:
+            raise ValueError(f"Unsupported filing period: {period}")
+        if not MIN_TAX_YEAR <= year <= MAX_TAX_YEAR:
+            raise ValueError(f"Year must be between {MIN_TAX_YEAR} and {MAX_TAX_YEAR}")
+
+        months = cls.PERIODS[period]
+        tax = SalesTax(province)
+        income_counts, sales = cls._period_totals(Income, year, months, user_id)
+        expense_counts, purchases = cls._period_totals(Expense, year, months, user_id)
+
+        gst_collected, qst_collected = tax.collected_parts(sales)
+        gst_itc, qst_itc = tax.paid_parts(purchases)
+        columns = {
+            "total_sales": sales,
+            "gst_hst_collected": gst_collected,
+            "qst_collected": qst_collected,
+            "tax_collected": gst_collected + qst_collected,
+            "total_purchases": purchases,
+            "gst_hst_itc": gst_itc,
+            "qst_itc": qst_itc,
+            "input_tax_credits": gst_itc + qst_itc,
+        }
+        columns["net_remittance"] = columns["tax_collected"] - columns["input_tax_credits"]
+        amounts = {key: values.tolist() for key, values in columns.items()}
+
+        totals: Dict[str, Any] = {
+            "income_count": int(income_counts.sum()),
+            "expense_count": int(expense_counts.sum()),
+            **{key: Decimal(int(sum(amounts[key]))).scaleb(-2) for key in cls.MEASURES},
+        }
+
+        periods = []
+        for index in range(12 // months):
+            row: Dict[str, Any] = {"period": index + 1, **cls._period_dates(year, index + 1, months)}
+            row["income_count"] = int(income_counts[index])
+            row["expense_count"] = int(expense_counts[index])
+            for key in cls.MEASURES:
+                row[key] = Decimal(int(amounts[key][index])).scaleb(-2)
+            periods.append(row)
+
+        return {
+            "year": year,
+            "province": province,
+            "period": period,
+            "tax_label": tax.label,
+            "periods": periods,
+            "totals": totals,
+        }
+
+    @classmethod
+    def to_csv(cls, report: Dict[str, Any]) -> Tuple[io.BytesIO, str]:
+        """Render a remittance report as CSV with a closing totals row
+
+        Args:
+            report: A report returned by ``report``
+
+        Returns:
+            Tuple containing the CSV data as BytesIO and the filename
+        """
+        string_buffer = io.StringIO()
+        writer = csv.writer(string_buffer)
+
+        writer.writerow(
+            ["period", "start_date", "end_date", "due_date", "income_count", "expense_count", *cls.MEASURES]
+        )
+        for row in report["periods"]:
+            writer.writerow(
+                [
+                    row["label"],
+                    row["start_date"].isoformat(),
+                    row["end_date"].isoformat(),
+                    row["due_date"].isoformat(),
+                    row["income_count"],
+                    row["expense_count"],
+                    *(f"{row[key]:.2f}" for key in cls.MEASURES),
+                ]
+            )
+        totals = report["totals"]
+        writer.writerow(
+            [
+                "Total",
+                "",
+                "",
+                "",
+                totals["income_count"],
+                totals["expense_count"],
+                *(f"{totals[key]:.2f}" for key in cls.MEASURES),
+            ]
+        )
+
+        bytes_buffer = io.BytesIO()
+        bytes_buffer.write(string_buffer.getvalue().encode("utf-8"))
+        bytes_buffer.seek(0)
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"gst_hst_remittance_{report['year']}_{report['period']}_{timestamp}.csv"
+
+        return bytes_buffer, filename
@@ -0,0 +1,176 @@
+"""Service for backing GST/HST/QST out of tax-included amounts, a column at a time."""
+
+from datetime import date
+from decimal import Decimal, ROUND_HALF_EVEN
+from fractions import Fraction
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import BigInteger, cast, func
+
+from akowe.models import db
+from akowe.models.expense import Expense
+from akowe.models.income import Income
+from akowe.app.tax_dashboard import GST_HST_RATES, QST_RATE
+
+_INT64_MAX = np.iinfo(np.int64).max
+
+
+def to_cents(amounts: Iterable) -> np.ndarray:
+    """Convert Decimal (or numeric) amounts to an integer array of cents
+
+    Amounts are rounded half-even to the cent. Values too large for int64 give
+    an object array of Python ints, which the calculations handle the same way.
+    """
+    cents = [
+        int((amount if isinstance(amount, Decimal) else Decimal(amount)).scaleb(2).to_integral_value(ROUND_HALF_EVEN))
+        for amount in amounts
+    ]
+    if not cents:
+        return np.zeros(0, dtype=np.int64)
+    return np.array(cents)
+
+
+def from_cents(cents: np.ndarray) -> List[Decimal]:
+    """Convert an array of cents back to two-place Decimals"""
+    return [Decimal(value).scaleb(-2) for value in cents.tolist()]
+
+
+def _scale(cents: np.ndarray, factor: Fraction) -> np.ndarray:
+    """Exactly compute ``cents * factor`` rounded half-even to whole cents"""
+    if cents.dtype != object and cents.size and int(np.abs(cents).max()) > _INT64_MAX // max(factor.numerator, 1):
+        cents = cents.astype(object)
+
+    scaled = cents * factor.numerator
+    quotient = scaled // factor.denominator
+    remainder = scaled - quotient * factor.denominator
+    twice = remainder * 2
+    round_up = (twice > factor.denominator) | ((twice == factor.denominator) & (quotient % 2 == 1))
+    return quotient + round_up
+
+
+class SalesTax:
+    """GST/HST (and QST for Quebec) rates for a province.
+
+    Amounts in the database include sales tax, so the methods back the tax
+    portion out of tax-included amounts. Rates are held as exact fractions and
+    amounts as integer cents in NumPy arrays, so a whole column is processed
+    with a handful of array operations and rounds exactly as ``Decimal``
+    ``quantize`` with ``ROUND_HALF_EVEN`` would, with no float error.
+    """
+
+    def __init__(self, province: str = "Ontario"):
+        self.province = province
+        self.is_quebec = province == "Quebec"
+        self.gst_hst_rate = Decimal(str(GST_HST_RATES.get(province, 0.05)))  # Default to 5% if not found
+        self.qst_rate = Decimal(str(QST_RATE)) if self.is_quebec else Decimal("0")
+
+        rate, qst_rate = Fraction(self.gst_hst_rate), Fraction(self.qst_rate)
+        # Share of a tax-included amount that is GST/HST (GST is on the pre-QST amount)
+        self._gst_factor = rate / (1 + rate + rate * qst_rate)
+        # Share of a QST-included amount that is QST
+        self._qst_factor = qst_rate / (1 + qst_rate)
+
+    @property
+    def label(self) -> str:
+        """Column label for the tax, e.g. ``GST/HST`` or ``GST/QST``"""
+        return "GST/QST" if self.is_quebec else "GST/HST"
+
+    def paid_parts(self, cents: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """GST/HST and QST included in expense amounts, in cents
+
+        Args:
+            cents: Tax-included expense amounts in cents
+
+        Returns:
+            Tuple of (GST/HST, QST) arrays in cents; QST is zero outside Quebec
+        """
+        gst = _scale(cents, self._gst_factor)
+        # Expense QST is backed out of the amount plus GST, as the exports always have
+        qst = _scale(cents + gst, self._qst_factor) if self.is_quebec else np.zeros_like(gst)
+        return gst, qst
+
+    def collected_parts(self, cents: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """GST/HST and QST included in income amounts, in cents
+
+        Args:
+            cents: Tax-included income amounts in cents
+
+        Returns:
+            Tuple of (GST/HST, QST) arrays in cents; QST is zero outside Quebec
+        """
+        gst = _scale(cents, self._gst_factor)
+        qst = _scale(cents - gst, self._qst_factor) if self.is_quebec else np.zeros_like(gst)
+        return gst, qst
+
+    def paid(self, amounts: Iterable) -> List[Decimal]:
+        """Total sales tax included in each expense amount"""
+        gst, qst = self.paid_parts(to_cents(amounts))
+        return from_cents(gst + qst)
+
+    def collected(self, amounts: Iterable) -> List[Decimal]:
+        """Total sales tax included in each income amount"""
+        gst, qst = self.collected_parts(to_cents(amounts))
+        return from_cents(gst + qst)
+
+
+class SalesTaxService:
+    """Year-level GST/HST remittance figures built on the vectorized calculator"""
+
+    @staticmethod
+    def _amounts(model, year: int, user_id: Optional[int]) -> np.ndarray:
+        # Amounts are stored with two decimal places, so the database can scale them to exact cents
+        query = db.session.query(cast(func.round(model.amount * 100), BigInteger)).filter(
+            model.date >= date(year, 1, 1), model.date < date(year + 1, 1, 1)
+        )
+        if user_id is not None:
+            query = query.filter(model.user_id == user_id)
+        return np.fromiter((cents for (cents,) in query), dtype=np.int64)
+
+    @classmethod
+    def remittance_summary(cls, year: int, province: str = "Ontario", user_id: Optional[int] = None) -> Dict[str, Any]:
+        """GST/HST collected, input tax credits and net remittance for a year
+
+        Only the amount columns are read; the per-row tax back-calculation is
+        done on whole arrays.
+
+        Args:
+            year: Tax year
+            province: Province whose GST/HST (and QST) rates apply
+            user_id: Only include this user's records; None for all
+
+        Returns:
+            Dictionary with ``year``, ``province``, ``tax_label``, record counts,
+            ``total_sales`` and ``total_purchases`` (tax included), and Decimal
+            ``gst_hst_collected``, ``qst_collected``, ``tax_collected``,
+            ``gst_hst_itc``, ``qst_itc``, ``input_tax_credits`` and
+            ``net_remittance`` (collected minus ITCs; negative means a refund)
+        """
+        tax = SalesTax(province)
+        income_cents = cls._amounts(Income, year, user_id)
+        expense_cents = cls._amounts(Expense, year, user_id)
+
+        gst_collected, qst_collected = tax.collected_parts(income_cents)
+        gst_itc, qst_itc = tax.paid_parts(expense_cents)
+
+        totals = {
+            "total_sales": income_cents.sum(),
+            "total_purchases": expense_cents.sum(),
+            "gst_hst_collected": gst_collected.sum(),
+            "qst_collected": qst_collected.sum(),
+            "gst_hst_itc": gst_itc.sum(),
+            "qst_itc": qst_itc.sum(),
+        }
+        totals["tax_collected"] = totals["gst_hst_collected"] + totals["qst_collected"]
+        totals["input_tax_credits"] = totals["gst_hst_itc"] + totals["qst_itc"]
+        totals["net_remittance"] = totals["tax_collected"] - totals["input_tax_credits"]
+
+        summary: Dict[str, Any] = {
+            "year": year,
+            "province": province,
+            "tax_label": tax.label,
+            "income_count": len(income_cents),
+            "expense_count": len(expense_cents),
+        }
+        summary.update({key: Decimal(int(value)).scaleb(-2) for key, value in totals.items()})
+        return summary
@@ -1,7 +1,8 @@
+import hashlib
 import os
 import uuid
 from datetime import datetime, timedelta
-from typing import Tuple
+from typing import Optional, Tuple
 
 from azure.storage.blob import (
     BlobServiceClient,
@@ -11,6 +12,9 @@ from azure.storage.blob import (
 )
 
 
+HASH_CHUNK_SIZE = 64 * 1024
+
+
 class StorageService:
     """Service for handling file uploads to Azure Blob Storage"""
 
@@ -30,23 +34,53 @@ class StorageService:
         return blob_service_client.get_container_client(container_name)
 
     @staticmethod
-    def upload_file(file_data, container_name: str) -> Tuple[str, str]:
+    def get_file_extension(filename: str) -> str:
+        """Return the lower-cased extension of a filename, or an empty string"""
+        return filename.rsplit(".", 1)[1].lower() if filename and "." in filename else ""
+
+    @staticmethod
+    def hash_file(file_data) -> Tuple[str, int]:
+        """Compute the SHA-256 of an uploaded file by streaming it in chunks
+
+        The stream is rewound afterwards so it can still be uploaded.
+
+        Args:
+            file_data: File data from request.files
+
+        Returns:
+            Tuple containing (hex digest, size in bytes)
+        """
+        digest = hashlib.sha256()
+        size = 0
+        file_data.seek(0)
+        while True:
+            chunk = file_data.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            size += len(chunk)
+        file_data.seek(0)
+        return digest.hexdigest(), size
+
+    @staticmethod
+    def upload_file(
+        file_data, container_name: str, blob_name: Optional[str] = None
+    ) -> Tuple[str, str]:
         """Upload a file to Azure Blob Storage
 
         Args:
             file_data: File data from request.files
             container_name: Container name in Azure Storage
+            blob_name: Optional blob name; a random one is generated when omitted
 
         Returns:
             Tuple containing (blob_name, blob_url)
         """
         try:
-            # Create a unique blob name
-            original_filename = file_data.filename
-            file_extension = (
-                original_filename.rsplit(".", 1)[1].lower() if "." in original_filename else ""
-            )
-            blob_name = f"{uuid.uuid4()}.{file_extension}" if file_extension else f"{uuid.uuid4()}"
+            if not blob_name:
+                # Create a unique blob name
+                file_extension = StorageService.get_file_extension(file_data.filename)
+                blob_name = f"{uuid.uuid4()}.{file_extension}" if file_extension else f"{uuid.uuid4()}"
 
             # Get container client and upload the file
             container_client = StorageService.get_container_client(container_name)
@@ -60,7 +94,7 @@ class StorageService:
 
             # Upload the file
             blob_client = container_client.get_blob_client(blob_name)
-            blob_client.upload_blob(file_data)
+            blob_client.upload_blob(file_data, overwrite=True)
 
             # Get the URL
             blob_url = blob_client.url
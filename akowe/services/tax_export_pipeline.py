@@ -0,0 +1,170 @@
+"""Shared ledger pass and writer plumbing for the tax preparation exports.
+
+Every tax export is the same walk over the year's expenses and income: map the
+category, back the included GST/HST (or GST+QST) out of the amount, and write a
+row. ``TaxExportPipeline`` does that walk once, streaming the records from the
+database in batches whose tax is computed a column at a time by ``SalesTax``,
+and hands each ``LedgerEntry`` to any number of ``ExportWriter`` subclasses, so
+producing several formats (or a ZIP bundle of all of them) costs one pass over
+the data.
+"""
+
+import csv
+import io
+import zipfile
+from datetime import datetime
+from decimal import Decimal
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple, Type
+
+from akowe.models.expense import Expense
+from akowe.models.income import Income
+from akowe.services.sales_tax_service import SalesTax
+
+
+class LedgerEntry:
+    """One expense or income record with its formatted date, amount and tax"""
+
+    __slots__ = ("record", "date", "amount", "tax")
+
+    def __init__(self, record, tax: Decimal):
+        self.record = record
+        self.date = record.date.strftime("%Y-%m-%d")
+        self.amount = record.amount
+        self.tax = tax
+
+
+class ExportWriter:
+    """Base class for a tax export format.
+
+    Subclasses write rows for each entry in ``add_expense`` and ``add_income``
+    and lay out the final file in ``render``. Expense and income rows go to
+    separate section buffers so each format can order its sections freely
+    while the ledger is walked only once.
+    """
+
+    filename_prefix = "export"
+    uses_ledger = True
+
+    def __init__(self, year: Optional[int], tax: SalesTax):
+        self.year = year
+        self.tax = tax
+        self._expense_buffer = io.StringIO()
+        self._income_buffer = io.StringIO()
+        self.expense_rows = csv.writer(self._expense_buffer)
+        self.income_rows = csv.writer(self._income_buffer)
+
+    def add_expense(self, entry: LedgerEntry) -> None:
+        pass
+
+    def add_income(self, entry: LedgerEntry) -> None:
+        pass
+
+    @staticmethod
+    def section(rows: Iterable[Sequence]) -> str:
+        """Render fixed rows (headers, totals) in the same CSV dialect"""
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue()
+
+    def render(self) -> str:
+        """Return the finished CSV text"""
+        return self._expense_buffer.getvalue() + self._income_buffer.getvalue()
+
+    def filename(self, timestamp: str) -> str:
+        return f"{self.filename_prefix}_{self.year}_{timestamp}.csv"
+
+
+class TaxExportPipeline:
+    """Runs export writers over a single pass of the year's ledger"""
+
+    # Rows fetched per round trip, and taxed together, while streaming records
+    BATCH_SIZE = 1000
+
+    @classmethod
+    def _batches(cls, model, year: Optional[int]) -> Iterator[List]:
+        query = model.query
+        if year:
+            query = query.filter(model.date.between(datetime(year, 1, 1), datetime(year, 12, 31)))
+
+        batch = []
+        for record in query.order_by(model.date).yield_per(cls.BATCH_SIZE):
+            batch.append(record)
+            if len(batch) == cls.BATCH_SIZE:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    @classmethod
+    def ledger(cls, year: Optional[int], tax: SalesTax) -> Iterator[Tuple[str, LedgerEntry]]:
+        """Stream ``("expense" | "income", entry)`` pairs for a year, expenses first
+
+        Args:
+            year: Tax year to export; None for all records
+            tax: Sales tax rates used to back tax out of each amount
+
+        Yields:
+            Tuples of the entry kind and its LedgerEntry
+        """
+        for batch in cls._batches(Expense, year):
+            for expense, paid in zip(batch, tax.paid(expense.amount for expense in batch)):
+                yield "expense", LedgerEntry(expense, paid)
+        for batch in cls._batches(Income, year):
+            for income, collected in zip(batch, tax.collected(income.amount for income in batch)):
+                yield "income", LedgerEntry(income, collected)
+
+    @classmethod
+    def run(
+        cls, writer_classes: Sequence[Type[ExportWriter]], year: Optional[int], province: str = "Ontario"
+    ) -> List[Tuple[io.BytesIO, str]]:
+        """Render several export formats from one pass over the ledger
+
+        Args:
+            writer_classes: ExportWriter subclasses to render
+            year: Tax year to export
+            province: Province for GST/HST/QST calculation
+
+        Returns:
+            List of (CSV data as BytesIO, filename) tuples, in ``writer_classes`` order
+        """
+        tax = SalesTax(province)
+        writers = [writer_class(year, tax) for writer_class in writer_classes]
+        ledger_writers = [writer for writer in writers if writer.uses_ledger]
+
+        if ledger_writers:
+            for kind, entry in cls.ledger(year, tax):
+                for writer in ledger_writers:
+                    if kind == "expense":
+                        writer.add_expense(entry)
+                    else:
+                        writer.add_income(entry)
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return [(io.BytesIO(writer.render().encode("utf-8")), writer.filename(timestamp)) for writer in writers]
+
+    @classmethod
+    def export(cls, writer_class: Type[ExportWriter], year: Optional[int], province: str = "Ontario") -> Tuple[io.BytesIO, str]:
+        """Render a single export format
+
+        Returns:
+            Tuple containing the CSV data as BytesIO and the filename
+        """
+        return cls.run([writer_class], year, province)[0]
+
+    @classmethod
+    def bundle(
+        cls, writer_classes: Sequence[Type[ExportWriter]], year: Optional[int], province: str = "Ontario"
+    ) -> Tuple[io.BytesIO, str]:
+        """Render several formats from one ledger pass into a single ZIP archive
+
+        Returns:
+            Tuple containing the ZIP data as BytesIO and the filename
+        """
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w", compression=zipfile.ZIP_DEFLATED) as zip_file:
+            for csv_data, filename in cls.run(writer_classes, year, province):
+                zip_file.writestr(filename, csv_data.getvalue())
+        archive.seek(0)
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return archive, f"tax_export_bundle_{year}_{timestamp}.zip"
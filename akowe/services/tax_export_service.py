@@ -10,18 +10,15 @@ For example, in Ontario with 13% HST:
 - The export would show $1,130 as income and $130 as HST collected
 
 This approach ensures accurate tax reporting for GST/HST remittance.
+
+Each format is an ``ExportWriter`` fed by ``TaxExportPipeline``, which reads the
+records and calculates the tax once for every format being rendered.
 """
 
-import csv
 import io
-import json
-from datetime import datetime
-from typing import Tuple, Dict, List, Optional, Union
-from decimal import Decimal
+from typing import Tuple
 
-from akowe.models.expense import Expense
-from akowe.models.income import Income
-from akowe.app.tax_dashboard import CRA_TAX_CATEGORIES, GST_HST_RATES, QST_RATE
+from akowe.services.tax_export_pipeline import ExportWriter, LedgerEntry, TaxExportPipeline
 
 
 class TaxExportService:
@@ -176,144 +173,7 @@ class TaxExportService:
         Returns:
             Tuple containing the CSV data as BytesIO and the filename
         """
-        # Create a string buffer for building the CSV
-        string_buffer = io.StringIO()
-        writer = csv.writer(string_buffer)
-        
-        # Determine if province is Quebec for special handling
-        is_quebec = province == "Quebec"
-
-        # Get GST/HST rate for the province and convert to Decimal
-        gst_hst_rate_float = GST_HST_RATES.get(province, 0.05)  # Default to 5% if not found
-        gst_hst_rate = Decimal(str(gst_hst_rate_float))  # Convert float to Decimal
-
-        # For Quebec, also get QST rate
-
-        # Write header row with T2125 categories
-        tax_column = "GST/HST Paid" if not is_quebec else "GST/QST Paid"
-        writer.writerow([
-            "Date",
-            "Description",
-            "Amount",
-            "T2125 Category",
-            tax_column,
-            "Receipt Reference"
-        ])
-        if is_quebec:
-            qst_rate = Decimal(str(QST_RATE))
-        else:
-            qst_rate = Decimal('0')
-
-        # Query expense records for the year
-        expense_records = Expense.query
-        if year:
-            expense_records = expense_records.filter(
-                Expense.date.between(datetime(year, 1, 1), datetime(year, 12, 31))
-            )
-        expense_records = expense_records.order_by(Expense.date).all()
-        
-        # Write data rows
-        for expense in expense_records:
-            # Map internal category to T2125 category
-            t2125_category = cls.CRA_CATEGORY_MAPPING.get(expense.category, "Other expenses")
-            
-            # Calculate estimated GST/HST amount
-            # In a real implementation, this might come from the database if tracked separately
-            if is_quebec:
-                # In Quebec: GST is calculated on the pre-tax amount, QST is calculated on the GST-included amount
-                gst_amount = (expense.amount * gst_hst_rate) / (Decimal('1.0') + gst_hst_rate + (gst_hst_rate * qst_rate))
-                gst_amount = gst_amount.quantize(Decimal('0.01'))  # Round to 2 decimal places
-
-                # QST is calculated on the GST-included amount but not in this export (would be in a separate column)
-                # For simplicity, including it in the GST/HST column for this export
-                qst_amount = ((expense.amount + gst_amount) * qst_rate) / (Decimal('1.0') + qst_rate)
-                qst_amount = qst_amount.quantize(Decimal('0.01'))  # Round to 2 decimal places
-
-                gst_hst_amount = gst_amount + qst_amount
-            else:
-                # For all other provinces
-                gst_hst_amount = (expense.amount * gst_hst_rate) / (Decimal('1.0') + gst_hst_rate)
-                gst_hst_amount = gst_hst_amount.quantize(Decimal('0.01'))  # Round to 2 decimal places
-            
-            writer.writerow([
-                expense.date.strftime("%Y-%m-%d"),
-                expense.title,
-                f"{expense.amount:.2f}",
-                t2125_category,
-                f"{gst_hst_amount:.2f}",
-                expense.vendor or ""
-            ])
-        
-        # Now add income data
-        income_records = Income.query
-        if year:
-            income_records = income_records.filter(
-                Income.date.between(datetime(year, 1, 1), datetime(year, 12, 31))
-            )
-        income_records = income_records.order_by(Income.date).all()
-        
-        writer.writerow([])  # Add a blank row as separator
-        writer.writerow(["INCOME SECTION"])
-        # Reuse is_quebec variable from earlier in the method
-        tax_collected_column = "GST/HST Collected" if not is_quebec else "GST/QST Collected"
-        writer.writerow([
-            "Date",
-            "Description",
-            "Amount",
-            "T2125 Income Type",
-            tax_collected_column,
-            "Reference"
-        ])
-        
-        for income in income_records:
-            # For income, calculate GST/HST included in the total (13% in Ontario by default)
-            # The amount in the database is assumed to include taxes
-
-            # Calculate GST/HST included in the income amount
-            if is_quebec:
-                # For Quebec, calculate GST and QST separately
-                # GST is 5% of the pre-tax amount
-                # Formula: GST = Amount / (1 + GST + QST) * GST
-                gst_amount = (income.amount * gst_hst_rate) / (Decimal('1.0') + gst_hst_rate + (gst_hst_rate * qst_rate))
-                gst_amount = gst_amount.quantize(Decimal('0.01'))  # Round to 2 decimal places
-
-                # QST is calculated on the GST-included amount
-                qst_amount = ((income.amount - gst_amount) * qst_rate) / (Decimal('1.0') + qst_rate)
-                qst_amount = qst_amount.quantize(Decimal('0.01'))  # Round to 2 decimal places
-
-                tax_collected = gst_amount + qst_amount
-            else:
-                # For other provinces, GST/HST is included in the amount
-                # Formula: Tax = Amount - (Amount / (1 + Tax Rate))
-                pre_tax_amount = income.amount / (Decimal('1.0') + gst_hst_rate)
-                tax_collected = income.amount - pre_tax_amount
-                tax_collected = tax_collected.quantize(Decimal('0.01'))  # Round to 2 decimal places
-
-                # Ensure we always have a positive tax value for valid GST/HST rates
-                if tax_collected <= 0 and gst_hst_rate > 0:
-                    # Recalculate using a direct percentage approach as fallback
-                    tax_collected = income.amount * (gst_hst_rate / (Decimal('1.0') + gst_hst_rate))
-                    tax_collected = tax_collected.quantize(Decimal('0.01'))  # Round to 2 decimal places
-
-            writer.writerow([
-                income.date.strftime("%Y-%m-%d"),
-                f"{income.client} - {income.project}",
-                f"{income.amount:.2f}",
-                "Professional income",
-                f"{tax_collected:.2f}",  # GST/HST collected from clients
-                income.invoice or ""
-            ])
-        
-        # Convert string buffer to bytes buffer
-        bytes_buffer = io.BytesIO()
-        bytes_buffer.write(string_buffer.getvalue().encode("utf-8"))
-        bytes_buffer.seek(0)
-        
-        # Generate filename with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"T2125_CRA_export_{year}_{timestamp}.csv"
-        
-        return bytes_buffer, filename
+        return TaxExportPipeline.export(T2125Writer, year, province)
     
     @classmethod
     def export_turbotax_format(cls, year: int, province: str = "Ontario") -> Tuple[io.BytesIO, str]:
@@ -326,129 +186,7 @@ class TaxExportService:
         Returns:
             Tuple containing the CSV data as BytesIO and the filename
         """
-        # Create a string buffer for building the CSV
-        string_buffer = io.StringIO()
-        writer = csv.writer(string_buffer)
-
-        # Determine if province is Quebec for special handling
-        is_quebec = province == "Quebec"
-
-        # Get GST/HST rate for the province and convert to Decimal
-        gst_hst_rate_float = GST_HST_RATES.get(province, 0.05)  # Default to 5% if not found
-        gst_hst_rate = Decimal(str(gst_hst_rate_float))  # Convert float to Decimal
-
-        # For Quebec, also get QST rate
-        if is_quebec:
-            qst_rate = Decimal(str(QST_RATE))
-        else:
-            qst_rate = Decimal('0')
-
-        # TurboTax header - modify header based on province
-        tax_column = "GST/HST" if not is_quebec else "GST/QST"
-        writer.writerow([
-            "Date",
-            "Description",
-            "Amount",
-            "Category",
-            tax_column,
-            "Tax Form",
-            "TurboTax Category"
-        ])
-        
-        # Query expense records for the year
-        expense_records = Expense.query
-        if year:
-            expense_records = expense_records.filter(
-                Expense.date.between(datetime(year, 1, 1), datetime(year, 12, 31))
-            )
-        expense_records = expense_records.order_by(Expense.date).all()
-        
-        # Write expense data rows
-        for expense in expense_records:
-            # Map internal category to TurboTax category
-            turbotax_category = cls.TURBOTAX_CATEGORY_MAPPING.get(expense.category, "Other business expenses")
-            
-            # Calculate GST/HST/QST amount if needed
-            if is_quebec:
-                # In Quebec: GST is calculated on the pre-tax amount, QST is calculated on the GST-included amount
-                gst_amount = (expense.amount * gst_hst_rate) / (Decimal('1.0') + gst_hst_rate + (gst_hst_rate * qst_rate))
-                gst_amount = gst_amount.quantize(Decimal('0.01'))  # Round to 2 decimal places
-
-                qst_amount = ((expense.amount + gst_amount) * qst_rate) / (Decimal('1.0') + qst_rate)
-                qst_amount = qst_amount.quantize(Decimal('0.01'))  # Round to 2 decimal places
-
-                tax_amount = gst_amount + qst_amount
-            else:
-                # For all other provinces
-                tax_amount = (expense.amount * gst_hst_rate) / (Decimal('1.0') + gst_hst_rate)
-                tax_amount = tax_amount.quantize(Decimal('0.01'))  # Round to 2 decimal places
-
-            writer.writerow([
-                expense.date.strftime("%Y-%m-%d"),
-                expense.title,
-                f"{expense.amount:.2f}",
-                expense.category,
-                f"{tax_amount:.2f}",
-                "T2125",
-                turbotax_category
-            ])
-        
-        # Add income data
-        income_records = Income.query
-        if year:
-            income_records = income_records.filter(
-                Income.date.between(datetime(year, 1, 1), datetime(year, 12, 31))
-            )
-        income_records = income_records.order_by(Income.date).all()
-        
-        # Write income data rows
-        for income in income_records:
-            # Calculate GST/HST included in the income amount
-            if is_quebec:
-                # For Quebec, calculate GST and QST separately
-                # GST is 5% of the pre-tax amount
-                # Formula: GST = Amount / (1 + GST + QST) * GST
-                gst_amount = (income.amount * gst_hst_rate) / (Decimal('1.0') + gst_hst_rate + (gst_hst_rate * qst_rate))
-                gst_amount = gst_amount.quantize(Decimal('0.01'))  # Round to 2 decimal places
-
-                # QST is calculated on the GST-included amount
-                qst_amount = ((income.amount - gst_amount) * qst_rate) / (Decimal('1.0') + qst_rate)
-                qst_amount = qst_amount.quantize(Decimal('0.01'))  # Round to 2 decimal places
-
-                tax_collected = gst_amount + qst_amount
-            else:
-                # For other provinces, GST/HST is included in the amount
-                # Formula: Tax = Amount - (Amount / (1 + Tax Rate))
-                pre_tax_amount = income.amount / (Decimal('1.0') + gst_hst_rate)
-                tax_collected = income.amount - pre_tax_amount
-                tax_collected = tax_collected.quantize(Decimal('0.01'))  # Round to 2 decimal places
-
-                # Ensure we always have a positive tax value for valid GST/HST rates
-                if tax_collected <= 0 and gst_hst_rate > 0:
-                    # Recalculate using a direct percentage approach as fallback
-                    tax_collected = income.amount * (gst_hst_rate / (Decimal('1.0') + gst_hst_rate))
-                    tax_collected = tax_collected.quantize(Decimal('0.01'))  # Round to 2 decimal places
-
-            writer.writerow([
-                income.date.strftime("%Y-%m-%d"),
-                f"{income.client} - {income.project}",
-                f"{income.amount:.2f}",
-                "Income",
-                f"{tax_collected:.2f}",  # GST/HST collected for tax reporting
-                "T2125",
-                "Self-employment income"
-            ])
-        
-        # Convert string buffer to bytes buffer
-        bytes_buffer = io.BytesIO()
-        bytes_buffer.write(string_buffer.getvalue().encode("utf-8"))
-        bytes_buffer.seek(0)
-        
-        # Generate filename with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"TurboTax_export_{year}_{timestamp}.csv"
-        
-        return bytes_buffer, filename
+        return TaxExportPipeline.export(TurboTaxWriter, year, province)
     
     @classmethod
     def export_wealthsimple_format(cls, year: int, province: str = "Ontario") -> Tuple[io.BytesIO, str]:
@@ -461,123 +199,135 @@ class TaxExportService:
         Returns:
             Tuple containing the CSV data as BytesIO and the filename
         """
-        # Create a string buffer for building the CSV
-        string_buffer = io.StringIO()
-        writer = csv.writer(string_buffer)
-
-        # Determine if province is Quebec for special handling
-        is_quebec = province == "Quebec"
-
-        # Get GST/HST rate for the province and convert to Decimal
-        gst_hst_rate_float = GST_HST_RATES.get(province, 0.05)  # Default to 5% if not found
-        gst_hst_rate = Decimal(str(gst_hst_rate_float))  # Convert float to Decimal
-
-        # For Quebec, also get QST rate
-        if is_quebec:
-            qst_rate = Decimal(str(QST_RATE))
-        else:
-            qst_rate = Decimal('0')
-
-        # Wealthsimple Tax header - modify header based on province
-        tax_column = "GST/HST" if not is_quebec else "GST/QST"
-        writer.writerow([
-            "Date",
-            "Description",
-            "Amount",
-            "Category",
-            tax_column,
-            "Type"
+        return TaxExportPipeline.export(WealthsimpleWriter, year, province)
+
+    @classmethod
+    def export_bundle(cls, year: int, province: str = "Ontario") -> Tuple[io.BytesIO, str]:
+        """Export every personal and corporate tax format in one ZIP archive.
+
+        All formats are rendered from a single pass over the year's records.
+
+        Args:
+            year: The tax year to export
+            province: Province for GST/HST calculation (default: Ontario)
+
+        Returns:
+            Tuple containing the ZIP data as BytesIO and the filename
+        """
+        # Imported here as the corporate service's writers are not needed otherwise
+        from akowe.services.corporate_tax_export_service import CORPORATE_WRITERS
+
+        return TaxExportPipeline.bundle((*PERSONAL_WRITERS, *CORPORATE_WRITERS), year, province)
+
+
+class T2125Writer(ExportWriter):
+    """CRA T2125 layout: expenses, then an income section with its own header"""
+
+    filename_prefix = "T2125_CRA_export"
+
+    def add_expense(self, entry: LedgerEntry) -> None:
+        expense = entry.record
+        self.expense_rows.writerow([
+            entry.date,
+            expense.title,
+            f"{entry.amount:.2f}",
+            TaxExportService.CRA_CATEGORY_MAPPING.get(expense.category, "Other expenses"),
+            f"{entry.tax:.2f}",
+            expense.vendor or ""
         ])
-        
-        # Query expense records for the year
-        expense_records = Expense.query
-        if year:
-            expense_records = expense_records.filter(
-                Expense.date.between(datetime(year, 1, 1), datetime(year, 12, 31))
-            )
-        expense_records = expense_records.order_by(Expense.date).all()
-        
-        # Write expense data rows
-        for expense in expense_records:
-            # Map internal category to Wealthsimple category
-            wealthsimple_category = cls.WEALTHSIMPLE_CATEGORY_MAPPING.get(expense.category, "Other expenses")
-            
-            # Calculate GST/HST/QST amount if needed
-            if is_quebec:
-                # In Quebec: GST is calculated on the pre-tax amount, QST is calculated on the GST-included amount
-                gst_amount = (expense.amount * gst_hst_rate) / (Decimal('1.0') + gst_hst_rate + (gst_hst_rate * qst_rate))
-                gst_amount = gst_amount.quantize(Decimal('0.01'))  # Round to 2 decimal places
-
-                qst_amount = ((expense.amount + gst_amount) * qst_rate) / (Decimal('1.0') + qst_rate)
-                qst_amount = qst_amount.quantize(Decimal('0.01'))  # Round to 2 decimal places
-
-                tax_amount = gst_amount + qst_amount
-            else:
-                # For all other provinces
-                tax_amount = (expense.amount * gst_hst_rate) / (Decimal('1.0') + gst_hst_rate)
-                tax_amount = tax_amount.quantize(Decimal('0.01'))  # Round to 2 decimal places
-
-            writer.writerow([
-                expense.date.strftime("%Y-%m-%d"),
-                expense.title,
-                f"{expense.amount:.2f}",
-                wealthsimple_category,
-                f"{tax_amount:.2f}",
-                "Expense"
-            ])
-        
-        # Add income data
-        income_records = Income.query
-        if year:
-            income_records = income_records.filter(
-                Income.date.between(datetime(year, 1, 1), datetime(year, 12, 31))
-            )
-        income_records = income_records.order_by(Income.date).all()
-        
-        # Write income data rows
-        for income in income_records:
-            # Calculate GST/HST included in the income amount
-            if is_quebec:
-                # For Quebec, calculate GST and QST separately
-                # GST is 5% of the pre-tax amount
-                # Formula: GST = Amount / (1 + GST + QST) * GST
-                gst_amount = (income.amount * gst_hst_rate) / (Decimal('1.0') + gst_hst_rate + (gst_hst_rate * qst_rate))
-                gst_amount = gst_amount.quantize(Decimal('0.01'))  # Round to 2 decimal places
-
-                # QST is calculated on the GST-included amount
-                qst_amount = ((income.amount - gst_amount) * qst_rate) / (Decimal('1.0') + qst_rate)
-                qst_amount = qst_amount.quantize(Decimal('0.01'))  # Round to 2 decimal places
-
-                tax_collected = gst_amount + qst_amount
-            else:
-                # For other provinces, GST/HST is included in the amount
-                # Formula: Tax = Amount - (Amount / (1 + Tax Rate))
-                pre_tax_amount = income.amount / (Decimal('1.0') + gst_hst_rate)
-                tax_collected = income.amount - pre_tax_amount
-                tax_collected = tax_collected.quantize(Decimal('0.01'))  # Round to 2 decimal places
-
-                # Ensure we always have a positive tax value for valid GST/HST rates
-                if tax_collected <= 0 and gst_hst_rate > 0:
-                    # Recalculate using a direct percentage approach as fallback
-                    tax_collected = income.amount * (gst_hst_rate / (Decimal('1.0') + gst_hst_rate))
-                    tax_collected = tax_collected.quantize(Decimal('0.01'))  # Round to 2 decimal places
-
-            writer.writerow([
-                income.date.strftime("%Y-%m-%d"),
-                f"{income.client} - {income.project}",
-                f"{income.amount:.2f}",
-                "Self-employment",
-                f"{tax_collected:.2f}",  # GST/HST collected for tax reporting
-                "Income"
-            ])
-        
-        # Convert string buffer to bytes buffer
-        bytes_buffer = io.BytesIO()
-        bytes_buffer.write(string_buffer.getvalue().encode("utf-8"))
-        bytes_buffer.seek(0)
-        
-        # Generate filename with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"WealthsimpleTax_export_{year}_{timestamp}.csv"
-        
-        return bytes_buffer, filename
\ No newline at end of file
+
+    def add_income(self, entry: LedgerEntry) -> None:
+        income = entry.record
+        self.income_rows.writerow([
+            entry.date,
+            f"{income.client} - {income.project}",
+            f"{entry.amount:.2f}",
+            "Professional income",
+            f"{entry.tax:.2f}",  # GST/HST collected from clients
+            income.invoice or ""
+        ])
+
+    def render(self) -> str:
+        tax_column = "GST/HST" if not self.tax.is_quebec else "GST/QST"
+        header = self.section([
+            ["Date", "Description", "Amount", "T2125 Category", f"{tax_column} Paid", "Receipt Reference"],
+        ])
+        income_header = self.section([
+            [],  # Blank row as separator
+            ["INCOME SECTION"],
+            ["Date", "Description", "Amount", "T2125 Income Type", f"{tax_column} Collected", "Reference"],
+        ])
+        return header + self._expense_buffer.getvalue() + income_header + self._income_buffer.getvalue()
+
+
+class TurboTaxWriter(ExportWriter):
+    """TurboTax import layout: one table of expenses followed by income"""
+
+    filename_prefix = "TurboTax_export"
+
+    def add_expense(self, entry: LedgerEntry) -> None:
+        expense = entry.record
+        self.expense_rows.writerow([
+            entry.date,
+            expense.title,
+            f"{entry.amount:.2f}",
+            expense.category,
+            f"{entry.tax:.2f}",
+            "T2125",
+            TaxExportService.TURBOTAX_CATEGORY_MAPPING.get(expense.category, "Other business expenses")
+        ])
+
+    def add_income(self, entry: LedgerEntry) -> None:
+        income = entry.record
+        self.income_rows.writerow([
+            entry.date,
+            f"{income.client} - {income.project}",
+            f"{entry.amount:.2f}",
+            "Income",
+            f"{entry.tax:.2f}",  # GST/HST collected for tax reporting
+            "T2125",
+            "Self-employment income"
+        ])
+
+    def render(self) -> str:
+        header = self.section([
+            ["Date", "Description", "Amount", "Category", self.tax.label, "Tax Form", "TurboTax Category"],
+        ])
+        return header + super().render()
+
+
+class WealthsimpleWriter(ExportWriter):
+    """Wealthsimple Tax (SimpleTax) import layout: expenses followed by income"""
+
+    filename_prefix = "WealthsimpleTax_export"
+
+    def add_expense(self, entry: LedgerEntry) -> None:
+        expense = entry.record
+        self.expense_rows.writerow([
+            entry.date,
+            expense.title,
+            f"{entry.amount:.2f}",
+            TaxExportService.WEALTHSIMPLE_CATEGORY_MAPPING.get(expense.category, "Other expenses"),
+            f"{entry.tax:.2f}",
+            "Expense"
+        ])
+
+    def add_income(self, entry: LedgerEntry) -> None:
+        income = entry.record
+        self.income_rows.writerow([
+            entry.date,
+            f"{income.client} - {income.project}",
+            f"{entry.amount:.2f}",
+            "Self-employment",
+            f"{entry.tax:.2f}",  # GST/HST collected for tax reporting
+            "Income"
+        ])
+
+    def render(self) -> str:
+        header = self.section([
+            ["Date", "Description", "Amount", "Category", self.tax.label, "Type"],
+        ])
+        return header + super().render()
+
+
+PERSONAL_WRITERS = (T2125Writer, TurboTaxWriter, WealthsimpleWriter)
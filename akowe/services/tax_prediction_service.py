@@ -5,37 +5,13 @@ from decimal import Decimal, ROUND_HALF_UP
 
 from akowe.models.expense import Expense
 from akowe.models.income import Income
+from akowe.services.forecast_service import ForecastService
+from akowe.services.tax_tables import tax_year
 
 
 class TaxPredictionService:
     """Service for providing AI-powered tax planning predictions and insights"""
 
-    # Canadian federal tax brackets for 2023 (approximate)
-    FEDERAL_TAX_BRACKETS = [
-        {"max": Decimal("53359"), "rate": Decimal("0.15")},
-        {"max": Decimal("106717"), "rate": Decimal("0.205")},
-        {"max": Decimal("165430"), "rate": Decimal("0.26")},
-        {"max": Decimal("235675"), "rate": Decimal("0.29")},
-        {"max": None, "rate": Decimal("0.33")},  # No upper limit
-    ]
-    
-    # Provincial tax rates (simplified average)
-    PROVINCIAL_TAX_RATES = {
-        "Alberta": 0.10,
-        "British Columbia": 0.12,
-        "Manitoba": 0.12,
-        "New Brunswick": 0.14,
-        "Newfoundland and Labrador": 0.15,
-        "Northwest Territories": 0.12,
-        "Nova Scotia": 0.16,
-        "Nunavut": 0.12,
-        "Ontario": 0.12,
-        "Prince Edward Island": 0.14,
-        "Quebec": 0.15,
-        "Saskatchewan": 0.12,
-        "Yukon": 0.09,
-    }
-    
     # Canadian GST/HST rates by province
     GST_HST_RATES = {
         "Alberta": 0.05,  # GST only
@@ -53,25 +29,23 @@ class TaxPredictionService:
         "Yukon": 0.05,  # GST only
     }
     
-    # Self-employment CPP parameters
-    CPP_BASE_EXEMPTION = Decimal("3500")
-    CPP_MAXIMUM = Decimal("66600")
-    CPP_RATE = Decimal("0.114")  # 11.4% for self-employed
-    
     @classmethod
     def predict_tax_obligation(cls, 
                               income_to_date: List[Income], 
                               expenses_to_date: List[Expense], 
                               province: str = "Ontario",
-                              year: int = None) -> Dict:
+                              year: int = None,
+                              user_id: Optional[int] = None) -> Dict:
         """
-        Predict tax obligation for the current year based on income and expenses to date
+        Predict tax obligation for a year based on income and expenses to date
         
         Args:
             income_to_date: List of Income objects for the year so far
             expenses_to_date: List of Expense objects for the year so far
             province: Canadian province for tax calculations
             year: Year for prediction (defaults to current year)
+            user_id: User whose history the remaining months are forecast
+                from; None for all users, matching the records passed in
             
         Returns:
             Dictionary with tax prediction information
@@ -80,26 +54,25 @@ class TaxPredictionService:
             year = datetime.now().year
             
         # Calculate totals to date
-        income_to_date_sum = sum(income.amount for income in income_to_date)
-        expenses_to_date_sum = sum(expense.amount for expense in expenses_to_date)
+        income_to_date_sum = sum((income.amount for income in income_to_date), Decimal("0"))
+        expenses_to_date_sum = sum((expense.amount for expense in expenses_to_date), Decimal("0"))
         net_income_to_date = income_to_date_sum - expenses_to_date_sum
         
-        # Get the current date and determine how far into the year we are
+        # Determine how far into the year we are; past years are complete
         today = datetime.now().date()
         start_of_year = date(year, 1, 1)
         end_of_year = date(year, 12, 31)
+        as_of = min(today, end_of_year)
         days_in_year = (end_of_year - start_of_year).days + 1
-        days_elapsed = (today - start_of_year).days + 1
+        days_elapsed = (as_of - start_of_year).days + 1
         
-        # Stop projection from going beyond 100% of year
-        year_fraction = min(1.0, days_elapsed / days_in_year)
+        # Keep the projection between 0% and 100% of the year
+        year_fraction = min(1.0, max(0.0, days_elapsed / days_in_year))
         
-        # Project income and expenses for the full year
-        # Use months for better seasonal handling
-        current_month = datetime.now().month
+        # Project the remaining months from multi-year seasonality and trend
+        forecast = ForecastService.forecast(year, user_id)
+        current_month = forecast["months_elapsed"]
         
-        # Income projection
-        # Calculate average monthly income for months with data
         income_by_month = {}
         for income in income_to_date:
             month = income.date.month
@@ -107,58 +80,28 @@ class TaxPredictionService:
                 income_by_month[month] = Decimal("0")
             income_by_month[month] += income.amount
             
-        # If we have data for the month, use it for the projection
-        if len(income_by_month) > 0:
-            avg_monthly_income = sum(income_by_month.values()) / len(income_by_month)
-        else:
-            avg_monthly_income = Decimal("0")
-            
-        projected_income = income_to_date_sum
-        for month in range(current_month + 1, 13):
-            # Use the same month from last year if available
-            if month in income_by_month:
-                projected_income += income_by_month[month]
-            else:
-                projected_income += avg_monthly_income
-        
-        # Expense projection (similar approach)
         expense_by_month = {}
         for expense in expenses_to_date:
             month = expense.date.month
             if month not in expense_by_month:
                 expense_by_month[month] = Decimal("0")
             expense_by_month[month] += expense.amount
-            
-        # If we have data for the month, use it for the projection
-        if len(expense_by_month) > 0:
-            avg_monthly_expense = sum(expense_by_month.values()) / len(expense_by_month)
-        else:
-            avg_monthly_expense = Decimal("0")
-            
+        
+        # Records already entered for a future month count toward that month's forecast
+        projected_income = income_to_date_sum
         projected_expenses = expenses_to_date_sum
         for month in range(current_month + 1, 13):
-            # Use the same month from last year if available
-            if month in expense_by_month:
-                projected_expenses += expense_by_month[month]
-            else:
-                projected_expenses += avg_monthly_expense
+            projected_income += max(forecast["income"][month - 1] - income_by_month.get(month, Decimal("0")), Decimal("0"))
+            projected_expenses += max(forecast["expenses"][month - 1] - expense_by_month.get(month, Decimal("0")), Decimal("0"))
         
         # Calculate projected net income
         projected_net_income = projected_income - projected_expenses
         
-        # Calculate estimated federal income tax
-        estimated_federal_tax = cls._calculate_federal_tax(projected_net_income)
-        
-        # Calculate estimated provincial income tax
-        provincial_rate = cls.PROVINCIAL_TAX_RATES.get(province, 0.12)
-        estimated_provincial_tax = projected_net_income * Decimal(str(provincial_rate))
-        
-        # Calculate estimated CPP contributions
-        cpp_earnings = min(
-            max(projected_net_income - cls.CPP_BASE_EXEMPTION, Decimal("0")), 
-            cls.CPP_MAXIMUM - cls.CPP_BASE_EXEMPTION
-        )
-        estimated_cpp = cpp_earnings * cls.CPP_RATE
+        # Estimate federal and provincial income tax and CPP from the year's tables
+        estimate = tax_year(year).estimate(projected_net_income, province)
+        estimated_federal_tax = estimate["federal_tax"]
+        estimated_provincial_tax = estimate["provincial_tax"]
+        estimated_cpp = estimate["cpp"]
         
         # Calculate GST/HST (simplified)
         gst_hst_rate = cls.GST_HST_RATES.get(province, 0.05)
@@ -179,7 +122,7 @@ class TaxPredictionService:
         result = {
             "year": year,
             "province": province,
-            "as_of_date": today.strftime("%Y-%m-%d"),
+            "as_of_date": as_of.strftime("%Y-%m-%d"),
             "year_progress": round(year_fraction * 100, 1),
             
             "income_to_date": income_to_date_sum.quantize(TWOPLACES, ROUND_HALF_UP),
@@ -201,98 +144,51 @@ class TaxPredictionService:
             "gst_hst_paid": gst_hst_paid.quantize(TWOPLACES, ROUND_HALF_UP),
             "gst_hst_owing": gst_hst_owing.quantize(TWOPLACES, ROUND_HALF_UP),
             
-            "tax_brackets": cls._get_tax_bracket_info(projected_net_income),
-            "months_breakdown": cls._get_monthly_breakdown(income_by_month, expense_by_month, year),
+            "tax_brackets": cls._get_tax_bracket_info(estimate["taxable_income"], year),
+            "months_breakdown": cls._get_monthly_breakdown(income_by_month, expense_by_month, year, forecast),
             "tax_planning_suggestions": cls._generate_tax_planning_suggestions(
                 net_income_to_date, 
                 projected_net_income, 
                 expenses_to_date, 
-                year
+                year,
+                estimate["taxable_income"]
             )
         }
         
         return result
     
     @classmethod
-    def _calculate_federal_tax(cls, net_income: Decimal) -> Decimal:
-        """Calculate federal income tax based on tax brackets"""
-        remaining_income = net_income
-        federal_tax = Decimal("0")
-
-        for bracket in cls.FEDERAL_TAX_BRACKETS:
-            if bracket["max"] is None or remaining_income <= bracket["max"]:
-                bracket_tax = remaining_income * bracket["rate"]
-                federal_tax += bracket_tax
-                break
-            else:
-                bracket_tax = bracket["max"] * bracket["rate"]
-                federal_tax += bracket_tax
-                remaining_income -= bracket["max"]
-
-        return federal_tax
-    
-    @classmethod
-    def _get_tax_bracket_info(cls, net_income: Decimal) -> List[Dict]:
-        """Generate tax bracket information with the user's position in each bracket"""
+    def _get_tax_bracket_info(cls, taxable_income: Decimal, year: int) -> List[Dict]:
+        """Generate federal tax bracket information with the user's position in each bracket"""
+        federal = tax_year(year).federal
+        current = federal.bracket_index(taxable_income)
         brackets_info = []
-        remaining_income = net_income
         
-        for i, bracket in enumerate(cls.FEDERAL_TAX_BRACKETS):
-            # For the last bracket (no max)
-            if bracket["max"] is None:
-                amount_in_bracket = remaining_income
-                tax_in_bracket = amount_in_bracket * bracket["rate"]
-                brackets_info.append({
-                    "bracket": f"Over ${cls.FEDERAL_TAX_BRACKETS[i - 1]['max']:,.2f}",
-                    "rate": f"{float(bracket['rate']) * 100:.1f}%",
-                    "amount_in_bracket": amount_in_bracket,
-                    "tax_in_bracket": tax_in_bracket,
-                    "is_current": True if remaining_income > 0 else False
-                })
-                break
-                
-            # Determine how much income falls within this bracket
-            if remaining_income <= 0:
-                # User doesn't have income in this bracket
-                amount_in_bracket = Decimal("0")
-                tax_in_bracket = Decimal("0")
-                is_current = False
-            elif i == 0:
-                # First bracket
-                amount_in_bracket = min(remaining_income, bracket["max"])
-                tax_in_bracket = amount_in_bracket * bracket["rate"]
-                is_current = True
-            else:
-                # Middle brackets
-                prev_max = cls.FEDERAL_TAX_BRACKETS[i - 1]["max"]
-                amount_in_bracket = min(remaining_income, bracket["max"] - prev_max)
-                tax_in_bracket = amount_in_bracket * bracket["rate"]
-                is_current = True
-                
-            # Format the bracket label
-            if i == 0:
-                bracket_label = f"$0 - ${bracket['max']:,.2f}"
+        for i, (floor, ceiling, rate) in enumerate(federal.brackets()):
+            if ceiling is None:
+                bracket_label = f"Over ${floor:,.2f}"
+                amount_in_bracket = max(taxable_income - floor, Decimal("0"))
             else:
-                prev_max = cls.FEDERAL_TAX_BRACKETS[i - 1]["max"]
-                bracket_label = f"${prev_max + Decimal('0.01'):,.2f} - ${bracket['max']:,.2f}"
+                if i == 0:
+                    bracket_label = f"$0 - ${ceiling:,.2f}"
+                else:
+                    bracket_label = f"${floor + Decimal('0.01'):,.2f} - ${ceiling:,.2f}"
+                amount_in_bracket = min(max(taxable_income - floor, Decimal("0")), ceiling - floor)
                 
             brackets_info.append({
                 "bracket": bracket_label,
-                "rate": f"{float(bracket['rate']) * 100:.1f}%",
+                "rate": f"{float(rate) * 100:.1f}%",
                 "amount_in_bracket": amount_in_bracket,
-                "tax_in_bracket": tax_in_bracket,
-                "is_current": is_current
+                "tax_in_bracket": amount_in_bracket * rate,
+                "is_current": i == current and taxable_income > 0
             })
-            
-            remaining_income -= amount_in_bracket
         
         return brackets_info
     
     @classmethod
-    def _get_monthly_breakdown(cls, income_by_month: Dict, expense_by_month: Dict, year: int) -> List[Dict]:
-        """Generate monthly breakdown of income/expenses with projections"""
-        today = datetime.now().date()
-        current_month = today.month
+    def _get_monthly_breakdown(cls, income_by_month: Dict, expense_by_month: Dict, year: int, forecast: Dict) -> List[Dict]:
+        """Generate monthly breakdown of income/expenses with forecasts for the remaining months"""
+        current_month = forecast["months_elapsed"]
         
         months_data = []
         
@@ -302,21 +198,13 @@ class TaxPredictionService:
             # Check if we have actual data for this month
             is_actual = month <= current_month
             
-            # Get income for this month (actual or projected)
             income = income_by_month.get(month, Decimal("0"))
-            
-            # For future months, use projection if no data exists
-            if not is_actual and month not in income_by_month and income_by_month:
-                # Use average if no specific data
-                income = sum(income_by_month.values()) / len(income_by_month)
-            
-            # Get expenses for this month (actual or projected)
             expenses = expense_by_month.get(month, Decimal("0"))
             
-            # For future months, use projection if no data exists
-            if not is_actual and month not in expense_by_month and expense_by_month:
-                # Use average if no specific data
-                expenses = sum(expense_by_month.values()) / len(expense_by_month)
+            # For future months, use the forecast unless more has already been recorded
+            if not is_actual:
+                income = max(income, forecast["income"][month - 1])
+                expenses = max(expenses, forecast["expenses"][month - 1])
             
             # Calculate net for the month
             net = income - expenses
@@ -337,11 +225,12 @@ class TaxPredictionService:
                                          net_income_to_date: Decimal,
                                          projected_net_income: Decimal,
                                          expenses_to_date: List[Expense],
-                                         year: int) -> List[Dict]:
+                                         year: int,
+                                         taxable_income: Decimal) -> List[Dict]:
         """Generate tax planning suggestions"""
         suggestions = []
-        today = datetime.now().date()
-        current_month = today.month
+        current_month = ForecastService.months_elapsed(year)
+        year_closed = year < datetime.now().year
         
         # Check expense distribution and suggest balancing if needed
         expense_by_month = {}
@@ -374,33 +263,22 @@ class TaxPredictionService:
                 })
         
         # 2. Check if approaching tax bracket thresholds
-        current_bracket = None
-        next_bracket = None
-        
-        for i, bracket in enumerate(cls.FEDERAL_TAX_BRACKETS):
-            if bracket["max"] is None:  # Last bracket
-                if i > 0 and projected_net_income > cls.FEDERAL_TAX_BRACKETS[i - 1]["max"]:
-                    current_bracket = i
-                    next_bracket = None
-                    break
-            elif projected_net_income <= bracket["max"]:
-                current_bracket = i
-                next_bracket = i + 1 if i + 1 < len(cls.FEDERAL_TAX_BRACKETS) else None
-                break
-        
-        # If within 10% of next bracket, suggest tax planning
-        if next_bracket is not None:
-            next_bracket_threshold = cls.FEDERAL_TAX_BRACKETS[current_bracket]["max"]
-            distance_to_next = next_bracket_threshold - projected_net_income
+        federal = tax_year(year).federal
+        brackets = federal.brackets()
+        current_bracket = federal.bracket_index(taxable_income)
+        _, next_bracket_threshold, current_rate = brackets[current_bracket]
+        
+        # If within $5,000 of the next bracket, suggest tax planning
+        if next_bracket_threshold is not None:
+            distance_to_next = next_bracket_threshold - taxable_income
             
             if distance_to_next > 0 and distance_to_next <= Decimal("5000"):
-                current_rate = cls.FEDERAL_TAX_BRACKETS[current_bracket]["rate"] * 100
-                next_rate = cls.FEDERAL_TAX_BRACKETS[next_bracket]["rate"] * 100
+                next_rate = brackets[current_bracket + 1][2]
                 
                 suggestions.append({
                     "type": "tax_bracket_planning",
                     "title": "Near Higher Tax Bracket",
-                    "description": f"You're ${distance_to_next:,.2f} away from the next tax bracket ({current_rate}% to {next_rate}%)",
+                    "description": f"You're ${distance_to_next:,.2f} away from the next tax bracket ({current_rate * 100}% to {next_rate * 100}%)",
                     "benefit": f"Consider timing expenses to stay below ${next_bracket_threshold:,.2f} threshold",
                     "priority": "high"
                 })
@@ -426,7 +304,7 @@ class TaxPredictionService:
         current_quarter = (current_month - 1) // 3 + 1
         next_quarter = current_quarter + 1 if current_quarter < 4 else None
         
-        if next_quarter:
+        if next_quarter and not year_closed:
             suggestions.append({
                 "type": "tax_installment",
                 "title": f"Q{next_quarter} Tax Installment Planning",
@@ -436,7 +314,7 @@ class TaxPredictionService:
             })
         
         # 5. Year-end tax planning for Q4
-        if current_month >= 10:  # Q4
+        if current_month >= 10 and not year_closed:  # Q4
             suggestions.append({
                 "type": "year_end_planning",
                 "title": "Year-End Tax Planning",
@@ -446,7 +324,7 @@ class TaxPredictionService:
             })
         
         # 6. Equipment purchase suggestion (CCA)
-        if current_month >= 10 and "hardware" not in categories_used:
+        if current_month >= 10 and not year_closed and "hardware" not in categories_used:
             suggestions.append({
                 "type": "equipment_purchase",
                 "title": "Consider Equipment Purchases",
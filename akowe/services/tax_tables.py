@@ -0,0 +1,393 @@
+"""Versioned per-year Canadian income tax tables.
+
+Each tax year lists the federal and provincial/territorial brackets (as
+``(upper threshold, rate)`` pairs, the last with no upper threshold), the
+basic personal amount, the small business corporate rate and the
+self-employed CPP parameters. Figures are the published indexed amounts,
+rounded to the dollar; surtaxes, the federal Quebec abatement and the
+phase-out of the federal basic personal amount are not modelled.
+
+Tables are turned into ``BracketTable`` objects once at import, with the tax
+at each bracket threshold precomputed, so the tax on any income is a binary
+search for its bracket plus one multiply-add, for a single Decimal amount or
+an array of incomes alike.
+"""
+
+from bisect import bisect_right
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+TAX_YEARS = {
+    2023: {
+        "federal": {
+            "brackets": ((53359, "0.15"), (106717, "0.205"), (165430, "0.26"), (235675, "0.29"), (None, "0.33")),
+            "basic_personal_amount": 15000,
+            "small_business_rate": "0.09",
+        },
+        "provinces": {
+            "Alberta": {
+                "brackets": ((142292, "0.10"), (170751, "0.12"), (227668, "0.13"), (341502, "0.14"), (None, "0.15")),
+                "basic_personal_amount": 21003,
+                "small_business_rate": "0.02",
+            },
+            "British Columbia": {
+                "brackets": ((45654, "0.0506"), (91310, "0.077"), (104835, "0.105"), (127299, "0.1229"),
+                             (172602, "0.147"), (240716, "0.168"), (None, "0.205")),
+                "basic_personal_amount": 11981,
+                "small_business_rate": "0.02",
+            },
+            "Manitoba": {
+                "brackets": ((36842, "0.108"), (79625, "0.1275"), (None, "0.174")),
+                "basic_personal_amount": 15000,
+                "small_business_rate": "0.00",
+            },
+            "New Brunswick": {
+                "brackets": ((47715, "0.094"), (95431, "0.14"), (176756, "0.16"), (None, "0.195")),
+                "basic_personal_amount": 12458,
+                "small_business_rate": "0.025",
+            },
+            "Newfoundland and Labrador": {
+                "brackets": ((41457, "0.087"), (82913, "0.145"), (148027, "0.158"), (207239, "0.178"),
+                             (264750, "0.198"), (529500, "0.208"), (1059000, "0.213"), (None, "0.218")),
+                "basic_personal_amount": 10382,
+                "small_business_rate": "0.025",
+            },
+            "Northwest Territories": {
+                "brackets": ((48326, "0.059"), (96655, "0.086"), (157139, "0.122"), (None, "0.1405")),
+                "basic_personal_amount": 16593,
+                "small_business_rate": "0.02",
+            },
+            "Nova Scotia": {
+                "brackets": ((29590, "0.0879"), (59180, "0.1495"), (93000, "0.1667"), (150000, "0.175"),
+                             (None, "0.21")),
+                "basic_personal_amount": 8481,
+                "small_business_rate": "0.025",
+            },
+            "Nunavut": {
+                "brackets": ((50877, "0.04"), (101754, "0.07"), (165429, "0.09"), (None, "0.115")),
+                "basic_personal_amount": 17925,
+                "small_business_rate": "0.03",
+            },
+            "Ontario": {
+                "brackets": ((49231, "0.0505"), (98463, "0.0915"), (150000, "0.1116"), (220000, "0.1216"),
+                             (None, "0.1316")),
+                "basic_personal_amount": 11865,
+                "small_business_rate": "0.032",
+            },
+            "Prince Edward Island": {
+                "brackets": ((31984, "0.098"), (63969, "0.138"), (None, "0.167")),
+                "basic_personal_amount": 12750,
+                "small_business_rate": "0.01",
+            },
+            "Quebec": {
+                "brackets": ((49275, "0.14"), (98540, "0.19"), (119910, "0.24"), (None, "0.2575")),
+                "basic_personal_amount": 17183,
+                "small_business_rate": "0.032",
+            },
+            "Saskatchewan": {
+                "brackets": ((49720, "0.105"), (142058, "0.125"), (None, "0.145")),
+                "basic_personal_amount": 17661,
+                "small_business_rate": "0.01",
+            },
+            "Yukon": {
+                "brackets": ((53359, "0.064"), (106717, "0.09"), (165430, "0.109"), (500000, "0.128"),
+                             (None, "0.15")),
+                "basic_personal_amount": 15000,
+                "small_business_rate": "0.00",
+            },
+        },
+        "cpp": {"rate": "0.119", "basic_exemption": 3500, "ympe": 66600, "cpp2_rate": "0.08", "yampe": 66600},
+    },
+    2024: {
+        "federal": {
+            "brackets": ((55867, "0.15"), (111733, "0.205"), (173205, "0.26"), (246752, "0.29"), (None, "0.33")),
+            "basic_personal_amount": 15705,
+            "small_business_rate": "0.09",
+        },
+        "provinces": {
+            "Alberta": {
+                "brackets": ((148269, "0.10"), (177922, "0.12"), (237230, "0.13"), (355845, "0.14"), (None, "0.15")),
+                "basic_personal_amount": 21885,
+                "small_business_rate": "0.02",
+            },
+            "British Columbia": {
+                "brackets": ((47937, "0.0506"), (95875, "0.077"), (110076, "0.105"), (133664, "0.1229"),
+                             (181232, "0.147"), (252752, "0.168"), (None, "0.205")),
+                "basic_personal_amount": 12580,
+                "small_business_rate": "0.02",
+            },
+            "Manitoba": {
+                "brackets": ((47000, "0.108"), (100000, "0.1275"), (None, "0.174")),
+                "basic_personal_amount": 15780,
+                "small_business_rate": "0.00",
+            },
+            "New Brunswick": {
+                "brackets": ((49958, "0.094"), (99916, "0.14"), (185064, "0.16"), (None, "0.195")),
+                "basic_personal_amount": 13044,
+                "small_business_rate": "0.025",
+            },
+            "Newfoundland and Labrador": {
+                "brackets": ((43198, "0.087"), (86395, "0.145"), (154244, "0.158"), (215943, "0.178"),
+                             (275870, "0.198"), (551739, "0.208"), (1103478, "0.213"), (None, "0.218")),
+                "basic_personal_amount": 10818,
+                "small_business_rate": "0.025",
+            },
+            "Northwest Territories": {
+                "brackets": ((50597, "0.059"), (101198, "0.086"), (164525, "0.122"), (None, "0.1405")),
+                "basic_personal_amount": 17373,
+                "small_business_rate": "0.02",
+            },
+            "Nova Scotia": {
+                "brackets": ((29590, "0.0879"), (59180, "0.1495"), (93000, "0.1667"), (150000, "0.175"),
+                             (None, "0.21")),
+                "basic_personal_amount": 8744,
+                "small_business_rate": "0.025",
+            },
+            "Nunavut": {
+                "brackets": ((53268, "0.04"), (106537, "0.07"), (173205, "0.09"), (None, "0.115")),
+                "basic_personal_amount": 18767,
+                "small_business_rate": "0.03",
+            },
+            "Ontario": {
+                "brackets": ((51446, "0.0505"), (102894, "0.0915"), (150000, "0.1116"), (220000, "0.1216"),
+                             (None, "0.1316")),
+                "basic_personal_amount": 12399,
+                "small_business_rate": "0.032",
+            },
+            "Prince Edward Island": {
+                "brackets": ((32656, "0.0965"), (64313, "0.1363"), (105000, "0.1665"), (140000, "0.18"),
+                             (None, "0.1875")),
+                "basic_personal_amount": 13500,
+                "small_business_rate": "0.01",
+            },
+            "Quebec": {
+                "brackets": ((51780, "0.14"), (103545, "0.19"), (126000, "0.24"), (None, "0.2575")),
+                "basic_personal_amount": 18056,
+                "small_business_rate": "0.032",
+            },
+            "Saskatchewan": {
+                "brackets": ((52057, "0.105"), (148734, "0.125"), (None, "0.145")),
+                "basic_personal_amount": 18491,
+                "small_business_rate": "0.01",
+            },
+            "Yukon": {
+                "brackets": ((55867, "0.064"), (111733, "0.09"), (173205, "0.109"), (500000, "0.128"),
+                             (None, "0.15")),
+                "basic_personal_amount": 15705,
+                "small_business_rate": "0.00",
+            },
+        },
+        "cpp": {"rate": "0.119", "basic_exemption": 3500, "ympe": 68500, "cpp2_rate": "0.08", "yampe": 73200},
+    },
+    2025: {
+        "federal": {
+            # The lowest rate fell to 14% on July 1, 2025, for an effective 14.5% over the year
+            "brackets": ((57375, "0.145"), (114750, "0.205"), (177882, "0.26"), (253414, "0.29"), (None, "0.33")),
+            "basic_personal_amount": 16129,
+            "small_business_rate": "0.09",
+        },
+        "provinces": {
+            "Alberta": {
+                "brackets": ((60000, "0.08"), (151234, "0.10"), (181481, "0.12"), (241974, "0.13"),
+                             (362961, "0.14"), (None, "0.15")),
+                "basic_personal_amount": 22323,
+                "small_business_rate": "0.02",
+            },
+            "British Columbia": {
+                "brackets": ((49279, "0.0506"), (98560, "0.077"), (113158, "0.105"), (137407, "0.1229"),
+                             (186306, "0.147"), (259829, "0.168"), (None, "0.205")),
+                "basic_personal_amount": 12932,
+                "small_business_rate": "0.02",
+            },
+            "Manitoba": {
+                "brackets": ((47000, "0.108"), (100000, "0.1275"), (None, "0.174")),
+                "basic_personal_amount": 15780,
+                "small_business_rate": "0.00",
+            },
+            "New Brunswick": {
+                "brackets": ((51306, "0.094"), (102614, "0.14"), (190060, "0.16"), (None, "0.195")),
+                "basic_personal_amount": 13396,
+                "small_business_rate": "0.025",
+            },
+            "Newfoundland and Labrador": {
+                "brackets": ((44192, "0.087"), (88382, "0.145"), (157792, "0.158"), (220910, "0.178"),
+                             (282214, "0.198"), (564429, "0.208"), (1128858, "0.213"), (None, "0.218")),
+                "basic_personal_amount": 11067,
+                "small_business_rate": "0.025",
+            },
+            "Northwest Territories": {
+                "brackets": ((51964, "0.059"), (103930, "0.086"), (168967, "0.122"), (None, "0.1405")),
+                "basic_personal_amount": 17842,
+                "small_business_rate": "0.02",
+            },
+            "Nova Scotia": {
+                "brackets": ((30507, "0.0879"), (61015, "0.1495"), (95883, "0.1667"), (154650, "0.175"),
+                             (None, "0.21")),
+                "basic_personal_amount": 11744,
+                "small_business_rate": "0.025",
+            },
+            "Nunavut": {
+                "brackets": ((54707, "0.04"), (109413, "0.07"), (177881, "0.09"), (None, "0.115")),
+                "basic_personal_amount": 19274,
+                "small_business_rate": "0.03",
+            },
+            "Ontario": {
+                "brackets": ((52886, "0.0505"), (105775, "0.0915"), (150000, "0.1116"), (220000, "0.1216"),
+                             (None, "0.1316")),
+                "basic_personal_amount": 12747,
+                "small_business_rate": "0.032",
+            },
+            "Prince Edward Island": {
+                "brackets": ((33328, "0.095"), (64656, "0.1347"), (105000, "0.166"), (140000, "0.1762"),
+                             (None, "0.19")),
+                "basic_personal_amount": 14250,
+                "small_business_rate": "0.01",
+            },
+            "Quebec": {
+                "brackets": ((53255, "0.14"), (106495, "0.19"), (129590, "0.24"), (None, "0.2575")),
+                "basic_personal_amount": 18571,
+                "small_business_rate": "0.032",
+            },
+            "Saskatchewan": {
+                "brackets": ((53463, "0.105"), (152750, "0.125"), (None, "0.145")),
+                "basic_personal_amount": 19491,
+                "small_business_rate": "0.01",
+            },
+            "Yukon": {
+                "brackets": ((57375, "0.064"), (114750, "0.09"), (177882, "0.109"), (500000, "0.128"),
+                             (None, "0.15")),
+                "basic_personal_amount": 16129,
+                "small_business_rate": "0.00",
+            },
+        },
+        "cpp": {"rate": "0.119", "basic_exemption": 3500, "ympe": 71300, "cpp2_rate": "0.08", "yampe": 81200},
+    },
+}
+
+
+class BracketTable:
+    """A progressive rate schedule with the cumulative tax at each bracket floor precomputed.
+
+    The basic personal amount is applied as a non-refundable credit at the
+    lowest rate.
+    """
+
+    def __init__(self, brackets: Sequence[Tuple[Optional[int], str]], basic_personal_amount: int):
+        self.floors = [Decimal("0")]
+        self.rates = []
+        self.cumulative = [Decimal("0")]  # Tax on income up to each bracket floor
+        for upper, rate in brackets:
+            rate = Decimal(rate)
+            self.rates.append(rate)
+            if upper is not None:
+                upper = Decimal(upper)
+                self.cumulative.append(self.cumulative[-1] + (upper - self.floors[-1]) * rate)
+                self.floors.append(upper)
+
+        self.basic_personal_amount = Decimal(basic_personal_amount)
+        self.credit = self.basic_personal_amount * self.rates[0]
+
+        self._floors = np.array([float(floor) for floor in self.floors])
+        self._rates = np.array([float(rate) for rate in self.rates])
+        self._cumulative = np.array([float(tax) for tax in self.cumulative])
+        self._credit = float(self.credit)
+
+    def bracket_index(self, income: Decimal) -> int:
+        """Index of the bracket an income falls in"""
+        return bisect_right(self.floors, max(income, Decimal("0"))) - 1
+
+    def gross_tax(self, income: Decimal) -> Decimal:
+        """Tax on an income before the basic personal credit"""
+        income = max(income, Decimal("0"))
+        index = bisect_right(self.floors, income) - 1
+        return self.cumulative[index] + (income - self.floors[index]) * self.rates[index]
+
+    def tax(self, income: Decimal) -> Decimal:
+        """Tax on a taxable income, net of the basic personal credit"""
+        return max(self.gross_tax(income) - self.credit, Decimal("0"))
+
+    def brackets(self) -> List[Tuple[Decimal, Optional[Decimal], Decimal]]:
+        """``(floor, ceiling, rate)`` for each bracket; the top bracket has no ceiling"""
+        ceilings = self.floors[1:] + [None]
+        return list(zip(self.floors, ceilings, self.rates))
+
+    def tax_array(self, incomes: np.ndarray) -> np.ndarray:
+        """Tax, net of the basic personal credit, for each taxable income in an array"""
+        incomes = np.maximum(incomes, 0.0)
+        index = np.searchsorted(self._floors, incomes, side="right") - 1
+        gross = self._cumulative[index] + (incomes - self._floors[index]) * self._rates[index]
+        return np.maximum(gross - self._credit, 0.0)
+
+
+class TaxYear:
+    """The federal, provincial and CPP tables in force for one tax year"""
+
+    def __init__(self, year: int, data: Dict):
+        self.year = year
+        self.federal = BracketTable(data["federal"]["brackets"], data["federal"]["basic_personal_amount"])
+        self.federal_small_business_rate = Decimal(data["federal"]["small_business_rate"])
+        self.provinces = {
+            province: BracketTable(table["brackets"], table["basic_personal_amount"])
+            for province, table in data["provinces"].items()
+        }
+        self.small_business_rates = {
+            province: self.federal_small_business_rate + Decimal(table["small_business_rate"])
+            for province, table in data["provinces"].items()
+        }
+
+        cpp = data["cpp"]
+        self.cpp_rate = Decimal(cpp["rate"])
+        self.cpp_basic_exemption = Decimal(cpp["basic_exemption"])
+        self.cpp_ympe = Decimal(cpp["ympe"])  # Year's maximum pensionable earnings
+        self.cpp2_rate = Decimal(cpp["cpp2_rate"])
+        self.cpp_yampe = Decimal(cpp["yampe"])  # Year's additional maximum pensionable earnings
+
+    def province(self, province: str) -> BracketTable:
+        """Provincial table, falling back to Ontario for unknown provinces"""
+        return self.provinces.get(province, self.provinces["Ontario"])
+
+    def estimate(self, net_income: Decimal, province: str) -> Dict[str, Decimal]:
+        """Personal income tax and CPP on a year's net self-employment income
+
+        The employer half of CPP contributions is deducted from taxable income.
+
+        Returns:
+            Dictionary with ``taxable_income``, ``federal_tax``,
+            ``provincial_tax``, ``cpp`` and ``total_tax``, unrounded
+        """
+        net_income = Decimal(net_income)
+        cpp = self.cpp(net_income)
+        taxable_income = max(net_income - cpp / 2, Decimal("0"))
+        federal_tax = self.federal.tax(taxable_income)
+        provincial_tax = self.province(province).tax(taxable_income)
+        return {
+            "taxable_income": taxable_income,
+            "federal_tax": federal_tax,
+            "provincial_tax": provincial_tax,
+            "cpp": cpp,
+            "total_tax": federal_tax + provincial_tax + cpp,
+        }
+
+    def cpp(self, earnings: Decimal) -> Decimal:
+        """Self-employed CPP and CPP2 contributions (both shares) on one year's earnings"""
+        base = min(max(earnings, Decimal("0")), self.cpp_ympe) - self.cpp_basic_exemption
+        additional = min(max(earnings, self.cpp_ympe), self.cpp_yampe) - self.cpp_ympe
+        return max(base, Decimal("0")) * self.cpp_rate + additional * self.cpp2_rate
+
+    def cpp_array(self, earnings: np.ndarray) -> np.ndarray:
+        """Self-employed CPP and CPP2 contributions (both shares) for an array of earnings"""
+        base = np.clip(earnings, 0.0, float(self.cpp_ympe)) - float(self.cpp_basic_exemption)
+        additional = np.clip(earnings, float(self.cpp_ympe), float(self.cpp_yampe)) - float(self.cpp_ympe)
+        return np.maximum(base, 0.0) * float(self.cpp_rate) + additional * float(self.cpp2_rate)
+
+
+TAX_TABLES = {year: TaxYear(year, data) for year, data in TAX_YEARS.items()}
+
+
+def tax_year(year: int) -> TaxYear:
+    """Tables for a tax year, using the closest year on file for years outside the tables"""
+    known = sorted(TAX_TABLES)
+    eligible = [candidate for candidate in known if candidate <= year]
+    return TAX_TABLES[eligible[-1] if eligible else known[0]]
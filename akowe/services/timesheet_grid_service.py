@@ -0,0 +1,142 @@
+"""Service for building day-by-day timesheet grids over a week, month or custom range."""
+
+import calendar
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+
+from akowe.models import db
+from akowe.models.client import Client
+from akowe.models.project import Project
+from akowe.models.timesheet import Timesheet
+
+
+class TimesheetGridService:
+    """Buckets a user's timesheet entries by day and by project.
+
+    Entries are grouped in a single pass over the query result. For long
+    ranges where individual entries are not displayed, ``include_entries=False``
+    gets the per-day, per-project hour totals from one grouped SQL query instead
+    of loading rows.
+    """
+
+    PERIODS = ("week", "month")
+    MAX_RANGE_DAYS = 366
+
+    @staticmethod
+    def period_bounds(period: str, anchor: date) -> Tuple[date, date]:
+        """Return the first and last day of the period containing a date
+
+        Args:
+            period: ``week`` (Monday to Sunday) or ``month``
+            anchor: Any date inside the period
+
+        Returns:
+            Tuple of (start, end) dates, both inclusive
+
+        Raises:
+            ValueError: If the period is not supported
+        """
+        if period == "week":
+            start = anchor - timedelta(days=anchor.weekday())
+            return start, start + timedelta(days=6)
+        if period == "month":
+            last_day = calendar.monthrange(anchor.year, anchor.month)[1]
+            return anchor.replace(day=1), anchor.replace(day=last_day)
+        raise ValueError(f"Unsupported period: {period}")
+
+    @classmethod
+    def build(cls, user_id: int, start: date, end: date, include_entries: bool = True) -> Dict[str, Any]:
+        """Build a grid of a user's timesheet hours between two dates
+
+        Args:
+            user_id: The ID of the user whose entries to include
+            start: First day of the range
+            end: Last day of the range (inclusive)
+            include_entries: Attach the Timesheet rows to each day; when False,
+                totals are aggregated in SQL and ``entries`` lists are empty
+
+        Returns:
+            Dictionary with ``start``, ``end``, ``days`` (one per date in order, each
+            with ``date``, ``entries`` and ``total_hours``), ``projects`` (per-project
+            ``total_hours`` and ``daily_hours`` keyed by date) and ``total_hours``
+
+        Raises:
+            ValueError: If the range is reversed or longer than MAX_RANGE_DAYS
+        """
+        if end < start:
+            raise ValueError("End date must not be before start date")
+        if (end - start).days + 1 > cls.MAX_RANGE_DAYS:
+            raise ValueError(f"Date range cannot exceed {cls.MAX_RANGE_DAYS} days")
+
+        days = {}
+        for offset in range((end - start).days + 1):
+            day = start + timedelta(days=offset)
+            days[day] = {"date": day, "entries": [], "total_hours": Decimal("0")}
+
+        projects: Dict[int, Dict[str, Any]] = {}
+
+        def add(day: date, project_id: int, project_name: str, client_name: str, hours: Decimal):
+            days[day]["total_hours"] += hours
+            project = projects.get(project_id)
+            if project is None:
+                project = projects[project_id] = {
+                    "project_id": project_id,
+                    "project_name": project_name,
+                    "client_name": client_name,
+                    "total_hours": Decimal("0"),
+                    "daily_hours": {},
+                }
+            project["total_hours"] += hours
+            project["daily_hours"][day] = project["daily_hours"].get(day, Decimal("0")) + hours
+
+        if include_entries:
+            entries = (
+                Timesheet.query.options(joinedload(Timesheet.client_ref), joinedload(Timesheet.project_ref))
+                .filter(Timesheet.user_id == user_id, Timesheet.date >= start, Timesheet.date <= end)
+                .order_by(Timesheet.date, Timesheet.id)
+                .all()
+            )
+            for entry in entries:
+                days[entry.date]["entries"].append(entry)
+                add(
+                    entry.date,
+                    entry.project_id,
+                    entry.project_ref.name if entry.project_ref else "Unknown Project",
+                    entry.client_ref.name if entry.client_ref else "Unknown Client",
+                    entry.hours,
+                )
+        else:
+            rows = (
+                db.session.query(
+                    Timesheet.date,
+                    Timesheet.project_id,
+                    Project.name.label("project_name"),
+                    Client.name.label("client_name"),
+                    func.sum(Timesheet.hours).label("hours"),
+                )
+                .outerjoin(Project, Project.id == Timesheet.project_id)
+                .outerjoin(Client, Client.id == Timesheet.client_id)
+                .filter(Timesheet.user_id == user_id, Timesheet.date >= start, Timesheet.date <= end)
+                .group_by(Timesheet.date, Timesheet.project_id, Project.name, Client.name)
+                .all()
+            )
+            for row in rows:
+                add(
+                    row.date,
+                    row.project_id,
+                    row.project_name or "Unknown Project",
+                    row.client_name or "Unknown Client",
+                    Decimal(str(row.hours or 0)),
+                )
+
+        return {
+            "start": start,
+            "end": end,
+            "days": list(days.values()),
+            "projects": sorted(projects.values(), key=lambda p: p["project_name"]),
+            "total_hours": sum((day["total_hours"] for day in days.values()), Decimal("0")),
+        }
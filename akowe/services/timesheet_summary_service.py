@@ -0,0 +1,109 @@
+"""Service for aggregating timesheet hours and billing amounts in SQL."""
+
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import case, extract, func
+
+from akowe.models import db
+from akowe.models.timesheet import Timesheet
+
+CENTS = Decimal("0.01")
+
+
+class TimesheetSummaryService:
+    """Rolls up timesheet hours and amounts without loading entries.
+
+    Each call is one aggregate query using ``SUM(CASE ...)`` per status, with
+    amounts computed from the ``Timesheet.amount`` hybrid (``hours * hourly_rate``).
+    """
+
+    # Timesheet status -> prefix used in summary keys
+    STATUSES = {"pending": "unbilled", "billed": "billed", "paid": "paid"}
+
+    # Supported group_by values -> columns grouped on
+    GROUPS = {
+        "project": (Timesheet.project_id,),
+        "client": (Timesheet.client_id,),
+        "month": (extract("year", Timesheet.date), extract("month", Timesheet.date)),
+    }
+
+    @classmethod
+    def _aggregates(cls) -> List:
+        columns = [
+            func.count(Timesheet.id).label("entry_count"),
+            func.sum(Timesheet.hours).label("total_hours"),
+            func.sum(Timesheet.amount).label("total_amount"),
+        ]
+        for status, prefix in cls.STATUSES.items():
+            columns.append(func.sum(case((Timesheet.status == status, Timesheet.hours), else_=0)).label(f"{prefix}_hours"))
+            columns.append(func.sum(case((Timesheet.status == status, Timesheet.amount), else_=0)).label(f"{prefix}_amount"))
+        return columns
+
+    @classmethod
+    def _row_to_summary(cls, row) -> Dict[str, Any]:
+        summary: Dict[str, Any] = {"entry_count": row.entry_count or 0}
+        for prefix in ("total", *cls.STATUSES.values()):
+            for measure in ("hours", "amount"):
+                value = getattr(row, f"{prefix}_{measure}")
+                summary[f"{prefix}_{measure}"] = Decimal(str(value or 0)).quantize(CENTS)
+        return summary
+
+    @classmethod
+    def summarize(
+        cls,
+        user_id: Optional[int] = None,
+        client_id: Optional[int] = None,
+        project_id: Optional[int] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        group_by: Optional[str] = None,
+    ):
+        """Total hours and billed/unbilled amounts for matching timesheet entries
+
+        Args:
+            user_id: Only include this user's entries
+            client_id: Only include entries for this client
+            project_id: Only include entries for this project
+            start_date: First date to include
+            end_date: Last date to include
+            group_by: ``project``, ``client`` or ``month``; None for a single total
+
+        Returns:
+            Without ``group_by``, a dictionary with ``entry_count`` and
+            ``total_``/``unbilled_``/``billed_``/``paid_`` ``hours`` and ``amount``.
+            With ``group_by``, a dictionary of those summaries keyed by project ID,
+            client ID or ``(year, month)``.
+
+        Raises:
+            ValueError: If group_by is not supported
+        """
+        if group_by is not None and group_by not in cls.GROUPS:
+            raise ValueError(f"Unsupported group_by: {group_by}")
+
+        keys = cls.GROUPS[group_by] if group_by else ()
+        query = db.session.query(*(key.label(f"key_{i}") for i, key in enumerate(keys)), *cls._aggregates())
+
+        if user_id is not None:
+            query = query.filter(Timesheet.user_id == user_id)
+        if client_id is not None:
+            query = query.filter(Timesheet.client_id == client_id)
+        if project_id is not None:
+            query = query.filter(Timesheet.project_id == project_id)
+        if start_date is not None:
+            query = query.filter(Timesheet.date >= start_date)
+        if end_date is not None:
+            query = query.filter(Timesheet.date <= end_date)
+
+        if not group_by:
+            return cls._row_to_summary(query.one())
+
+        result = {}
+        for row in query.group_by(*keys).all():
+            if group_by == "month":
+                key = (int(row.key_0), int(row.key_1))
+            else:
+                key = row.key_0
+            result[key] = cls._row_to_summary(row)
+        return result
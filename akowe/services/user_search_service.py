@@ -0,0 +1,49 @@
+"""Service for index-backed user search in the admin panel."""
+
+from sqlalchemy import and_, func, or_
+from sqlalchemy.sql.elements import ColumnElement
+
+from akowe.models import db
+from akowe.models.user import User
+
+# Sorts after any character a search term can end with, closing the prefix range
+_PREFIX_END = "\U0010ffff"
+
+
+class UserSearchService:
+    """Builds user search filters that the database can answer from an index.
+
+    On PostgreSQL, ``ILIKE '%term%'`` is served by the pg_trgm GIN indexes
+    created in the ``20250520_add_user_search_indexes`` migration. Other
+    databases (SQLite in development) fall back to case-insensitive prefix
+    matching, expressed as a range on ``lower(column)`` so it uses the
+    expression indexes declared on the model.
+    """
+
+    SEARCH_COLUMNS = (User.username, User.email, User.first_name, User.last_name)
+    DEFAULT_PER_PAGE = 25
+    MAX_PER_PAGE = 100
+
+    @staticmethod
+    def _escape_like(term: str) -> str:
+        return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+    @classmethod
+    def search_filter(cls, term: str) -> ColumnElement:
+        """Return a WHERE clause matching users by username, email or name
+
+        Args:
+            term: Search text as typed by the admin
+
+        Returns:
+            SQL expression to pass to ``Query.filter``
+        """
+        term = term.strip().lower()
+        if db.session.get_bind().dialect.name == "postgresql":
+            pattern = f"%{cls._escape_like(term)}%"
+            return or_(*(column.ilike(pattern, escape="\\") for column in cls.SEARCH_COLUMNS))
+
+        return or_(*(
+            and_(func.lower(column) >= term, func.lower(column) < term + _PREFIX_END)
+            for column in cls.SEARCH_COLUMNS
+        ))
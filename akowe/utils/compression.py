@@ -0,0 +1,73 @@
+"""Compress large API responses according to the client's Accept-Encoding."""
+
+import gzip
+
+from flask import Flask, request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+# Mimetypes worth compressing; binary downloads (PDFs, ZIPs, images) are not
+COMPRESSIBLE_MIMETYPES = {"application/json", "text/csv"}
+
+
+def _choose_encoding(accept_encodings) -> str:
+    """Return the best supported encoding the client accepts, or an empty string."""
+    if brotli is not None and accept_encodings["br"]:
+        return "br"
+    if accept_encodings["gzip"]:
+        return "gzip"
+    return ""
+
+
+def init_compression(app: Flask):
+    """Register an after_request hook that compresses large responses.
+
+    Responses are compressed when the mimetype is JSON or CSV and the body is at
+    least ``COMPRESS_MIN_SIZE`` bytes. Brotli is used when the ``brotli`` package
+    is installed and the client accepts it, otherwise gzip.
+
+    Args:
+        app: The Flask application instance
+    """
+    app.config.setdefault("COMPRESS_MIN_SIZE", 1024)
+    app.config.setdefault("COMPRESS_LEVEL", 6)
+
+    @app.after_request
+    def compress_response(response):
+        if (
+            response.status_code != 200
+            or response.direct_passthrough
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or "Content-Encoding" in response.headers
+        ):
+            return response
+
+        response.vary.add("Accept-Encoding")
+
+        encoding = _choose_encoding(request.accept_encodings)
+        if not encoding:
+            return response
+
+        data = response.get_data()
+        if len(data) < app.config["COMPRESS_MIN_SIZE"]:
+            return response
+
+        level = app.config["COMPRESS_LEVEL"]
+        if encoding == "br":
+            # Brotli quality runs 0-11; gzip-style levels map onto the same range
+            data = brotli.compress(data, quality=min(level, 11))
+        else:
+            data = gzip.compress(data, compresslevel=level, mtime=0)
+
+        response.set_data(data)
+        response.headers["Content-Encoding"] = encoding
+
+        # The compressed body differs byte-for-byte, so a strong validator no longer applies
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+
+        return response
@@ -0,0 +1,50 @@
+"""JSON provider that uses orjson when it is installed."""
+
+import typing as t
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson, falling back to the stdlib.
+
+    Output matches ``DefaultJSONProvider``: dates are passed through to
+    ``default`` so they keep Flask's HTTP date format, and Decimals, UUIDs and
+    dataclasses are handled by the same ``default`` function. Calls with extra
+    ``json.dumps`` arguments (such as the session serializer's ``separators``)
+    use the stdlib so their formatting is unchanged.
+    """
+
+    def dumps(self, obj: t.Any, **kwargs: t.Any) -> str:
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return self._orjson_dumps(obj).decode("utf-8")
+
+    def response(self, *args: t.Any, **kwargs: t.Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = self.compact is False or (self.compact is None and self._app.debug)
+        if orjson is None or pretty:
+            return super().response(obj)
+        return self._app.response_class(self._orjson_dumps(obj) + b"\n", mimetype=self.mimetype)
+
+    def _orjson_dumps(self, obj: t.Any) -> bytes:
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=self.default, option=option)
+
+
+def init_json(app: Flask):
+    """Install the fast JSON provider on the Flask app.
+
+    Args:
+        app: The Flask application instance
+    """
+    app.json = FastJSONProvider(app)
+    app.logger.debug(f"JSON provider: {'orjson' if orjson else 'stdlib json'}")
@@ -0,0 +1,164 @@
+"""Background sampling of system metrics for the admin dashboard."""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from flask import Flask
+
+from akowe.models import db
+
+try:
+    import psutil
+except ImportError:  # pragma: no cover - optional dependency
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+# Series kept for each sample, in chart order
+METRIC_NAMES = ("cpu_percent", "memory_percent", "disk_percent", "db_connections", "requests_per_minute")
+
+
+class MetricsSampler:
+    """Samples CPU, memory, disk, DB pool and request-rate metrics on a thread.
+
+    Samples go into a fixed-size rolling window, so reads from a request are a
+    lock and a copy rather than system calls. ``psutil.cpu_percent`` is called
+    without an interval and reports usage since the previous sample, so nothing
+    ever sleeps inside a request.
+    """
+
+    def __init__(self):
+        self.app: Optional[Flask] = None
+        self.interval = 5.0
+        self.samples: deque = deque(maxlen=120)
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._last_requests = 0
+        self._last_time = time.monotonic()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._stop = threading.Event()
+        self._boot_time = psutil.boot_time() if psutil else None
+
+    def init_app(self, app: Flask):
+        """Configure the sampler from the app and count its requests.
+
+        Config:
+            METRICS_SAMPLE_INTERVAL: Seconds between samples (default 5)
+            METRICS_WINDOW: Number of samples kept (default 120, ten minutes)
+            METRICS_SAMPLER_ENABLED: Run the background thread (default: not testing)
+        """
+        self.app = app
+        self.interval = float(app.config.setdefault("METRICS_SAMPLE_INTERVAL", 5))
+        window = int(app.config.setdefault("METRICS_WINDOW", 120))
+        self.samples = deque(self.samples, maxlen=window)
+        app.config.setdefault("METRICS_SAMPLER_ENABLED", not app.testing)
+
+        @app.before_request
+        def count_request():
+            with self._lock:
+                self._requests += 1
+            # Started lazily so each worker process (after a fork) gets its own thread
+            if app.config["METRICS_SAMPLER_ENABLED"]:
+                self.start()
+
+        if psutil is None:
+            logger.warning("psutil module not found. System monitoring metrics will not be available.")
+
+    def start(self):
+        """Start the sampling thread if it is not already running in this process."""
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="metrics-sampler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the sampling thread."""
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.sample()
+            except Exception as e:  # Never let a failed sample kill the thread
+                logger.error(f"Error sampling system metrics: {str(e)}")
+            self._stop.wait(self.interval)
+
+    def sample(self) -> Dict[str, Any]:
+        """Take one sample and append it to the window."""
+        now = time.monotonic()
+        with self._lock:
+            requests, elapsed = self._requests - self._last_requests, now - self._last_time
+            self._last_requests, self._last_time = self._requests, now
+
+        sample: Dict[str, Any] = {
+            "time": datetime.utcnow(),
+            "cpu_percent": 0,
+            "memory_percent": 0,
+            "disk_percent": 0,
+            "db_connections": self._db_connections(),
+            "requests_per_minute": round(requests * 60 / elapsed, 1) if elapsed > 0 else 0,
+        }
+        if psutil is not None:
+            sample.update({
+                "cpu_percent": psutil.cpu_percent(interval=None),
+                "memory_percent": psutil.virtual_memory().percent,
+                "disk_percent": psutil.disk_usage("/").percent,
+            })
+
+        with self._lock:
+            self.samples.append(sample)
+        return sample
+
+    def _db_connections(self) -> Optional[int]:
+        """Connections currently checked out of the SQLAlchemy pool, if the pool tracks it."""
+        if self.app is None:
+            return None
+        with self.app.app_context():
+            checkedout = getattr(db.engine.pool, "checkedout", None)
+            return checkedout() if checkedout else None
+
+    def latest(self) -> Dict[str, Any]:
+        """Return the most recent sample, taking one now if the window is empty."""
+        with self._lock:
+            if self.samples:
+                return dict(self.samples[-1])
+        return dict(self.sample())
+
+    def series(self) -> Dict[str, List]:
+        """Return the window as chart-ready lists of labels and values."""
+        with self._lock:
+            samples = list(self.samples)
+        series: Dict[str, List] = {"labels": [s["time"].strftime("%H:%M:%S") for s in samples]}
+        for name in METRIC_NAMES:
+            series[name] = [s[name] for s in samples]
+        return series
+
+    def uptime(self) -> str:
+        """Host uptime as "N days, M hours"."""
+        if self._boot_time is None:
+            return "Unknown"
+        uptime_hours = (time.time() - self._boot_time) // 3600
+        return f"{int(uptime_hours // 24)} days, {int(uptime_hours % 24)} hours"
+
+
+metrics_sampler = MetricsSampler()
+
+
+def init_metrics(app: Flask):
+    """Attach the shared metrics sampler to the Flask app.
+
+    Args:
+        app: The Flask application instance
+    """
+    metrics_sampler.init_app(app)
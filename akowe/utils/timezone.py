@@ -4,27 +4,69 @@ import os
 import datetime
 import pytz
 from typing import Union, Optional
-from functools import wraps
-from flask import current_app
+from functools import lru_cache, wraps
+from flask import current_app, g, has_app_context, has_request_context
+from flask_login import current_user
 
 DEFAULT_TIMEZONE = "America/Los_Angeles"
 
 
-def get_timezone() -> pytz.timezone:
-    """Get the timezone from the environment or use the default."""
-    tz_name = os.environ.get("TIMEZONE", DEFAULT_TIMEZONE)
+@lru_cache(maxsize=None)
+def resolve_timezone(tz_name: Optional[str]) -> datetime.tzinfo:
+    """Get the timezone object for a name, falling back to the default if it is unknown.
+    
+    Timezone objects are cached by name, so each is only looked up once per process.
+    """
     try:
-        return pytz.timezone(tz_name)
+        return pytz.timezone(tz_name or DEFAULT_TIMEZONE)
     except pytz.exceptions.UnknownTimeZoneError:
-        # Fall back to default if the timezone is invalid
         return pytz.timezone(DEFAULT_TIMEZONE)
 
 
-def to_local_time(dt: datetime.datetime) -> datetime.datetime:
+def default_timezone_name() -> str:
+    """Name of the application's timezone, used for users who have not chosen one."""
+    if has_app_context() and current_app.config.get("TIMEZONE"):
+        return current_app.config["TIMEZONE"]
+    return os.environ.get("TIMEZONE", DEFAULT_TIMEZONE)
+
+
+def _request_user():
+    """The user making the current request: the API token's user, else the logged-in user."""
+    user = g.get("current_user")
+    if user is None and current_user and current_user.is_authenticated:
+        user = current_user
+    return user
+
+
+def get_timezone(user=None) -> datetime.tzinfo:
+    """Get a user's timezone, or the application timezone if they have not set one.
+    
+    Args:
+        user: The user whose timezone to use (defaults to the user making the
+            current request, if any)
+        
+    Returns:
+        The timezone object. Without an explicit user it is resolved once per
+        request and kept on ``g``.
+    """
+    if user is not None:
+        return resolve_timezone(user.timezone or default_timezone_name())
+    if not has_request_context():
+        return resolve_timezone(default_timezone_name())
+    
+    tz = g.get("_timezone")
+    if tz is None:
+        user = _request_user()
+        tz = g._timezone = resolve_timezone(getattr(user, "timezone", None) or default_timezone_name())
+    return tz
+
+
+def to_local_time(dt: datetime.datetime, tz: Optional[datetime.tzinfo] = None) -> datetime.datetime:
     """Convert UTC datetime to the local timezone.
     
     Args:
         dt: The UTC datetime to convert
+        tz: The timezone to convert to (defaults to ``get_timezone()``)
         
     Returns:
         The datetime in the local timezone
@@ -32,14 +74,12 @@ def to_local_time(dt: datetime.datetime) -> datetime.datetime:
     if dt is None:
         return None
     
-    # Ensure the input datetime is timezone-aware and in UTC
+    # Ensure the input datetime is timezone-aware; naive datetimes are stored in UTC
     if dt.tzinfo is None:
-        dt = pytz.utc.localize(dt)
-    elif dt.tzinfo != pytz.utc:
-        dt = dt.astimezone(pytz.utc)
+        dt = dt.replace(tzinfo=pytz.utc)
     
     # Convert to local timezone
-    return dt.astimezone(get_timezone())
+    return dt.astimezone(tz or get_timezone())
 
 
 def to_utc(dt: Union[datetime.datetime, datetime.date], time_only: bool = False) -> datetime.datetime:
@@ -90,11 +130,7 @@ def format_datetime(dt: datetime.datetime, format_str: str = "%Y-%m-%d %H:%M:%S"
     if dt is None:
         return ""
     
-    # Convert to local time if not already
-    if dt.tzinfo != get_timezone():
-        dt = to_local_time(dt)
-    
-    return dt.strftime(format_str)
+    return to_local_time(dt).strftime(format_str)
 
 
 def format_date(dt: Union[datetime.datetime, datetime.date], format_str: str = "%Y-%m-%d") -> str:
@@ -147,40 +183,6 @@ def convert_to_utc(func):
     return wrapper
 
 
-def convert_from_utc(func):
-    """Decorator that converts UTC date/datetime outputs to local timezone.
-    
-    This decorator should be used on model read methods to ensure
-    that any date or datetime values are converted from UTC to local time.
-    
-    Example:
-        @convert_from_utc
-        def get_invoice(self, id):
-            # Return values with dates converted to local time
-            return Invoice.query.get(id)
-    """
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        result = func(*args, **kwargs)
-        
-        # Handle single objects
-        if hasattr(result, '__dict__'):
-            for key, value in result.__dict__.items():
-                if isinstance(value, datetime.datetime):
-                    setattr(result, key, to_local_time(value))
-        
-        # Handle lists/iterables
-        elif isinstance(result, (list, tuple)) and len(result) > 0:
-            for item in result:
-                if hasattr(item, '__dict__'):
-                    for key, value in item.__dict__.items():
-                        if isinstance(value, datetime.datetime):
-                            setattr(item, key, to_local_time(value))
-        
-        return result
-    return wrapper
-
-
 def local_date_input(date_str: str, format_str: str = "%Y-%m-%d") -> datetime.date:
     """Convert a date string in local timezone to a UTC date object.
     
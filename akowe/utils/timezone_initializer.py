@@ -20,7 +20,7 @@ def init_timezone(app: Flask):
     
     # Verify the timezone is valid
     try:
-        tz = pytz.timezone(tz_name)
+        pytz.timezone(tz_name)
         app.config["TIMEZONE"] = tz_name
         
         # Log the timezone configuration
@@ -29,12 +29,12 @@ def init_timezone(app: Flask):
         # Add timezone information to app context
         @app.context_processor
         def inject_timezone():
-            """Make timezone available in all templates."""
-            now_utc = datetime.now(pytz.utc)
-            now_local = now_utc.astimezone(tz)
+            """Make the current user's timezone available in all templates."""
+            local_tz = get_timezone()
+            now_local = datetime.now(pytz.utc).astimezone(local_tz)
             
             return {
-                "timezone": tz_name,
+                "timezone": local_tz.zone,
                 "timezone_abbr": now_local.strftime("%Z"),
                 "timezone_offset": now_local.strftime("%z"),
                 "current_time": now_local
@@ -0,0 +1,38 @@
+"""Add receipt table for content-addressed receipt storage
+
+Revision ID: 20250517_add_receipt_table
+Revises: 20250501_initial_schema, home_office_table
+Create Date: 2025-05-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20250517_add_receipt_table'
+down_revision = ('20250501_initial_schema', 'home_office_table')
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('receipt',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('blob_name', sa.String(length=255), nullable=False),
+        sa.Column('blob_url', sa.String(length=1024), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=True),
+        sa.Column('ref_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_receipt_content_hash'), 'receipt', ['content_hash'], unique=True)
+    op.create_index(op.f('ix_receipt_blob_name'), 'receipt', ['blob_name'], unique=True)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_receipt_blob_name'), table_name='receipt')
+    op.drop_index(op.f('ix_receipt_content_hash'), table_name='receipt')
+    op.drop_table('receipt')
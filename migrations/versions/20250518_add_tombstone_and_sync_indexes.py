@@ -0,0 +1,46 @@
+"""Add tombstone table and updated_at indexes for mobile delta sync
+
+Revision ID: 20250518_add_tombstone_and_sync_indexes
+Revises: 20250517_add_receipt_table
+Create Date: 2025-05-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20250518_add_tombstone_and_sync_indexes'
+down_revision = '20250517_add_receipt_table'
+branch_labels = None
+depends_on = None
+
+SYNCED_TABLES = ['expense', 'income', 'timesheet', 'invoice', 'client', 'project']
+
+
+def upgrade():
+    op.create_table('tombstone',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('entity_type', sa.String(length=50), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('deleted_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_tombstone_user_id'), 'tombstone', ['user_id'], unique=False)
+    op.create_index(op.f('ix_tombstone_deleted_at'), 'tombstone', ['deleted_at'], unique=False)
+    op.create_index('ix_tombstone_entity_type_deleted_at', 'tombstone',
+                    ['entity_type', 'deleted_at'], unique=False)
+
+    for table in SYNCED_TABLES:
+        op.create_index(op.f(f'ix_{table}_updated_at'), table, ['updated_at'], unique=False)
+
+
+def downgrade():
+    for table in SYNCED_TABLES:
+        op.drop_index(op.f(f'ix_{table}_updated_at'), table_name=table)
+
+    op.drop_index('ix_tombstone_entity_type_deleted_at', table_name='tombstone')
+    op.drop_index(op.f('ix_tombstone_deleted_at'), table_name='tombstone')
+    op.drop_index(op.f('ix_tombstone_user_id'), table_name='tombstone')
+    op.drop_table('tombstone')
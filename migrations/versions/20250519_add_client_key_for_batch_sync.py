@@ -0,0 +1,31 @@
+"""Add client_key idempotency columns to timesheet and expense
+
+Revision ID: 20250519_add_client_key_for_batch_sync
+Revises: 20250518_add_tombstone_and_sync_indexes
+Create Date: 2025-05-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20250519_add_client_key_for_batch_sync'
+down_revision = '20250518_add_tombstone_and_sync_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # batch_alter_table lets SQLite add the unique constraint as well
+    for table in ['timesheet', 'expense']:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column('client_key', sa.String(length=64), nullable=True))
+            batch_op.create_unique_constraint(f'uq_{table}_user_client_key', ['user_id', 'client_key'])
+
+
+def downgrade():
+    for table in ['timesheet', 'expense']:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_constraint(f'uq_{table}_user_client_key', type_='unique')
+            batch_op.drop_column('client_key')
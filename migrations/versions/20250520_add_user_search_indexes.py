@@ -0,0 +1,40 @@
+"""Add indexes for admin user search
+
+Revision ID: 20250520_add_user_search_indexes
+Revises: 20250519_add_client_key_for_batch_sync
+Create Date: 2025-05-20 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20250520_add_user_search_indexes'
+down_revision = '20250519_add_client_key_for_batch_sync'
+branch_labels = None
+depends_on = None
+
+SEARCH_COLUMNS = ['username', 'email', 'first_name', 'last_name']
+
+
+def upgrade():
+    # Lower-cased expression indexes back the prefix search used on every database
+    for column in SEARCH_COLUMNS:
+        op.create_index(f'ix_users_{column}_lower', 'users', [sa.text(f'lower({column})')], unique=False)
+
+    # PostgreSQL answers substring (ILIKE '%term%') search from trigram indexes
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for column in SEARCH_COLUMNS:
+            op.create_index(f'ix_users_{column}_trgm', 'users', [column], unique=False,
+                            postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'})
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        for column in SEARCH_COLUMNS:
+            op.drop_index(f'ix_users_{column}_trgm', table_name='users')
+
+    for column in SEARCH_COLUMNS:
+        op.drop_index(f'ix_users_{column}_lower', table_name='users')
@@ -0,0 +1,24 @@
+"""Add composite (status, due_date) index to invoice
+
+Revision ID: 20250521_add_invoice_status_due_date_index
+Revises: 20250520_add_user_search_indexes
+Create Date: 2025-05-21 09:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '20250521_add_invoice_status_due_date_index'
+down_revision = '20250520_add_user_search_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Serves the overdue sweep: WHERE status = 'sent' AND due_date < :today
+    op.create_index('ix_invoice_status_due_date', 'invoice', ['status', 'due_date'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_invoice_status_due_date', table_name='invoice')
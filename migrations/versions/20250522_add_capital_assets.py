@@ -0,0 +1,76 @@
+"""Add capital asset register and stored per-class CCA balances
+
+Revision ID: 20250522_add_capital_assets
+Revises: 20250521_add_invoice_status_due_date_index
+Create Date: 2025-05-22 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20250522_add_capital_assets'
+down_revision = '20250521_add_invoice_status_due_date_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('capital_asset',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('expense_id', sa.Integer(), nullable=True),
+        sa.Column('description', sa.String(length=255), nullable=False),
+        sa.Column('cca_class', sa.String(length=10), nullable=False),
+        sa.Column('acquired_on', sa.Date(), nullable=False),
+        sa.Column('cost', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('disposed_on', sa.Date(), nullable=True),
+        sa.Column('proceeds', sa.Numeric(precision=12, scale=2), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['expense_id'], ['expense.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('expense_id')
+    )
+    op.create_index('ix_capital_asset_user_class', 'capital_asset', ['user_id', 'cca_class'], unique=False)
+
+    op.create_table('cca_balance',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('cca_class', sa.String(length=10), nullable=False),
+        sa.Column('tax_year', sa.Integer(), nullable=False),
+        sa.Column('opening_ucc', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('additions', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('dispositions', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('half_year_adjustment', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('cca', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('recapture', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('closing_ucc', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'tax_year', 'cca_class', name='uq_cca_balance_user_year_class')
+    )
+
+    # Register existing capital purchases; new and edited expenses are kept in sync by the model
+    op.execute("""
+        INSERT INTO capital_asset (user_id, expense_id, description, cca_class, acquired_on, cost,
+                                   created_at, updated_at)
+        SELECT user_id, id, title,
+               CASE category
+                   WHEN 'furniture' THEN '8'
+                   WHEN 'vehicle' THEN '10'
+                   WHEN 'hardware' THEN CASE WHEN amount > 500 THEN '50' ELSE '12' END
+               END,
+               date, amount, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+        FROM expense
+        WHERE category IN ('hardware', 'furniture', 'vehicle') AND user_id IS NOT NULL
+    """)
+
+
+def downgrade():
+    op.drop_table('cca_balance')
+    op.drop_index('ix_capital_asset_user_class', table_name='capital_asset')
+    op.drop_table('capital_asset')
@@ -0,0 +1,49 @@
+"""Store the per-expense breakdown of home office claims
+
+Revision ID: 20250523_add_home_office_deductions
+Revises: 20250522_add_capital_assets
+Create Date: 2025-05-23 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20250523_add_home_office_deductions'
+down_revision = '20250522_add_capital_assets'
+branch_labels = None
+depends_on = None
+
+EXPENSE_FIELDS = (
+    'rent', 'mortgage_interest', 'property_tax', 'home_insurance',
+    'utilities', 'maintenance', 'internet', 'phone',
+)
+
+
+def upgrade():
+    op.create_table('home_office_deduction',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('home_office_id', sa.Integer(), nullable=False),
+        sa.Column('category', sa.String(length=30), nullable=False),
+        sa.Column('amount', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column('deductible', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.ForeignKeyConstraint(['home_office_id'], ['home_office.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('home_office_id', 'category', name='uq_home_office_deduction_category')
+    )
+
+    # Store the breakdown of existing claims, as HomeOfficeService.apply_calculation would
+    for field in EXPENSE_FIELDS:
+        op.execute(f"""
+            INSERT INTO home_office_deduction (home_office_id, category, amount, deductible)
+            SELECT id, '{field}', COALESCE({field}, 0),
+                   CASE WHEN calculation_method = 'simplified' OR COALESCE({field}, 0) <= 0 THEN 0
+                        ELSE ROUND({field} * business_use_percentage / 100, 2)
+                   END
+            FROM home_office
+        """)
+
+
+def downgrade():
+    op.drop_table('home_office_deduction')
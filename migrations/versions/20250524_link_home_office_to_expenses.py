@@ -0,0 +1,29 @@
+"""Link home office claims to the expense ledger
+
+Revision ID: 20250524_link_home_office_to_expenses
+Revises: 20250523_add_home_office_deductions
+Create Date: 2025-05-24 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20250524_link_home_office_to_expenses'
+down_revision = '20250523_add_home_office_deductions'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing claims were entered by hand and stay that way until the user links them
+    with op.batch_alter_table('home_office', schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column('linked_to_expenses', sa.Boolean(), nullable=False, server_default=sa.false())
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('home_office', schema=None) as batch_op:
+        batch_op.drop_column('linked_to_expenses')
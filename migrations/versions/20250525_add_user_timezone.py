@@ -0,0 +1,27 @@
+"""Add a per-user timezone
+
+Revision ID: 20250525_add_user_timezone
+Revises: 20250524_link_home_office_to_expenses
+Create Date: 2025-05-25 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20250525_add_user_timezone'
+down_revision = '20250524_link_home_office_to_expenses'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # NULL keeps using the app timezone
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('timezone', sa.String(length=64), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('timezone')
@@ -0,0 +1,100 @@
+"""Tests for the consolidated admin statistics service."""
+
+from datetime import datetime
+from decimal import Decimal
+
+from akowe.models import db
+from akowe.models.expense import Expense
+from akowe.services.admin_stats_service import AdminStatsService
+
+
+def test_counters_single_query(app, test_user, admin_user, sample_income):
+    """All counters come back from one query with totals as Decimals."""
+    with app.app_context():
+        counters = AdminStatsService.counters()
+
+        assert counters["total_users"] == 2
+        assert counters["admin_users"] == 1
+        assert counters["inactive_users"] == 0
+        assert counters["income_count"] == 2
+        assert counters["total_income"] == Decimal("18080.00")
+        assert counters["total_expenses"] == Decimal("0.00")
+
+
+def test_counters_cached_until_invalidated(app, test_user):
+    """Cached counters are reused within the TTL and refreshed on invalidate."""
+    with app.app_context():
+        app.config["ADMIN_STATS_CACHE_TTL"] = 300
+        assert AdminStatsService.counters()["expense_count"] == 0
+
+        db.session.add(Expense(
+            date=datetime.utcnow().date(), title="Laptop", amount=Decimal("1200.00"),
+            category="hardware", payment_method="credit_card", status="paid", user_id=test_user.id
+        ))
+        db.session.commit()
+        assert AdminStatsService.counters()["expense_count"] == 0
+
+        AdminStatsService.invalidate()
+        counters = AdminStatsService.counters()
+        assert counters["expense_count"] == 1
+        assert counters["total_expenses"] == Decimal("1200.00")
+
+        monthly = AdminStatsService.monthly(datetime.utcnow().year)
+        assert monthly["expense_data"][datetime.utcnow().month - 1] == 1200.0
+        assert sum(monthly["registration_data"]) == 1
+
+
+def test_admin_pages_use_counters(client, auth, admin_user):
+    """The dashboard, user list and data pages render from the cached counters."""
+    auth.login(username="admin", password="password")
+
+    for url in ["/admin/", "/admin/users", "/admin/data"]:
+        assert client.get(url).status_code == 200
+
+
+def test_user_search_paginated(app, client, auth, admin_user):
+    """User search matches name prefixes case-insensitively and pages results."""
+    from akowe.models.user import User
+
+    with app.app_context():
+        for i in range(30):
+            user = User(username=f"contractor{i:02d}", email=f"c{i:02d}@example.com",
+                        first_name="Casey", last_name=f"Smith{i:02d}")
+            user.password = "password"
+            db.session.add(user)
+        db.session.commit()
+
+    auth.login(username="admin", password="password")
+
+    response = client.get("/admin/users?q=SMITH&per_page=25")
+    assert response.status_code == 200
+    assert b"contractor00" in response.data
+    assert b"contractor29" not in response.data
+    assert b"(30 total)" in response.data
+
+    response = client.get("/admin/users?q=smith&page=2")
+    assert b"contractor29" in response.data
+
+    response = client.get("/admin/users?q=nobody")
+    assert b"No users found" in response.data
+
+
+def test_user_activity_grouped(app, client, auth, test_user, admin_user, sample_income):
+    """Activity counts and last activity come back per user from one query."""
+    with app.app_context():
+        activity = AdminStatsService.user_activity([test_user.id, admin_user.id])
+
+        assert activity[test_user.id]["incomes"] == 2
+        assert activity[test_user.id]["invoices"] == 0
+        assert activity[test_user.id]["last_activity"] is not None
+        assert activity[admin_user.id] == {
+            "invoices": 0, "timesheets": 0, "incomes": 0, "expenses": 0, "last_activity": None
+        }
+        assert AdminStatsService.user_activity([]) == {}
+
+    auth.login(username="admin", password="password")
+    # Invoices / timesheets / incomes / expenses
+    assert b"0 / 0 / 2 / 0" in client.get("/admin/users").data
+    response = client.get(f"/admin/users/{admin_user.id}/edit")
+    assert response.status_code == 200
+    assert b"Last activity" in response.data
@@ -0,0 +1,73 @@
+"""Tests for the accounts-receivable aging report."""
+
+from datetime import date
+from decimal import Decimal
+
+from akowe.models import db
+from akowe.models.client import Client
+from akowe.models.invoice import Invoice
+from akowe.services.ar_aging_service import ARAgingService
+
+AS_OF = date(2025, 6, 30)
+
+
+def add_invoices(user_id):
+    acme = Client(name="Acme", user_id=user_id)
+    globex = Client(name="Globex", user_id=user_id)
+    db.session.add_all([acme, globex])
+    db.session.flush()
+
+    for number, (client, due_date, total, status) in enumerate([
+        (acme, date(2025, 7, 15), "100.00", "sent"),       # current
+        (acme, date(2025, 6, 30), "50.00", "sent"),        # due today: current
+        (acme, date(2025, 6, 29), "200.00", "overdue"),    # 1 day past due
+        (acme, date(2025, 5, 31), "300.00", "overdue"),    # 30 days
+        (globex, date(2025, 5, 30), "400.00", "overdue"),  # 31 days
+        (globex, date(2025, 3, 31), "500.00", "overdue"),  # 91 days
+        (globex, date(2025, 1, 1), "999.00", "paid"),
+        (globex, date(2025, 1, 1), "999.00", "draft"),
+    ]):
+        db.session.add(Invoice(
+            invoice_number=f"INV-AGING-{number}", client_id=client.id, issue_date=date(2025, 1, 1),
+            due_date=due_date, total=Decimal(total), status=status, user_id=user_id,
+        ))
+    db.session.commit()
+
+
+def test_report_buckets_by_days_past_due(app, test_user):
+    """Only sent and overdue invoices are bucketed, per client, largest total first."""
+    with app.app_context():
+        add_invoices(test_user.id)
+        report = ARAgingService.report(test_user.id, AS_OF)
+
+        globex, acme = report["clients"]
+        assert globex["client_name"] == "Globex"
+        assert globex["days_31_60"] == Decimal("400.00")
+        assert globex["days_over_90"] == Decimal("500.00")
+        assert globex["total"] == Decimal("900.00")
+
+        assert acme["invoice_count"] == 4
+        assert acme["current"] == Decimal("150.00")
+        assert acme["days_1_30"] == Decimal("500.00")
+        assert acme["days_61_90"] == Decimal("0.00")
+
+        assert report["totals"]["invoice_count"] == 6
+        assert report["totals"]["total"] == Decimal("1550.00")
+        assert ARAgingService.report(test_user.id + 1, AS_OF)["clients"] == []
+
+
+def test_aging_page_and_csv(app, client, auth, test_user):
+    """The aging page lists each client and the CSV export ends with a totals row."""
+    with app.app_context():
+        add_invoices(test_user.id)
+
+    auth.login()
+    response = client.get("/invoice/aging?as_of=2025-06-30")
+    assert response.status_code == 200
+    assert b"Globex" in response.data
+
+    response = client.get("/invoice/aging?as_of=2025-06-30&format=csv")
+    assert response.mimetype == "text/csv"
+    lines = response.data.decode().splitlines()
+    assert lines[0] == "client,invoices,Current,1-30 days,31-60 days,61-90 days,90+ days,total"
+    assert lines[-1] == "Total,6,150.00,500.00,400.00,0.00,500.00,1550.00"
@@ -0,0 +1,126 @@
+"""Tests for the capital asset register and CCA schedules."""
+
+import csv
+import io
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from akowe.models import db
+from akowe.models.capital_asset import CapitalAsset, CCABalance
+from akowe.models.expense import Expense
+from akowe.services.capital_asset_service import CapitalAssetService
+from akowe.services.corporate_tax_export_service import CorporateTaxExportService
+
+
+def add_expense(user_id, category, amount, on=date(2023, 6, 1), title="Purchase"):
+    expense = Expense(date=on, title=title, amount=Decimal(amount), category=category,
+                      payment_method="credit_card", status="paid", user_id=user_id)
+    db.session.add(expense)
+    db.session.commit()
+    return expense
+
+
+def class_balance(user_id, year, cca_class):
+    return next(balance for balance in CapitalAssetService.balances(user_id, year) if balance.cca_class == cca_class)
+
+
+def stored_years():
+    return sorted({row.tax_year for row in CCABalance.query.all()})
+
+
+def test_capital_expenses_are_registered_as_assets(app, test_user):
+    with app.app_context():
+        laptop = add_expense(test_user.id, "hardware", "2400.00", title="Laptop")
+        add_expense(test_user.id, "hardware", "120.00", title="Keyboard")
+        add_expense(test_user.id, "office_supplies", "900.00")
+
+        assets = {asset.description: asset for asset in CapitalAsset.query.all()}
+        assert set(assets) == {"Laptop", "Keyboard"}
+        assert assets["Laptop"].cca_class == "50"
+        assert assets["Keyboard"].cca_class == "12"
+        assert assets["Laptop"].expense_id == laptop.id
+
+        laptop.amount = Decimal("2000.00")
+        db.session.commit()
+        assert CapitalAsset.query.filter_by(expense_id=laptop.id).one().cost == Decimal("2000.00")
+
+        laptop.category = "software"
+        db.session.commit()
+        assert CapitalAsset.query.filter_by(expense_id=laptop.id).count() == 0
+
+        laptop.category = "furniture"
+        db.session.commit()
+        assert CapitalAsset.query.filter_by(expense_id=laptop.id).one().cca_class == "8"
+
+        db.session.delete(laptop)
+        db.session.commit()
+        assert CapitalAsset.query.count() == 1
+
+
+def test_half_year_rule_disposition_and_recapture(app, test_user):
+    with app.app_context():
+        desk = CapitalAssetService.add_asset(test_user.id, "Desk", "8", date(2023, 3, 1), Decimal("1000.00"))
+
+        first = class_balance(test_user.id, 2023, "8")
+        assert first.half_year_adjustment == Decimal("500.00")
+        assert first.cca == Decimal("100.00")
+        assert first.closing_ucc == Decimal("900.00")
+
+        second = class_balance(test_user.id, 2024, "8")
+        assert second.opening_ucc == Decimal("900.00")
+        assert second.cca == Decimal("180.00")
+        assert second.closing_ucc == Decimal("720.00")
+
+        # Proceeds above the remaining UCC are recaptured and the class closes at zero
+        CapitalAssetService.dispose_asset(desk, date(2025, 5, 1), Decimal("800.00"))
+        third = class_balance(test_user.id, 2025, "8")
+        assert third.dispositions == Decimal("800.00")
+        assert third.recapture == Decimal("80.00")
+        assert third.cca == Decimal("0.00")
+        assert third.closing_ucc == Decimal("0.00")
+
+        assert class_balance(test_user.id, 2022, "8").closing_ucc == 0
+        with pytest.raises(ValueError):
+            CapitalAssetService.add_asset(test_user.id, "Boat", "7", date(2023, 1, 1), Decimal("1.00"))
+
+
+def test_balances_roll_forward_from_stored_years(app, test_user):
+    with app.app_context():
+        CapitalAssetService.add_asset(test_user.id, "Desk", "8", date(2023, 3, 1), Decimal("1000.00"))
+        CapitalAssetService.balances(test_user.id, 2024)
+        assert stored_years() == [2023, 2024]
+
+        # A change in 2024 drops that year onwards only; 2023 stays stored
+        CapitalAssetService.add_asset(test_user.id, "Car", "10", date(2024, 9, 1), Decimal("20000.00"))
+        assert stored_years() == [2023]
+
+        car = class_balance(test_user.id, 2025, "10")
+        assert car.opening_ucc == Decimal("17000.00")
+        assert car.cca == Decimal("5100.00")
+        assert stored_years() == [2023, 2024, 2025]
+        assert class_balance(test_user.id, 2025, "8").closing_ucc == Decimal("576.00")
+
+
+def test_schedule8_export_and_register_page(app, client, auth, test_user):
+    with app.app_context():
+        add_expense(test_user.id, "vehicle", "30000.00", on=date(2025, 2, 1), title="Van")
+        csv_data, filename = CorporateTaxExportService.export_t2_schedule8_format(2025)
+
+    assert filename.startswith("T2_Schedule8_CCA_2025_")
+    rows = list(csv.reader(io.StringIO(csv_data.getvalue().decode("utf-8"))))
+    assert rows[0][:4] == ["Asset Class", "Description", "CCA Rate", "UCC Start of Year"]
+    class10 = next(row for row in rows if row[0] == "10")
+    assert class10[2:] == ["30%", "0.00", "30000.00", "0.00", "15000.00", "4500.00", "0.00", "25500.00"]
+    assert ["10", "Van", "2025-02-01", "30000.00", "", ""] in rows
+
+    auth.login()
+    response = client.post("/tax/assets/new", data={
+        "description": "Standing desk", "cca_class": "8", "acquired_on": "2025-04-01", "cost": "800.00",
+    })
+    assert response.status_code == 302
+    response = client.get("/tax/assets?year=2025")
+    assert response.status_code == 200
+    assert b"Standing desk" in response.data
+    assert b"$4,500.00" in response.data
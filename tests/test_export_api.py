@@ -246,4 +246,26 @@ def test_unauthorized_access(client):
         
         # Should redirect to login page
         assert response.status_code == 302
-        assert "/login" in response.headers["Location"]
\ No newline at end of file
+        assert "/login" in response.headers["Location"]
+
+
+def test_export_tax_bundle_endpoint(client, auth, sample_income, sample_expense):
+    """Test the tax bundle endpoint returns every format in one ZIP."""
+    import zipfile
+
+    auth.login()
+
+    response = client.get("/export/tax/bundle?year=2025&province=Quebec")
+    assert response.status_code == 200
+    assert response.mimetype == "application/zip"
+    assert "tax_export_bundle_2025" in response.headers["Content-Disposition"]
+
+    with zipfile.ZipFile(io.BytesIO(response.data)) as archive:
+        names = archive.namelist()
+        assert len(names) == 6
+        t2125 = next(name for name in names if name.startswith("T2125_CRA_export_2025_"))
+        rows = list(csv.reader(io.StringIO(archive.read(t2125).decode("utf-8"))))
+        assert rows[0][4] == "GST/QST Paid"
+
+    response = client.get("/export/tax/bundle")
+    assert response.status_code == 400
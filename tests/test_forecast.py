@@ -0,0 +1,116 @@
+"""Tests for seasonal income and expense forecasting."""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from akowe.models import db
+from akowe.models.income import Income
+from akowe.services.forecast_service import ForecastService
+from akowe.services.tax_prediction_service import TaxPredictionService
+
+
+@pytest.fixture
+def months_elapsed(monkeypatch):
+    """Pin how much of the forecast year has passed, independent of today's date."""
+    def pin(months):
+        monkeypatch.setattr(ForecastService, "months_elapsed", staticmethod(lambda year: months))
+    return pin
+
+
+def add_income(user_id, year, month, amount):
+    db.session.add(Income(date=date(year, month, 15), amount=Decimal(amount), client="Acme",
+                          project="Retainer", user_id=user_id))
+
+
+def test_seasonal_profile(app, test_user, months_elapsed):
+    months_elapsed(0)
+    with app.app_context():
+        for year in (2022, 2023, 2024):
+            for month in range(1, 13):
+                add_income(test_user.id, year, month, "4000" if month == 12 else "1000")
+        db.session.commit()
+
+        forecast = ForecastService.forecast(2025, test_user.id)
+        assert forecast["income"][0] == Decimal("1000.00")
+        assert forecast["income"][11] == Decimal("4000.00")
+        assert forecast["expenses"] == [Decimal("0.00")] * 12
+        assert forecast["parameters"]["income"]["years"] == 3
+
+
+def test_trend_and_year_to_date(app, test_user, months_elapsed):
+    with app.app_context():
+        for year, amount in ((2023, "1000"), (2024, "2000")):
+            for month in range(1, 13):
+                add_income(test_user.id, year, month, amount)
+        db.session.commit()
+
+        months_elapsed(0)
+        assert ForecastService.forecast(2025, test_user.id)["income"][5] == Decimal("3000.00")
+
+        # Six months at 1,800 instead of the expected 3,000 pull the rest of the year down by half the miss
+        for month in range(1, 7):
+            add_income(test_user.id, 2025, month, "1800")
+        db.session.commit()
+        months_elapsed(6)
+        forecast = ForecastService.forecast(2025, test_user.id)
+        assert forecast["income"][:6] == [Decimal("1800.00")] * 6
+        assert forecast["income"][6] == Decimal("2400.00")
+
+
+def test_no_history_uses_average_so_far(app, test_user, months_elapsed):
+    months_elapsed(4)
+    with app.app_context():
+        for month, amount in ((1, "500"), (2, "700"), (4, "1200")):
+            add_income(test_user.id, 2025, month, amount)
+        db.session.commit()
+
+        forecast = ForecastService.forecast(2025, test_user.id)
+        assert forecast["income"][2] == Decimal("0.00")
+        assert forecast["income"][4:] == [Decimal("600.00")] * 8
+
+
+def test_fitted_parameters_are_cached_until_data_changes(app, test_user, months_elapsed, monkeypatch):
+    months_elapsed(0)
+    calls = []
+    original = ForecastService._monthly_totals.__func__
+
+    def counting(cls, *args):
+        calls.append(args)
+        return original(cls, *args)
+
+    monkeypatch.setattr(ForecastService, "_monthly_totals", classmethod(counting))
+    with app.app_context():
+        add_income(test_user.id, 2024, 3, "1200")
+        db.session.commit()
+
+        first = ForecastService.forecast(2025, test_user.id)
+        assert ForecastService.forecast(2025, test_user.id) == first
+        assert len(calls) == 1
+
+        add_income(test_user.id, 2024, 4, "1200")
+        db.session.commit()
+        assert ForecastService.forecast(2025, test_user.id) != first
+        assert len(calls) == 2
+
+        ForecastService.invalidate(test_user.id)
+        ForecastService.forecast(2025, test_user.id)
+        assert len(calls) == 3
+
+
+def test_prediction_projects_from_history(app, test_user, months_elapsed):
+    months_elapsed(11)
+    with app.app_context():
+        for year in (2023, 2024):
+            for month in range(1, 13):
+                add_income(test_user.id, year, month, "13000" if month == 12 else "1000")
+        for month in range(1, 12):
+            add_income(test_user.id, 2025, month, "1000")
+        db.session.commit()
+
+        incomes = Income.query.filter(Income.date >= date(2025, 1, 1)).all()
+        prediction = TaxPredictionService.predict_tax_obligation(incomes, [], "Ontario", 2025, test_user.id)
+        # December's seasonal peak is projected, not the average month
+        assert prediction["projected_income"] == Decimal("24000.00")
+        assert prediction["months_breakdown"][11]["income"] == Decimal("13000.00")
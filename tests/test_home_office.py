@@ -265,3 +265,170 @@ def test_home_office_model_creation(app):
         db.session.delete(home_office)
         db.session.commit()
     
+
+def test_calculate_all_stores_breakdowns(app, test_user):
+    """Test recalculating every claim of a user and storing the breakdowns."""
+    with app.app_context():
+        from akowe.models import db
+        from akowe.models.home_office import HomeOfficeDeduction
+
+        for year, rent in ((2023, "10000.00"), (2024, "12000.00")):
+            HomeOfficeService.create_home_office_claim(test_user.id, {
+                "tax_year": year,
+                "total_home_area": "1000",
+                "office_area": "250",
+                "rent": rent,
+                "utilities": "2000.00",
+            })
+        HomeOfficeService.create_home_office_claim(test_user.id, {
+            "tax_year": 2025,
+            "calculation_method": "simplified",
+            "total_home_area": "1000",
+            "office_area": "150",
+            "rent": "13000.00",
+        })
+
+        # Edit a field directly; the stored breakdown is stale until recalculated
+        claim_2024 = HomeOffice.query.filter_by(tax_year=2024).one()
+        claim_2024.office_area = Decimal("100")
+        db.session.commit()
+
+        claims = HomeOfficeService.calculate_all(test_user.id)
+        assert [claim.tax_year for claim in claims] == [2023, 2024, 2025]
+        assert claims[1].business_use_percentage == Decimal("10.00")
+        assert claims[1].stored_breakdown()["rent"] == Decimal("1200.00")
+        assert claims[2].total_deduction == Decimal("300.00")
+        assert claims[2].stored_breakdown()["rent"] == Decimal("0.00")
+        assert HomeOfficeDeduction.query.count() == 3 * 8
+
+        comparison = HomeOfficeService.compare_claims(test_user.id)
+        rent = next(row for row in comparison["rows"] if row["field"] == "rent")
+        assert rent["deductibles"] == [Decimal("2500.00"), Decimal("1200.00"), Decimal("0.00")]
+        assert comparison["totals"] == [Decimal("3000.00"), Decimal("1400.00"), Decimal("300.00")]
+
+        # Deleting a claim removes its breakdown
+        db.session.delete(claims[0])
+        db.session.commit()
+        assert HomeOfficeDeduction.query.count() == 2 * 8
+
+
+def test_compare_view_and_batch_api(app, client, auth, test_user):
+    """Test the comparison page and the batch calculation endpoint."""
+    with app.app_context():
+        for year in (2024, 2025):
+            HomeOfficeService.create_home_office_claim(test_user.id, {
+                "tax_year": year,
+                "total_home_area": "800",
+                "office_area": "200",
+                "internet": "1200.00",
+            })
+
+    auth.login()
+    response = client.get("/home-office/compare")
+    assert response.status_code == 200
+    assert b"Home Office Claims by Year" in response.data
+    assert b"$300.00" in response.data
+
+    response = client.post("/home-office/api/calculate-all", json={})
+    data = response.get_json()
+    assert data["success"] is True
+    assert [claim["tax_year"] for claim in data["claims"]] == [2024, 2025]
+    assert data["claims"][0]["deductible"]["internet"] == 300.0
+
+
+def test_claim_linked_to_expenses(app, test_user):
+    """Test filling a claim from the ledger and keeping it in sync as expenses change."""
+    with app.app_context():
+        from akowe.models import db
+        from akowe.models.expense import Expense
+
+        def add_expense(day, category, amount, status="paid"):
+            expense = Expense(
+                date=day, title=category, amount=Decimal(amount), category=category,
+                payment_method="debit_card", status=status, user_id=test_user.id,
+            )
+            db.session.add(expense)
+            db.session.commit()
+            return expense
+
+        add_expense(date(2024, 1, 1), "rent", "1000.00")
+        add_expense(date(2024, 2, 1), "rent", "1000.00")
+        add_expense(date(2024, 3, 5), "repairs", "150.00")
+        add_expense(date(2024, 3, 9), "maintenance", "50.00")
+        add_expense(date(2024, 4, 1), "telephone", "80.00", status="cancelled")
+        add_expense(date(2023, 12, 1), "rent", "900.00")
+        add_expense(date(2024, 5, 1), "software", "500.00")
+
+        totals = HomeOfficeService.ledger_totals(test_user.id, 2024)
+        assert totals["rent"] == Decimal("2000.00")
+        assert totals["maintenance"] == Decimal("200.00")
+        assert totals["phone"] == Decimal("0.00")
+        assert "mortgage_interest" not in totals
+
+        # Ledger amounts replace the submitted ones; other fields are kept
+        claim = HomeOfficeService.create_home_office_claim(test_user.id, {
+            "tax_year": 2024,
+            "total_home_area": "1000",
+            "office_area": "100",
+            "rent": "99999",
+            "home_insurance": "1000.00",
+            "linked_to_expenses": True,
+        })
+        claim_id = claim.id
+        assert claim.rent == Decimal("2000.00")
+        assert claim.total_deduction == Decimal("320.00")
+
+        # An unlinked claim for the same year is left alone
+        manual = HomeOfficeService.create_home_office_claim(test_user.id, {
+            "tax_year": 2024,
+            "total_home_area": "1000",
+            "office_area": "100",
+            "rent": "500.00",
+        })
+        manual_id = manual.id
+
+        phone = add_expense(date(2024, 6, 1), "telephone", "120.00")
+        rent = Expense.query.filter_by(category="rent", date=date(2024, 2, 1)).one()
+        rent.amount = Decimal("1100.00")
+        db.session.commit()
+        # Moving an expense to another year or category takes it off the claim
+        repairs = Expense.query.filter_by(category="repairs").one()
+        repairs.date = date(2023, 3, 5)
+        db.session.commit()
+        db.session.delete(phone)
+        add_expense(date(2024, 7, 1), "internet", "600.00")
+
+        claim = db.session.get(HomeOffice, claim_id)
+        assert claim.rent == Decimal("2100.00")
+        assert claim.maintenance == Decimal("50.00")
+        assert claim.phone == Decimal("0.00")
+        assert claim.internet == Decimal("600.00")
+        assert claim.total_deduction == Decimal("375.00")
+        assert claim.stored_breakdown()["rent"] == Decimal("210.00")
+        assert claim.stored_breakdown()["internet"] == Decimal("60.00")
+
+        # The incremental totals match a fresh aggregation
+        fresh = HomeOfficeService.ledger_totals(test_user.id, 2024)
+        assert all(getattr(claim, field) == amount for field, amount in fresh.items())
+
+        assert db.session.get(HomeOffice, manual_id).rent == Decimal("500.00")
+
+
+def test_ledger_totals_api(app, client, auth, test_user):
+    """Test the endpoint that pre-fills the claim form from the ledger."""
+    with app.app_context():
+        from akowe.models import db
+        from akowe.models.expense import Expense
+
+        db.session.add(Expense(
+            date=date(2024, 3, 1), title="Hydro", amount=Decimal("240.50"), category="utilities",
+            payment_method="debit_card", status="paid", user_id=test_user.id,
+        ))
+        db.session.commit()
+
+    auth.login()
+    response = client.get("/home-office/api/ledger-totals?tax_year=2024")
+    data = response.get_json()
+    assert data["success"] is True
+    assert data["totals"]["utilities"] == 240.5
+    assert data["totals"]["rent"] == 0.0
@@ -0,0 +1,140 @@
+"""Tests for SQL-side invoice total calculation."""
+
+from datetime import date
+from decimal import Decimal
+
+from akowe.models import db
+from akowe.models.client import Client
+from akowe.models.invoice import Invoice
+from akowe.models.project import Project
+from akowe.models.timesheet import Timesheet
+
+
+def make_invoice(user_id, hours=("2.50", "1.25"), rate="100.00", tax_rate="13.00", name="Acme"):
+    client = Client(name=name, user_id=user_id)
+    db.session.add(client)
+    db.session.flush()
+    project = Project(name="Portal", client_id=client.id, user_id=user_id)
+    db.session.add(project)
+    invoice = Invoice(invoice_number=f"INV-{client.id}", client_id=client.id, issue_date=date(2025, 3, 1),
+                      due_date=date(2025, 3, 31), tax_rate=Decimal(tax_rate), user_id=user_id)
+    db.session.add(invoice)
+    db.session.flush()
+    for value in hours:
+        db.session.add(Timesheet(date=date(2025, 2, 28), client_id=client.id, project_id=project.id,
+                                 description="Work", hours=Decimal(value), hourly_rate=Decimal(rate),
+                                 status="billed", invoice_id=invoice.id, user_id=user_id))
+    return invoice
+
+
+def test_calculate_totals_sums_in_sql(app, test_user):
+    """Totals come from the database and include unflushed entry changes."""
+    with app.app_context():
+        invoice = make_invoice(test_user.id)
+        invoice.calculate_totals()
+
+        assert invoice.subtotal == Decimal("375.00")
+        assert invoice.tax_amount == Decimal("48.75")
+        assert invoice.total == Decimal("423.75")
+        assert "timesheet_entries" not in invoice.__dict__
+
+        entry = Timesheet.query.filter_by(invoice_id=invoice.id, hours=Decimal("1.25")).one()
+        entry.invoice_id = None
+        entry.status = "pending"
+        invoice.calculate_totals()
+        assert invoice.subtotal == Decimal("250.00")
+
+
+def test_recalculate_command(app, test_user):
+    """The CLI updates only invoices whose stored totals are stale."""
+    with app.app_context():
+        stale = make_invoice(test_user.id)
+        db.session.commit()
+        fresh = make_invoice(test_user.id, hours=("1.00",), name="Globex")
+        fresh.calculate_totals()
+        db.session.commit()
+        stale_id = stale.id
+
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=["invoices", "recalculate", "--dry-run"])
+    assert "1 invoice(s) would be updated" in result.output
+
+    result = runner.invoke(args=["invoices", "recalculate"])
+    assert "Updated totals on 1 invoice(s)" in result.output
+
+    with app.app_context():
+        invoice = db.session.get(Invoice, stale_id)
+        assert invoice.subtotal == Decimal("375.00")
+        assert invoice.total == Decimal("423.75")
+
+    result = runner.invoke(args=["invoices", "recalculate"])
+    assert "Updated totals on 0 invoice(s)" in result.output
+
+
+def test_attach_timesheets_only_claims_pending_entries(app, test_user):
+    """Attaching is one UPDATE guarded on status, so billed entries cannot move invoices."""
+    with app.app_context():
+        first = make_invoice(test_user.id, hours=())
+        second = make_invoice(test_user.id, hours=(), name="Globex")
+        project = Project.query.filter_by(client_id=first.client_id).one()
+        entries = [
+            Timesheet(date=date(2025, 2, 28), client_id=first.client_id, project_id=project.id, description="Work",
+                      hours=Decimal("1.00"), hourly_rate=Decimal("100.00"), user_id=test_user.id)
+            for _ in range(3)
+        ]
+        db.session.add_all(entries)
+        db.session.flush()
+        ids = [entry.id for entry in entries]
+
+        assert first.attach_timesheets(ids[:2]) == 2
+        # A second request racing for the same entries only gets the one still pending
+        assert second.attach_timesheets(ids) == 1
+
+        assert sorted(entry.id for entry in first.timesheet_entries) == ids[:2]
+        assert [entry.id for entry in second.timesheet_entries] == ids[2:]
+        assert all(entry.status == "billed" for entry in entries)
+
+
+def test_detach_timesheets_keeps_selected_entries(app, test_user):
+    """Detaching returns deselected entries to pending and deleting keeps them."""
+    with app.app_context():
+        invoice = make_invoice(test_user.id, hours=("1.00", "2.00", "3.00"))
+        db.session.flush()
+        ids = sorted(entry.id for entry in invoice.timesheet_entries)
+
+        assert invoice.detach_timesheets(keep_ids=ids[:1]) == 2
+        assert [entry.id for entry in invoice.timesheet_entries] == ids[:1]
+        invoice.calculate_totals()
+        assert invoice.subtotal == Decimal("100.00")
+
+        assert invoice.detach_timesheets() == 1
+        db.session.delete(invoice)
+        db.session.commit()
+
+        entries = Timesheet.query.filter(Timesheet.id.in_(ids)).all()
+        assert len(entries) == 3
+        assert all(entry.status == "pending" and entry.invoice_id is None for entry in entries)
+
+
+def test_mark_overdue_command(app, test_user):
+    """Only sent invoices due before the cut-off date become overdue."""
+    with app.app_context():
+        sent = make_invoice(test_user.id, hours=())
+        sent.status = "sent"
+        draft = make_invoice(test_user.id, hours=(), name="Globex")
+        not_due = make_invoice(test_user.id, hours=(), name="Initech")
+        not_due.status = "sent"
+        not_due.due_date = date(2025, 4, 30)
+        db.session.commit()
+        ids = sent.id, draft.id, not_due.id
+
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=["invoices", "mark-overdue", "--as-of", "2025-04-01", "--dry-run"])
+    assert "1 invoice(s) would be marked overdue" in result.output
+
+    result = runner.invoke(args=["invoices", "mark-overdue", "--as-of", "2025-04-01"])
+    assert "Marked 1 invoice(s) overdue as of 2025-04-01" in result.output
+
+    with app.app_context():
+        statuses = [db.session.get(Invoice, invoice_id).status for invoice_id in ids]
+        assert statuses == ["overdue", "draft", "sent"]
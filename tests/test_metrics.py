@@ -0,0 +1,40 @@
+"""Tests for the background system metrics sampler."""
+
+from akowe.utils.metrics import MetricsSampler, metrics_sampler
+
+
+def test_sampler_keeps_rolling_window(app):
+    """Samples beyond the configured window are dropped, oldest first."""
+    sampler = MetricsSampler()
+    app.config["METRICS_WINDOW"] = 3
+    sampler.init_app(app)
+
+    for _ in range(5):
+        sampler.sample()
+
+    series = sampler.series()
+    assert len(series["labels"]) == 3
+    assert set(series) >= {"cpu_percent", "memory_percent", "disk_percent",
+                           "db_connections", "requests_per_minute"}
+    assert all(0 <= value <= 100 for value in series["memory_percent"])
+
+
+def test_sampler_counts_requests(app, client):
+    """Requests handled between samples are reported as a per-minute rate."""
+    metrics_sampler.sample()
+    for _ in range(3):
+        client.get("/ping")
+
+    sample = metrics_sampler.sample()
+    assert sample["requests_per_minute"] > 0
+    # The sampler thread is not started under test
+    assert not app.config["METRICS_SAMPLER_ENABLED"]
+
+
+def test_admin_dashboard_reads_sampler(client, auth, admin_user):
+    """The admin dashboard renders metrics from the window without blocking."""
+    auth.login(username="admin", password="password")
+    response = client.get("/admin/")
+
+    assert response.status_code == 200
+    assert b"systemMetricsChart" in response.data
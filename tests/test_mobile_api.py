@@ -172,6 +172,25 @@ def test_get_user(client, auth_token):
     assert data['user']['username'] == 'testuser'
 
 
+def test_set_timezone(client, auth_token):
+    """Test choosing a timezone for the user's dates and times."""
+    headers = {'Authorization': f'Bearer {auth_token}'}
+
+    response = client.put('/api/user/timezone', json={'timezone': 'Mars/Olympus'}, headers=headers)
+    assert response.status_code == 400
+
+    response = client.put('/api/user/timezone', json={'timezone': 'America/Toronto'}, headers=headers)
+    assert response.status_code == 200
+    assert json.loads(response.data)['timezone'] == 'America/Toronto'
+
+    response = client.get('/api/user', headers=headers)
+    assert json.loads(response.data)['user']['timezone'] == 'America/Toronto'
+
+    # Clearing it goes back to the app timezone
+    response = client.put('/api/user/timezone', json={'timezone': None}, headers=headers)
+    assert json.loads(response.data)['timezone'] == 'America/Los_Angeles'
+
+
 def test_get_clients(client, auth_token):
     """Test getting clients with token authentication."""
     response = client.get('/api/clients/', headers={
@@ -338,6 +357,94 @@ def test_get_invoices(client, auth_token):
     assert data['invoices'][0]['invoice_number'] == 'INV-TEST-001'
 
 
+def test_get_aging_report(client, auth_token):
+    """Test the AR aging report and its CSV export."""
+    headers = {'Authorization': f'Bearer {auth_token}'}
+
+    # The test invoice is a draft, so nothing is outstanding until it is billed and sent
+    response = client.put('/api/invoices/1', json={'timesheet_ids': [1]}, headers=headers)
+    assert json.loads(response.data)['invoice']['total'] == '565.00'
+    response = client.post('/api/invoices/1/mark-sent', headers=headers)
+    assert response.status_code == 200
+
+    response = client.get('/api/invoices/aging', headers=headers)
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data['clients'][0]['client_name'] == 'Test Client'
+    assert data['clients'][0]['invoice_count'] == 1
+    assert data['totals']['current'] == data['totals']['total'] == '565.00'
+
+    due_date = (datetime.now() + timedelta(days=30)).date()
+    response = client.get(f'/api/invoices/aging?as_of={(due_date + timedelta(days=45)).isoformat()}',
+                          headers=headers)
+    data = json.loads(response.data)
+    assert data['totals']['days_31_60'] == '565.00'
+    assert data['totals']['current'] == '0.00'
+
+    response = client.get('/api/invoices/aging?format=csv', headers=headers)
+    assert json.loads(response.data)['csv_data'].startswith('client,invoices,Current')
+
+    response = client.get('/api/invoices/aging?as_of=yesterday', headers=headers)
+    assert response.status_code == 400
+
+
+def test_get_remittance_report(client, auth_token):
+    """Test the GST/HST remittance report and its CSV export."""
+    headers = {'Authorization': f'Bearer {auth_token}'}
+    year = datetime.now().year
+
+    response = client.get(f'/api/tax/remittance?year={year}&period=monthly', headers=headers)
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data['tax_label'] == 'GST/HST'
+    assert len(data['periods']) == 12
+    assert data['periods'][0]['start_date'] == f'{year}-01-01'
+    totals = data['totals']
+    assert Decimal(totals['tax_collected']) - Decimal(totals['input_tax_credits']) == Decimal(totals['net_remittance'])
+
+    response = client.get('/api/tax/remittance?format=csv', headers=headers)
+    assert json.loads(response.data)['filename'].startswith('gst_hst_remittance_')
+
+    response = client.get('/api/tax/remittance?period=weekly', headers=headers)
+    assert response.status_code == 400
+
+    for year in (0, 9999):
+        response = client.get(f'/api/tax/remittance?year={year}', headers=headers)
+        assert response.status_code == 400
+
+
+def test_evaluate_tax_scenarios(client, auth_token):
+    """Test evaluating tax scenarios and sweeps in one call."""
+    headers = {'Authorization': f'Bearer {auth_token}'}
+
+    response = client.post('/api/tax/scenarios', headers=headers, json={
+        'year': 2024,
+        'net_income': '100000',
+        'scenarios': [{'rrsp_contribution': 5000}, {'incorporate': True, 'salary': 50000}],
+    })
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data['table_year'] == 2024
+    assert len(data['scenarios']) == 2
+    assert Decimal(data['scenarios'][0]['tax_savings']) > 0
+
+    response = client.post('/api/tax/scenarios', headers=headers, json={
+        'sweep': {'field': 'extra_expense', 'start': 0, 'stop': 5000, 'step': 1000},
+    })
+    assert response.status_code == 200
+    assert len(json.loads(response.data)['scenarios']) == 6
+
+    for payload in (
+        {'scenarios': [{'salary': -1}]},
+        {'scenarios': [{'incorporate': 'false'}]},
+        {'year': 'abc', 'scenarios': []},
+    ):
+        response = client.post('/api/tax/scenarios', headers=headers, json=payload)
+        assert response.status_code == 400
+
+    assert client.get('/api/tax/prediction?year=0', headers=headers).status_code == 400
+
+
 def test_get_tax_dashboard(client, auth_token):
     """Test getting tax dashboard data with token authentication."""
     response = client.get('/api/tax/dashboard', headers={
@@ -348,6 +455,9 @@ def test_get_tax_dashboard(client, auth_token):
     assert 'summary' in data
     assert 'total_income' in data['summary']
     assert 'total_expenses' in data['summary']
+    income_tax = data['income_tax']
+    parts = Decimal(income_tax['federal_tax']) + Decimal(income_tax['provincial_tax']) + Decimal(income_tax['cpp'])
+    assert abs(Decimal(income_tax['total_tax']) - parts) <= Decimal('0.02')
     assert 'net_income' in data['summary']
 
 
@@ -410,3 +520,316 @@ def test_expired_token(client, auth_token, monkeypatch):
     
     # Restore the original function
     monkeypatch.setattr(jwt, 'decode', original_decode)
+
+
+def test_sync_full_then_delta(client, auth_token):
+    """Test that /api/sync returns everything first, then only changes and deletions."""
+    headers = {'Authorization': f'Bearer {auth_token}'}
+
+    response = client.get('/api/sync', headers=headers)
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data['full'] is True
+    for entity in ['expenses', 'incomes', 'timesheets', 'invoices', 'clients', 'projects']:
+        assert len(data[entity]['updated']) == 1
+        assert data[entity]['deleted'] == []
+
+    # Backdate existing rows so only the following changes fall inside the window
+    with client.application.app_context():
+        old = datetime.utcnow() - timedelta(hours=1)
+        for model in [Expense, Income, Timesheet, Invoice, Client, Project]:
+            model.query.update({model.updated_at: old})
+        db.session.commit()
+    token = (datetime.utcnow() - timedelta(minutes=1)).isoformat()
+
+    expense_id = data['expenses']['updated'][0]['id']
+    client.delete(f'/api/expenses/{expense_id}', headers=headers)
+    client.post('/api/clients/', headers=headers, json={'name': 'Synced Client'})
+
+    response = client.get(f'/api/sync?since={token}', headers=headers)
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data['full'] is False
+    assert data['expenses'] == {'updated': [], 'deleted': [expense_id]}
+    assert [row['name'] for row in data['clients']['updated']] == ['Synced Client']
+    assert data['timesheets']['updated'] == []
+    assert data['incomes'] == {'updated': [], 'deleted': []}
+
+
+def test_sync_invalid_token(client, auth_token):
+    """Test that a malformed sync token is rejected."""
+    response = client.get('/api/sync?since=not-a-token', headers={
+        'Authorization': f'Bearer {auth_token}'
+    })
+    assert response.status_code == 400
+
+
+def test_batch_timesheets_idempotent(client, auth_token):
+    """Test batch timesheet creation, per-item errors and replay via client keys."""
+    headers = {'Authorization': f'Bearer {auth_token}'}
+    clients = json.loads(client.get('/api/clients/', headers=headers).data)['clients']
+    projects = json.loads(client.get('/api/projects/', headers=headers).data)['projects']
+    today = datetime.now().strftime('%Y-%m-%d')
+    payload = {'timesheets': [
+        {'client_key': 'k-1', 'date': today, 'client_id': clients[0]['id'],
+         'project_id': projects[0]['id'], 'description': 'Offline entry 1', 'hours': '2'},
+        {'client_key': 'k-2', 'date': today, 'client_id': clients[0]['id'],
+         'project_id': projects[0]['id'], 'description': 'Offline entry 2', 'hours': '1.5'},
+        {'client_key': 'k-3', 'date': today, 'client_id': 9999,
+         'project_id': projects[0]['id'], 'description': 'Bad client', 'hours': '1'},
+    ]}
+
+    response = client.post('/api/timesheets/batch', headers=headers, json=payload)
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert [r['status'] for r in data['results']] == ['created', 'created', 'error']
+    assert Decimal(data['results'][0]['timesheet']['amount']) == Decimal('200')
+    first_id = data['results'][0]['id']
+
+    # Replaying the same batch after a dropped connection creates nothing new
+    response = client.post('/api/timesheets/batch', headers=headers, json=payload)
+    data = json.loads(response.data)
+    assert [r['status'] for r in data['results']] == ['exists', 'exists', 'error']
+    assert data['results'][0]['id'] == first_id
+    with client.application.app_context():
+        assert Timesheet.query.count() == 3
+
+    # Items with an id update the existing entry
+    response = client.post('/api/timesheets/batch', headers=headers, json={
+        'timesheets': [{'id': first_id, 'hours': '3'}]
+    })
+    data = json.loads(response.data)
+    assert data['updated'] == 1
+    assert Decimal(data['results'][0]['timesheet']['hours']) == Decimal('3')
+
+
+def test_batch_expenses(client, auth_token):
+    """Test batch expense creation with a duplicate client key in the same batch."""
+    headers = {'Authorization': f'Bearer {auth_token}'}
+    item = {'client_key': 'e-1', 'date': '2025-05-01', 'title': 'Taxi', 'amount': '23.50',
+            'category': 'travel', 'payment_method': 'credit_card', 'status': 'paid'}
+
+    response = client.post('/api/expenses/batch', headers=headers, json={
+        'expenses': [item, item, {'title': 'Missing fields'}]
+    })
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert [r['status'] for r in data['results']] == ['created', 'exists', 'error']
+    assert data['results'][0]['id'] == data['results'][1]['id']
+    assert data['created'] == 1 and data['errors'] == 1
+
+
+def test_batch_rejects_bad_items(client, auth_token):
+    """Test that null, mistyped and other users' items fail alone without failing the batch."""
+    headers = {'Authorization': f'Bearer {auth_token}'}
+    clients = json.loads(client.get('/api/clients/', headers=headers).data)['clients']
+    projects = json.loads(client.get('/api/projects/', headers=headers).data)['projects']
+    entry = {'date': '2025-05-01', 'client_id': clients[0]['id'], 'project_id': projects[0]['id'],
+             'description': 'Work', 'hours': '1'}
+
+    response = client.post('/api/timesheets/batch', headers=headers, json={'timesheets': [
+        entry,
+        {**entry, 'project_id': None},
+        {**entry, 'client_id': None},
+        {**entry, 'date': 20250501},
+    ]})
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert [r['status'] for r in data['results']] == ['created', 'error', 'error', 'error']
+
+    response = client.post('/api/timesheets/batch', headers=headers, json={
+        'timesheets': [{'id': data['results'][0]['id'], 'client_id': None}]
+    })
+    assert json.loads(response.data)['results'][0]['status'] == 'error'
+
+    with client.application.app_context():
+        other = User(username='other', email='other@example.com')
+        other.password = 'password123'
+        db.session.add(other)
+        db.session.flush()
+        foreign = Expense(date=datetime(2025, 5, 1).date(), title='Theirs', amount=Decimal('10.00'),
+                          category='travel', payment_method='cash', status='paid', user_id=other.id)
+        db.session.add(foreign)
+        db.session.commit()
+        foreign_id = foreign.id
+
+    item = {'date': '2025-05-01', 'title': 'Taxi', 'amount': '23.50', 'category': 'travel',
+            'payment_method': 'credit_card', 'status': 'paid'}
+    response = client.post('/api/expenses/batch', headers=headers, json={'expenses': [
+        item,
+        {**item, 'title': None},
+        {**item, 'date': ['2025-05-01']},
+        {'id': foreign_id, 'title': 'Mine now'},
+    ]})
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert [r['status'] for r in data['results']] == ['created', 'error', 'error', 'error']
+    assert data['results'][3]['message'] == 'Expense not found'
+    with client.application.app_context():
+        assert db.session.get(Expense, foreign_id).title == 'Theirs'
+
+
+def test_batch_rejects_malformed_ids_and_bodies(client, auth_token):
+    """Test that unhashable or mistyped ids and keys fail per item, and non-object bodies get a 400."""
+    headers = {'Authorization': f'Bearer {auth_token}'}
+
+    response = client.post('/api/timesheets/batch', headers=headers, json={'timesheets': [
+        {'id': [1]},
+        {'client_id': {'id': 1}},
+        {'project_id': True},
+        {'client_key': ['k']},
+        {'client_key': 'k' * 65},
+        'not an object',
+    ]})
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert [r['status'] for r in data['results']] == ['error'] * 6
+    assert data['results'][0]['message'] == 'Invalid id'
+
+    item = {'date': '2025-05-01', 'title': 'Taxi', 'amount': '23.50', 'category': 'travel',
+            'payment_method': 'credit_card', 'status': 'paid'}
+    response = client.post('/api/expenses/batch', headers=headers, json={'expenses': [
+        {**item, 'client_key': 'e' * 64},
+        {**item, 'id': [1]},
+        {**item, 'client_key': 'e' * 65},
+        {**item, 'client_key': {'key': 1}},
+    ]})
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert [r['status'] for r in data['results']] == ['created', 'error', 'error', 'error']
+
+    for url in ['/api/timesheets/batch', '/api/expenses/batch']:
+        response = client.post(url, headers=headers, json=[{'id': 1}])
+        assert response.status_code == 400
+
+
+def test_conditional_get_expenses(client, auth_token):
+    """Test ETag validation on a list endpoint until the underlying data changes."""
+    headers = {'Authorization': f'Bearer {auth_token}'}
+
+    response = client.get('/api/expenses', headers=headers)
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+    assert response.headers['Last-Modified']
+
+    response = client.get('/api/expenses', headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+
+    # A different query string is a different resource
+    response = client.get('/api/expenses?status=paid', headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 200
+
+    client.post('/api/expenses', headers=headers, json={
+        'date': '2025-05-02', 'title': 'Parking', 'amount': '12.00', 'category': 'travel',
+        'payment_method': 'cash', 'status': 'paid'
+    })
+    response = client.get('/api/expenses', headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+
+def test_conditional_get_ignores_other_users_deletes(app, client, auth_token):
+    """Test another user's deletions do not invalidate this user's ETag."""
+    from akowe.models.tombstone import Tombstone
+
+    headers = {'Authorization': f'Bearer {auth_token}'}
+    response = client.get('/api/timesheets/', headers=headers)
+    etag = response.headers['ETag']
+
+    with app.app_context():
+        db.session.add(Tombstone(
+            entity_type='timesheets', entity_id=999, user_id=999,
+            deleted_at=datetime.utcnow() + timedelta(days=1)
+        ))
+        db.session.commit()
+
+    response = client.get('/api/timesheets/', headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 304
+
+
+def test_conditional_get_dashboard_and_references(client, auth_token):
+    """Test 304 responses for the dashboard and static reference data."""
+    headers = {'Authorization': f'Bearer {auth_token}'}
+
+    for url in ['/api/dashboard', '/api/tax/dashboard', '/api/references/categories']:
+        response = client.get(url, headers=headers)
+        assert response.status_code == 200
+        response = client.get(url, headers={**headers, 'If-None-Match': response.headers['ETag']})
+        assert response.status_code == 304
+
+
+def test_gzip_compression(app, client, auth_token):
+    """Test JSON responses are gzipped on request and still revalidate."""
+    import gzip
+    app.config['COMPRESS_MIN_SIZE'] = 0
+    headers = {'Authorization': f'Bearer {auth_token}', 'Accept-Encoding': 'gzip'}
+
+    response = client.get('/api/invoices/', headers=headers)
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    data = json.loads(gzip.decompress(response.data))
+    assert data['invoices'][0]['invoice_number'] == 'INV-TEST-001'
+    assert 'timesheet_count' in data['invoices'][0]
+
+    etag = response.headers['ETag']
+    assert etag.startswith('W/')
+    response = client.get('/api/invoices/', headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 304
+
+    # Clients that do not advertise gzip get the plain body
+    response = client.get('/api/invoices/', headers={'Authorization': f'Bearer {auth_token}'})
+    assert 'Content-Encoding' not in response.headers
+    assert json.loads(response.data)['count'] == 1
+
+
+def test_schema_dump(app):
+    """Test schema conversion of Decimal, date and null values."""
+    from akowe.api.serializers import project_schema, timesheet_schema
+
+    with app.app_context():
+        entry = Timesheet.query.first()
+        data = timesheet_schema.dump(entry, client_name='Acme')
+        assert data['hours'] == str(entry.hours)
+        assert data['amount'] == str(entry.amount)
+        assert data['date'] == entry.date.isoformat()
+        assert data['client_name'] == 'Acme'
+
+        project = Project(name='No rate', client_id=entry.client_id, user_id=entry.user_id)
+        assert project_schema.dump(project)['hourly_rate'] is None
+
+
+def test_weekly_and_grid_timesheets(client, auth_token):
+    """Test the weekly view and month/custom grids bucket hours per day and project."""
+    headers = {'Authorization': f'Bearer {auth_token}'}
+    today = datetime.now().date()
+
+    response = client.get('/api/timesheets/weekly', headers=headers)
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert len(data['days']) == 7
+    assert Decimal(data['total_hours']) == Decimal('5.0')
+    assert Decimal(data['daily_totals'][today.isoformat()]) == Decimal('5.0')
+
+    response = client.get(f'/api/timesheets/grid?period=month&date={today.isoformat()}', headers=headers)
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data['start_date'] == today.replace(day=1).isoformat()
+    assert sum(len(day['entries']) for day in data['days']) == 1
+    assert data['projects'][0]['project_name'] == 'Test Project'
+    assert Decimal(data['projects'][0]['daily_hours'][today.isoformat()]) == Decimal('5.0')
+
+    # Totals only, aggregated in SQL
+    start = (today - timedelta(days=40)).isoformat()
+    response = client.get(f'/api/timesheets/grid?start_date={start}&end_date={today.isoformat()}&entries=false',
+                          headers=headers)
+    data = json.loads(response.data)
+    assert len(data['days']) == 41
+    assert 'entries' not in data['days'][0]
+    assert Decimal(data['total_hours']) == Decimal('5.0')
+
+    response = client.get('/api/timesheets/grid?start_date=2020-01-01&end_date=2025-01-01', headers=headers)
+    assert response.status_code == 400
+    response = client.get('/api/timesheets/grid?period=year', headers=headers)
+    assert response.status_code == 400
@@ -0,0 +1,119 @@
+"""Tests for content-hash receipt deduplication."""
+
+from io import BytesIO
+
+import pytest
+from werkzeug.datastructures import FileStorage
+
+from akowe.models import db
+from akowe.models.receipt import Receipt
+from akowe.services.receipt_service import ReceiptService
+from akowe.services.storage_service import StorageService
+
+
+@pytest.fixture
+def fake_storage(monkeypatch):
+    """Replace Azure calls with an in-memory record of uploads and deletes."""
+    calls = {"uploads": [], "deletes": []}
+
+    def upload_file(file_data, container_name, blob_name=None):
+        calls["uploads"].append(blob_name)
+        return blob_name, f"https://test.blob.core.windows.net/{container_name}/{blob_name}"
+
+    def delete_file(blob_name, container_name):
+        calls["deletes"].append(blob_name)
+
+    monkeypatch.setattr(StorageService, "upload_file", staticmethod(upload_file))
+    monkeypatch.setattr(StorageService, "delete_file", staticmethod(delete_file))
+    return calls
+
+
+def make_file(content=b"receipt-bytes", filename="receipt.pdf"):
+    return FileStorage(stream=BytesIO(content), filename=filename)
+
+
+def test_hash_file_rewinds_stream():
+    """Hashing reads the whole stream and leaves it ready for upload."""
+    file_data = make_file(b"x" * 200000)
+    content_hash, size = StorageService.hash_file(file_data)
+
+    assert len(content_hash) == 64
+    assert size == 200000
+    assert file_data.stream.tell() == 0
+
+
+def test_duplicate_receipt_uploaded_once(app, fake_storage):
+    """Attaching identical content twice uploads one blob with two references."""
+    with app.app_context():
+        first_name, _ = ReceiptService.attach(make_file(), "receipts")
+        second_name, _ = ReceiptService.attach(make_file(filename="retry.pdf"), "receipts")
+        db.session.commit()
+
+        assert first_name == second_name
+        assert first_name.endswith(".pdf")
+        assert fake_storage["uploads"] == [first_name]
+        assert Receipt.query.filter_by(blob_name=first_name).one().ref_count == 2
+
+
+def test_release_deletes_blob_after_last_reference(app, fake_storage):
+    """The blob is only deleted once every expense has released it."""
+    with app.app_context():
+        blob_name, _ = ReceiptService.attach(make_file(), "receipts")
+        ReceiptService.attach(make_file(), "receipts")
+        db.session.commit()
+
+        ReceiptService.release(blob_name, "receipts")
+        db.session.commit()
+        assert fake_storage["deletes"] == []
+        assert Receipt.query.filter_by(blob_name=blob_name).one().ref_count == 1
+
+        ReceiptService.release(blob_name, "receipts")
+        db.session.commit()
+        assert fake_storage["deletes"] == [blob_name]
+        assert Receipt.query.filter_by(blob_name=blob_name).first() is None
+
+
+def test_release_legacy_blob_deletes_directly(app, fake_storage):
+    """Blobs uploaded before deduplication have no receipt row and are deleted."""
+    with app.app_context():
+        ReceiptService.release("0b7c6a4e-legacy.jpg", "receipts")
+        db.session.commit()
+
+        assert fake_storage["deletes"] == ["0b7c6a4e-legacy.jpg"]
+
+
+def test_release_keeps_blob_when_transaction_rolls_back(app, fake_storage):
+    """Blobs are only deleted once the release commits."""
+    with app.app_context():
+        blob_name, _ = ReceiptService.attach(make_file(), "receipts")
+        db.session.commit()
+
+        ReceiptService.release(blob_name, "receipts")
+        assert fake_storage["deletes"] == []
+        db.session.rollback()
+        db.session.commit()
+
+        assert fake_storage["deletes"] == []
+        assert Receipt.query.filter_by(blob_name=blob_name).one().ref_count == 1
+
+
+def test_concurrent_first_upload_shares_row(app, fake_storage, monkeypatch):
+    """A receipt row inserted by another request during upload gets the reference."""
+    with app.app_context():
+        content_hash, _ = StorageService.hash_file(make_file())
+
+        def racing_upload(file_data, container_name, blob_name=None):
+            # The other request finishes its upload and insert while this one uploads
+            db.session.execute(Receipt.__table__.insert().values(
+                content_hash=content_hash, blob_name=blob_name, blob_url="https://other", ref_count=1,
+            ))
+            return blob_name, f"https://test.blob.core.windows.net/{container_name}/{blob_name}"
+
+        monkeypatch.setattr(StorageService, "upload_file", staticmethod(racing_upload))
+        blob_name, blob_url = ReceiptService.attach(make_file(), "receipts")
+        db.session.commit()
+
+        receipt = Receipt.query.one()
+        assert receipt.blob_name == blob_name
+        assert blob_url == "https://other"
+        assert receipt.ref_count == 2
@@ -0,0 +1,102 @@
+"""Tests for the GST/HST remittance report per filing period."""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from akowe.models import db
+from akowe.models.expense import Expense
+from akowe.models.income import Income
+from akowe.services.remittance_service import RemittanceReportService
+
+
+def add_records(user_id):
+    db.session.add_all([
+        # Year boundaries: Jan 1 counts, Dec 31 of the previous year does not
+        Income(date=date(2025, 1, 1), amount=Decimal("1130.00"), client="Acme", project="Portal",
+               user_id=user_id),
+        Income(date=date(2025, 3, 31), amount=Decimal("565.00"), client="Acme", project="Portal",
+               user_id=user_id),
+        Income(date=date(2025, 11, 2), amount=Decimal("2260.00"), client="Globex", project="API",
+               user_id=user_id),
+        Income(date=date(2024, 12, 31), amount=Decimal("9999.00"), client="Acme", project="Portal",
+               user_id=user_id),
+        Expense(date=date(2025, 2, 1), title="Laptop", amount=Decimal("226.00"), category="hardware",
+                payment_method="credit_card", status="paid", user_id=user_id),
+        Expense(date=date(2025, 7, 1), title="Desk", amount=Decimal("339.00"), category="office_supplies",
+                payment_method="credit_card", status="paid", user_id=user_id),
+    ])
+    db.session.commit()
+
+
+def test_quarterly_report(app, test_user):
+    with app.app_context():
+        add_records(test_user.id)
+        report = RemittanceReportService.report(2025, "Ontario", "quarterly", test_user.id)
+
+        q1, q2, q3, q4 = report["periods"]
+        assert q1["label"] == "Q1 (Jan-Mar) 2025"
+        assert (q1["start_date"], q1["end_date"], q1["due_date"]) == (
+            date(2025, 1, 1), date(2025, 3, 31), date(2025, 4, 30)
+        )
+        assert q1["income_count"] == 2
+        assert q1["total_sales"] == Decimal("1695.00")
+        assert q1["tax_collected"] == Decimal("195.00")
+        assert q1["input_tax_credits"] == Decimal("26.00")
+        assert q1["net_remittance"] == Decimal("169.00")
+
+        assert q2["net_remittance"] == Decimal("0.00")
+        assert q3["net_remittance"] == Decimal("-39.00")
+        assert q4["due_date"] == date(2026, 1, 31)
+        assert q4["tax_collected"] == Decimal("260.00")
+
+        assert report["totals"]["income_count"] == 3
+        assert report["totals"]["net_remittance"] == Decimal("390.00")
+
+
+def test_monthly_and_annual_periods_share_totals(app, test_user):
+    with app.app_context():
+        add_records(test_user.id)
+        monthly = RemittanceReportService.report(2025, "Quebec", "monthly")
+        annual = RemittanceReportService.report(2025, "Quebec", "annual")
+
+        assert len(monthly["periods"]) == 12
+        assert monthly["periods"][10]["label"] == "November 2025"
+        assert monthly["periods"][1]["expense_count"] == 1
+
+        (year,) = annual["periods"]
+        assert year["label"] == "2025"
+        assert year["due_date"] == date(2026, 4, 30)
+        assert year["gst_hst_collected"] + year["qst_collected"] == year["tax_collected"]
+        assert year["qst_collected"] > 0
+        assert monthly["totals"]["total_sales"] == year["total_sales"] == Decimal("3955.00")
+
+        assert RemittanceReportService.report(2025, user_id=test_user.id + 1)["totals"]["total_sales"] == 0
+
+        with pytest.raises(ValueError):
+            RemittanceReportService.report(2025, period="weekly")
+        with pytest.raises(ValueError):
+            RemittanceReportService.report(9999)
+
+
+def test_remittance_page_and_csv(app, client, auth, test_user):
+    with app.app_context():
+        add_records(test_user.id)
+
+    auth.login()
+    response = client.get("/tax/remittance?year=2025&province=Ontario")
+    assert response.status_code == 200
+    assert b"Q4 (Oct-Dec) 2025" in response.data
+
+    response = client.get("/tax/remittance?year=2025&period=annual&format=csv")
+    assert response.mimetype == "text/csv"
+    lines = response.data.decode().splitlines()
+    assert lines[0].startswith("period,start_date,end_date,due_date,income_count,expense_count,total_sales")
+    assert lines[1] == "2025,2025-01-01,2025-12-31,2026-04-30,3,2,3955.00,455.00,0.00,455.00,565.00,65.00,0.00,65.00,390.00"
+    assert lines[-1].startswith("Total,,,,3,2,3955.00")
+
+    for year in (0, 9999):
+        response = client.get(f"/tax/remittance?year={year}")
+        assert response.status_code == 200
+        assert b"Year must be between 1 and 9998" in response.data
@@ -0,0 +1,82 @@
+"""Tests for the vectorized sales tax calculator."""
+
+import random
+from datetime import date
+from decimal import Decimal, ROUND_HALF_EVEN
+from fractions import Fraction
+
+import numpy as np
+
+from akowe.app.tax_dashboard import GST_HST_RATES
+from akowe.models import db
+from akowe.models.expense import Expense
+from akowe.models.income import Income
+from akowe.services.sales_tax_service import SalesTax, SalesTaxService, _scale, to_cents
+
+CENTS = Decimal("0.01")
+
+
+def decimal_paid(amount, rate, qst_rate):
+    """Reference per-row Decimal calculation the exports used to do."""
+    gst = ((amount * rate) / (1 + rate + rate * qst_rate)).quantize(CENTS, rounding=ROUND_HALF_EVEN)
+    if not qst_rate:
+        return ((amount * rate) / (1 + rate)).quantize(CENTS, rounding=ROUND_HALF_EVEN)
+    return gst + (((amount + gst) * qst_rate) / (1 + qst_rate)).quantize(CENTS, rounding=ROUND_HALF_EVEN)
+
+
+def test_matches_decimal_rounding_for_every_province():
+    """Column results equal row-by-row Decimal quantize with ROUND_HALF_EVEN."""
+    rng = random.Random(42)
+    amounts = [Decimal(rng.randint(-10**6, 10**9)).scaleb(-2) for _ in range(2000)]
+    amounts += [Decimal("0.00"), Decimal("0.01"), Decimal("11.30"), Decimal("99999999.99")]
+
+    for province in GST_HST_RATES:
+        tax = SalesTax(province)
+        expected = [decimal_paid(amount, tax.gst_hst_rate, tax.qst_rate) for amount in amounts]
+        assert tax.paid(amounts) == expected, province
+
+
+def test_rounds_half_to_even():
+    # Halving odd cents lands exactly on half a cent
+    cents = np.array([1, 3, 5, -1, -3])
+    assert _scale(cents, Fraction(1, 2)).tolist() == [0, 2, 2, 0, -2]
+    assert to_cents([Decimal("0.125"), Decimal("0.135")]).tolist() == [12, 14]
+    assert SalesTax("Ontario").paid([]) == []
+
+
+def test_large_amounts_do_not_overflow():
+    tax = SalesTax("Quebec")
+    cents = to_cents([Decimal("90000000000000000.00")])
+    gst, qst = tax.paid_parts(cents)
+    assert int(gst[0]) > 0 and int(qst[0]) > 0
+    assert tax.paid([Decimal("90000000000000000.00")])[0] == decimal_paid(
+        Decimal("90000000000000000.00"), tax.gst_hst_rate, tax.qst_rate
+    )
+
+
+def test_remittance_summary(app, test_user):
+    with app.app_context():
+        db.session.add_all([
+            Income(date=date(2025, 1, 1), amount=Decimal("1130.00"), client="Acme", project="Portal",
+                   user_id=test_user.id),
+            Income(date=date(2024, 2, 1), amount=Decimal("5000.00"), client="Acme", project="Portal",
+                   user_id=test_user.id),
+            Expense(date=date(2025, 3, 1), title="Laptop", amount=Decimal("226.00"), category="hardware",
+                    payment_method="credit_card", status="paid", user_id=test_user.id),
+        ])
+        db.session.commit()
+
+        summary = SalesTaxService.remittance_summary(2025, "Ontario")
+        assert summary["income_count"] == 1
+        assert summary["total_sales"] == Decimal("1130.00")
+        assert summary["tax_collected"] == Decimal("130.00")
+        assert summary["input_tax_credits"] == Decimal("26.00")
+        assert summary["net_remittance"] == Decimal("104.00")
+        assert summary["qst_collected"] == Decimal("0.00")
+
+        quebec = SalesTaxService.remittance_summary(2025, "Quebec")
+        assert quebec["tax_label"] == "GST/QST"
+        assert quebec["gst_hst_collected"] + quebec["qst_collected"] == quebec["tax_collected"]
+        assert quebec["qst_collected"] > 0
+
+        assert SalesTaxService.remittance_summary(2025, user_id=test_user.id + 1)["net_remittance"] == 0
@@ -306,4 +306,29 @@ def test_all_provinces_tax_rates(app, test_user):
         finally:
             # Clean up test income record
             db.session.delete(test_income)
-            db.session.commit()
\ No newline at end of file
+            db.session.commit()
+
+
+def test_bundle_renders_all_formats_in_one_pass(app, sample_income, sample_expense, monkeypatch):
+    """The bundle walks the ledger once and matches the individual exports."""
+    import zipfile
+    from akowe.services.tax_export_pipeline import TaxExportPipeline
+
+    with app.app_context():
+        passes = []
+        ledger = TaxExportPipeline.ledger.__func__
+
+        def counting_ledger(cls, year, tax):
+            passes.append(year)
+            return ledger(cls, year, tax)
+
+        monkeypatch.setattr(TaxExportPipeline, "ledger", classmethod(counting_ledger))
+
+        archive_data, filename = TaxExportService.export_bundle(2025, "Ontario")
+        assert filename.startswith("tax_export_bundle_2025_")
+        assert passes == [2025]
+
+        buffer, _ = TaxExportService.export_turbotax_format(2025, "Ontario")
+        with zipfile.ZipFile(archive_data) as archive:
+            turbotax = next(name for name in archive.namelist() if name.startswith("TurboTax_export_2025_"))
+            assert archive.read(turbotax) == buffer.getvalue()
@@ -0,0 +1,149 @@
+"""Tests for the per-year tax tables and the tax scenario engine."""
+
+from datetime import datetime
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from akowe.services.tax_scenario_service import TaxScenarioService
+from akowe.services.tax_tables import TAX_TABLES, tax_year
+
+
+def test_tables_cover_every_province_each_year():
+    provinces = set(TAX_TABLES[2023].provinces)
+    assert len(provinces) == 13
+    for tables in TAX_TABLES.values():
+        assert set(tables.provinces) == provinces
+        assert set(tables.small_business_rates) == provinces
+
+
+def test_tax_year_falls_back_to_nearest_table():
+    assert tax_year(2024).year == 2024
+    assert tax_year(2040).year == max(TAX_TABLES)
+    assert tax_year(1999).year == min(TAX_TABLES)
+
+
+def test_bracket_table_matches_marginal_calculation():
+    federal = tax_year(2024).federal
+    # 55,867 at 15% plus 4,133 at 20.5%, less the basic personal credit at 15%
+    expected = 55867 * 0.15 + (60000 - 55867) * 0.205 - 15705 * 0.15
+    taxes = federal.tax_array(np.array([0.0, 10000.0, 60000.0]))
+    assert taxes[0] == 0 and taxes[1] == 0
+    assert taxes[2] == pytest.approx(expected)
+
+
+def test_scalar_tax_matches_array_tax():
+    ontario = tax_year(2025).province("Ontario")
+    incomes = [Decimal("0"), Decimal("12747"), Decimal("52886"), Decimal("52886.01"), Decimal("150000"), Decimal("400000")]
+    array = ontario.tax_array(np.array([float(income) for income in incomes]))
+    for income, expected in zip(incomes, array):
+        assert float(ontario.tax(income)) == pytest.approx(expected)
+    assert ontario.bracket_index(Decimal("52886")) == 1
+    assert ontario.bracket_index(Decimal("52885.99")) == 0
+    assert ontario.brackets()[-1] == (Decimal("220000"), None, Decimal("0.1316"))
+
+
+def test_unknown_province_uses_ontario():
+    tables = tax_year(2025)
+    assert tables.province("Atlantis") is tables.province("Ontario")
+
+
+def test_estimate_agrees_with_scenario_baseline():
+    estimate = tax_year(2024).estimate(Decimal("85000"), "British Columbia")
+    baseline = TaxScenarioService.evaluate(Decimal("85000"), [], "British Columbia", 2024)["baseline"]
+    for key in ("taxable_income", "federal_tax", "provincial_tax", "cpp", "total_tax"):
+        assert estimate[key].quantize(Decimal("0.01")) == baseline[key]
+
+
+def test_cpp_includes_second_ceiling():
+    tables = tax_year(2024)
+    expected = (Decimal("68500") - Decimal("3500")) * Decimal("0.119") + (Decimal("73200") - Decimal("68500")) * Decimal("0.08")
+    assert tables.cpp(Decimal("100000")) == expected
+    assert tables.cpp_array(np.array([100000.0]))[0] == pytest.approx(float(expected))
+    assert tables.cpp(Decimal("3000")) == 0
+
+
+def test_evaluate_scenarios():
+    result = TaxScenarioService.evaluate(
+        Decimal("120000"),
+        [
+            {"label": "RRSP", "rrsp_contribution": "10000"},
+            {"label": "Laptop", "extra_expense": 3000},
+            {"label": "Corp", "incorporate": True, "salary": 60000},
+        ],
+        "Ontario",
+        2024,
+    )
+
+    baseline = result["baseline"]
+    rrsp, laptop, corp = result["scenarios"]
+    assert result["table_year"] == 2024
+    assert baseline["tax_savings"] == Decimal("0.00")
+    assert rrsp["label"] == "RRSP"
+    assert rrsp["taxable_income"] == baseline["taxable_income"] - Decimal("10000")
+    assert rrsp["cpp"] == baseline["cpp"]
+    assert rrsp["tax_savings"] > 0
+    assert laptop["business_income"] == Decimal("117000.00")
+    assert corp["taxable_income"] == Decimal("60000.00")
+    assert corp["corporate_tax"] > 0
+    for row in [baseline] + result["scenarios"]:
+        parts = row["federal_tax"] + row["provincial_tax"] + row["cpp"] + row["corporate_tax"]
+        assert abs(parts - row["total_tax"]) <= Decimal("0.02")
+
+
+def test_scenarios_are_independent_of_batch():
+    scenarios = [{"rrsp_contribution": amount} for amount in range(0, 30000, 500)]
+    batch = TaxScenarioService.evaluate(Decimal("90000"), scenarios, "Alberta", 2025)["scenarios"]
+    single = TaxScenarioService.evaluate(Decimal("90000"), scenarios[17:18], "Alberta", 2025)["scenarios"]
+    assert batch[17]["total_tax"] == single[0]["total_tax"]
+
+
+def test_sweep():
+    result = TaxScenarioService.sweep(Decimal("150000"), "salary", 0, 150000, 1000, {"incorporate": True})
+    assert len(result["scenarios"]) == 151
+    assert result["scenarios"][0]["salary"] == Decimal("0")
+    assert result["scenarios"][-1]["taxable_income"] == Decimal("150000.00")
+
+
+def test_invalid_scenarios():
+    with pytest.raises(ValueError):
+        TaxScenarioService.evaluate(Decimal("50000"), [{"extra_expense": -5}])
+    with pytest.raises(ValueError):
+        TaxScenarioService.evaluate(Decimal("50000"), [{"rrsp_contribution": "lots"}])
+    with pytest.raises(ValueError):
+        TaxScenarioService.sweep(Decimal("50000"), "province", 0, 10, 1)
+    with pytest.raises(ValueError):
+        TaxScenarioService.sweep(Decimal("50000"), "salary", 0, 1000000, 1)
+    with pytest.raises(ValueError):
+        TaxScenarioService.sweep(Decimal("50000"), "salary", 0, 1000, "NaN")
+    with pytest.raises(ValueError):
+        TaxScenarioService.evaluate(Decimal("NaN"), [])
+
+
+def test_scenarios_page(client, auth):
+    auth.login()
+    response = client.get("/tax/scenarios?year=2024&net_income=80000&field=extra_expense&stop=10000&step=1000")
+    assert response.status_code == 200
+    assert b"Tax Scenarios 2024" in response.data
+
+    response = client.get("/tax/prediction?year=2023")
+    assert response.status_code == 200
+
+    response = client.get("/tax/?year=2025&province=Quebec")
+    assert response.status_code == 200
+
+
+def test_scenarios_page_rejects_invalid_input(client, auth):
+    auth.login()
+    for query in ("net_income=80000&step=NaN", "net_income=NaN", "net_income=80000&stop=Infinity", "year=0"):
+        response = client.get(f"/tax/scenarios?{query}")
+        assert response.status_code == 200
+
+    current_year = datetime.now().year
+    response = client.get("/tax/prediction?year=0", follow_redirects=True)
+    assert response.status_code == 200
+    assert b"Year must be between 1 and 9998" in response.data
+    assert str(current_year).encode() in response.data
+
+    assert client.get("/tax/api/prediction?year=0").status_code == 400
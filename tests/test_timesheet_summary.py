@@ -0,0 +1,68 @@
+"""Tests for SQL-side timesheet rollups."""
+
+from datetime import date
+from decimal import Decimal
+
+from akowe.models import db
+from akowe.models.client import Client
+from akowe.models.project import Project
+from akowe.models.timesheet import Timesheet
+from akowe.services.timesheet_summary_service import TimesheetSummaryService
+
+
+def add_entries(user_id):
+    client = Client(name="Acme", user_id=user_id)
+    db.session.add(client)
+    db.session.flush()
+    project = Project(name="Portal", client_id=client.id, user_id=user_id)
+    other = Project(name="Audit", client_id=client.id, user_id=user_id)
+    db.session.add_all([project, other])
+    db.session.flush()
+
+    for day, hours, rate, status, project_id in [
+        (date(2025, 1, 6), "2.50", "100.00", "pending", project.id),
+        (date(2025, 1, 7), "4.00", "100.00", "billed", project.id),
+        (date(2025, 2, 3), "1.25", "80.00", "paid", other.id),
+    ]:
+        db.session.add(Timesheet(
+            date=day, client_id=client.id, project_id=project_id, description="Work",
+            hours=Decimal(hours), hourly_rate=Decimal(rate), status=status, user_id=user_id,
+        ))
+    db.session.commit()
+    return client, project, other
+
+
+def test_amount_hybrid_in_sql(app, test_user):
+    """Timesheet.amount works on instances and as a SQL expression."""
+    with app.app_context():
+        add_entries(test_user.id)
+        total = db.session.query(db.func.sum(Timesheet.amount)).scalar()
+        assert Decimal(str(total)) == Decimal("750.00")
+        assert Timesheet.query.filter(Timesheet.amount > 500).count() == 0
+
+
+def test_summarize_totals_and_groups(app, test_user):
+    """Totals split by status, and grouping by project and month."""
+    with app.app_context():
+        client, project, other = add_entries(test_user.id)
+
+        summary = TimesheetSummaryService.summarize(client_id=client.id)
+        assert summary["entry_count"] == 3
+        assert summary["total_hours"] == Decimal("7.75")
+        assert summary["total_amount"] == Decimal("750.00")
+        assert summary["unbilled_amount"] == Decimal("250.00")
+        assert summary["billed_hours"] == Decimal("4.00")
+        assert summary["paid_amount"] == Decimal("100.00")
+
+        by_project = TimesheetSummaryService.summarize(user_id=test_user.id, group_by="project")
+        assert by_project[project.id]["total_amount"] == Decimal("650.00")
+        assert by_project[other.id]["entry_count"] == 1
+
+        by_month = TimesheetSummaryService.summarize(
+            user_id=test_user.id, start_date=date(2025, 1, 7), group_by="month"
+        )
+        assert by_month[(2025, 1)]["total_hours"] == Decimal("4.00")
+        assert by_month[(2025, 2)]["paid_hours"] == Decimal("1.25")
+
+        empty = TimesheetSummaryService.summarize(project_id=-1)
+        assert empty["entry_count"] == 0 and empty["total_amount"] == Decimal("0.00")
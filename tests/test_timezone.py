@@ -0,0 +1,56 @@
+"""Tests for timezone resolution and local time conversion."""
+
+from datetime import datetime
+
+from flask import g
+from flask_login import login_user
+
+from akowe.utils.timezone import (
+    format_datetime,
+    get_timezone,
+    resolve_timezone,
+    to_local_time,
+    to_utc,
+)
+
+
+def test_resolve_timezone_is_cached():
+    """Test that timezones are looked up once per name and unknown names fall back."""
+    assert resolve_timezone("America/Toronto") is resolve_timezone("America/Toronto")
+    assert resolve_timezone("Mars/Olympus").zone == "America/Los_Angeles"
+    assert resolve_timezone(None).zone == "America/Los_Angeles"
+
+
+def test_user_timezone(app, test_user):
+    """Test that the logged-in user's timezone is used for conversions and templates."""
+    from akowe.models import db
+
+    with app.app_context():
+        test_user.timezone = "Asia/Tokyo"
+        db.session.merge(test_user)
+        db.session.commit()
+
+    utc = datetime(2024, 7, 1, 12, 0)
+    with app.test_request_context():
+        # Without a logged-in user, the app timezone applies
+        assert get_timezone().zone == "America/Los_Angeles"
+        assert format_datetime(utc, "%H:%M") == "05:00"
+
+    with app.app_context():
+        from akowe.models.user import User
+
+        user = db.session.get(User, test_user.id)
+        assert get_timezone(user).zone == "Asia/Tokyo"
+        with app.test_request_context():
+            login_user(user)
+            tokyo = get_timezone()
+            assert to_local_time(utc).hour == 21
+            assert format_datetime(utc, "%Y-%m-%d %H:%M") == "2024-07-01 21:00"
+            assert to_utc(datetime(2024, 7, 1, 21, 0)).hour == 12
+            # Resolved once per request
+            assert g._timezone is tokyo
+
+        # API requests use the token's user
+        with app.test_request_context():
+            g.current_user = user
+            assert get_timezone() is tokyo